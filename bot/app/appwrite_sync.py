@@ -0,0 +1,532 @@
+import asyncio
+import json
+import math
+import os
+import time
+import traceback
+from datetime import datetime, timezone
+
+try:
+    import fcntl  # one scheduler run across workers (POSIX only)
+except ImportError:
+    fcntl = None
+
+import httpx
+from dotenv import load_dotenv
+
+from app.json_store import SYNCED_EVENTS_PATH
+
+load_dotenv()
+
+# Appwrite REST configuration
+APPWRITE_ENDPOINT = os.getenv("APPWRITE_ENDPOINT", "")
+APPWRITE_PROJECT_ID = os.getenv("APPWRITE_PROJECT_ID", "")
+APPWRITE_API_KEY = os.getenv("APPWRITE_API_KEY", "")
+APPWRITE_DATABASE_ID = os.getenv("APPWRITE_DATABASE_ID", "6948d5240015a19ea05a")
+APPWRITE_COLLECTION_ID = os.getenv("APPWRITE_COLLECTION_ID", "events")
+
+# Paging configuration
+APPWRITE_PAGE_SIZE = int(os.getenv("APPWRITE_PAGE_SIZE", "100"))          # documents per request
+APPWRITE_SYNC_CONCURRENCY = int(os.getenv("APPWRITE_SYNC_CONCURRENCY", "4"))  # pages fetched at once
+APPWRITE_TIMEOUT = float(os.getenv("APPWRITE_TIMEOUT", "10"))             # seconds per request
+
+SYNC_OUTPUT_FILE = SYNCED_EVENTS_PATH  # SYNC_OUTPUT_FILE env var; served alongside the schemes file
+
+# Delta sync scheduler (0 = off): poll for documents changed since the local watermark
+APPWRITE_SYNC_INTERVAL = float(os.getenv("APPWRITE_SYNC_INTERVAL", "0"))  # seconds between runs
+SYNC_LOCK_FILE = os.getenv("SYNC_LOCK_FILE", "data/.sync.lock")  # also holds the shared last-run times
+APPWRITE_DELETE_CHECK_EVERY = int(os.getenv("APPWRITE_DELETE_CHECK_EVERY", "10"))  # runs between $id listings
+
+
+class SyncInProgress(RuntimeError):
+    """A sync job is already running"""
+
+
+def _documents_url() -> str:
+    return (f"{APPWRITE_ENDPOINT.rstrip('/')}/databases/{APPWRITE_DATABASE_ID}"
+            f"/collections/{APPWRITE_COLLECTION_ID}/documents")
+
+
+def _query(method: str, *values, attribute: str = None) -> str:
+    """One Appwrite query in the JSON syntax (Appwrite 1.5+)"""
+    query = {"method": method}
+    if attribute is not None:
+        query["attribute"] = attribute
+    if values:
+        query["values"] = list(values)
+    return json.dumps(query, separators=(",", ":"))
+
+
+def to_event(doc: dict) -> dict:
+    """Appwrite document -> event record (dates as DD/MM/YYYY; $id/$updatedAt kept for delta sync)"""
+    raw_date = doc.get("date")
+    formatted_date = raw_date
+    if raw_date:
+        try:
+            # Parse ISO 8601 format: "2026-06-02T00:00:00.000+00:00"
+            dt = datetime.fromisoformat(raw_date.replace('Z', '+00:00'))
+            formatted_date = dt.strftime("%d/%m/%Y")
+        except Exception as e:
+            print(f"⚠️ Could not parse date '{raw_date}': {e}")
+
+    return {
+        "$id": doc.get("$id"),
+        "$updatedAt": doc.get("$updatedAt"),
+        "event_name": doc.get("event_name"),
+        "venue": doc.get("venue"),
+        "time": doc.get("time"),
+        "date": formatted_date,
+        "details": doc.get("details"),
+        "coordinator": doc.get("coordinator"),
+        "fest": doc.get("fest"),
+        "slots": doc.get("slots"),
+        "poster": doc.get("poster"),
+        "amount": doc.get("amount"),
+        "phone_number": doc.get("phone_number"),
+        "category": doc.get("category")
+    }
+
+
+async def _fetch_page(client, *queries) -> dict:
+    response = await client.get(_documents_url(), params=[("queries[]", q) for q in queries])
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_documents(page_size: int = APPWRITE_PAGE_SIZE, concurrency: int = APPWRITE_SYNC_CONCURRENCY,
+                          progress=None, filters=()):
+    """
+    Every document in the collection (matching `filters`, extra Appwrite
+    queries such as a $updatedAt bound or a select), ordered by $id.
+    The first page reports `total`, so the remaining pages are fetched by
+    offset, `concurrency` at a time. A cursor sweep after the last ID then
+    picks up anything past the reported total (Appwrite caps it) or added
+    meanwhile. `progress(pages_done, pages_total, documents)` is called per page.
+    """
+    headers = {"X-Appwrite-Project": APPWRITE_PROJECT_ID, "X-Appwrite-Key": APPWRITE_API_KEY}
+    limits = httpx.Limits(max_connections=max(1, concurrency), max_keepalive_connections=max(1, concurrency))
+    order = _query("orderAsc", attribute="$id")
+    filters = tuple(filters)
+    documents = {}  # $id -> document; overlapping pages collapse
+
+    def add(page):
+        for doc in page.get("documents", []):
+            documents[doc.get("$id", len(documents))] = doc
+
+    async with httpx.AsyncClient(headers=headers, timeout=APPWRITE_TIMEOUT, limits=limits) as client:
+        first = await _fetch_page(client, _query("limit", page_size), order, *filters)
+        add(first)
+        pages_total = max(1, math.ceil(first.get("total", 0) / page_size))
+        pages_done = 1
+        if progress:
+            progress(pages_done, pages_total, len(documents))
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def at_offset(offset):
+            nonlocal pages_done
+            async with semaphore:
+                page = await _fetch_page(client, _query("limit", page_size), _query("offset", offset), order, *filters)
+            add(page)
+            pages_done += 1
+            if progress:
+                progress(pages_done, pages_total, len(documents))
+            return page
+
+        pages = [first]
+        if pages_total > 1:
+            pages += await asyncio.gather(*(at_offset(i * page_size) for i in range(1, pages_total)))
+
+        # Cursor sweep: sequential, but usually a single short page
+        last = pages[-1].get("documents", [])
+        while len(last) == page_size:
+            cursor = last[-1].get("$id")
+            page = await _fetch_page(client, _query("limit", page_size), _query("cursorAfter", cursor), order, *filters)
+            last = page.get("documents", [])
+            add(page)
+            pages_done += 1
+            pages_total = max(pages_total, pages_done)
+            if progress:
+                progress(pages_done, pages_total, len(documents))
+
+    return list(documents.values())
+
+
+def write_events(events, path: str = SYNC_OUTPUT_FILE):
+    """Write events compactly and atomically (readers never see a partial file)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(events, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+
+
+def read_events(path: str = SYNC_OUTPUT_FILE):
+    """The local event store, or [] if there is none yet"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            events = json.load(f)
+    except FileNotFoundError:
+        return []
+    return events if isinstance(events, list) else []
+
+
+def watermark_of(events):
+    """Latest $updatedAt in the store; None if any record lacks an $id (needs a full sync)"""
+    if not events or any(not isinstance(e, dict) or not e.get("$id") for e in events):
+        return None
+    return max((e.get("$updatedAt") or "" for e in events), default="") or None
+
+
+def merge_events(events, changed_docs, live_ids=None):
+    """
+    Apply changed Appwrite documents (and, with `live_ids`, deletions) to the
+    store. Returns (events, ids upserted, ids deleted); unchanged records are
+    not counted, so re-fetching the watermark boundary is harmless.
+    """
+    by_id = {e["$id"]: e for e in events if isinstance(e, dict) and e.get("$id")}
+    upserted, deleted = [], []
+    for doc in changed_docs:
+        record = to_event(doc)
+        if by_id.get(record["$id"]) != record:
+            by_id[record["$id"]] = record
+            upserted.append(record["$id"])
+    if live_ids is not None:
+        deleted = [doc_id for doc_id in by_id if doc_id not in live_ids]
+        for doc_id in deleted:
+            del by_id[doc_id]
+    return list(by_id.values()), upserted, deleted
+
+
+async def fetch_delta(events, check_deletions: bool = True):
+    """
+    Documents changed since the store's watermark plus, with
+    `check_deletions`, the IDs that still exist (a $id-only listing; Appwrite
+    keeps no tombstones). Without a watermark this is a full fetch.
+    Returns (changed documents, live IDs or None).
+    """
+    watermark = watermark_of(events)
+    if watermark is None:
+        documents = await fetch_documents()
+        return documents, {doc.get("$id") for doc in documents}
+    if not check_deletions:
+        changed = await fetch_documents(filters=[_query("greaterThanEqual", watermark, attribute="$updatedAt")])
+        return changed, None
+    # greaterThanEqual: a document written in the watermark's millisecond is not missed
+    changed, listing = await asyncio.gather(
+        fetch_documents(filters=[_query("greaterThanEqual", watermark, attribute="$updatedAt")]),
+        fetch_documents(filters=[_query("select", "$id")]),
+    )
+    # A document created between the two listings is live, not deleted
+    return changed, {doc.get("$id") for doc in listing} | {doc.get("$id") for doc in changed}
+
+
+def _sync_from_firestore(progress=None) -> int:
+    """Page Firestore straight into SYNC_OUTPUT_FILE; returns the event count"""
+    from scripts.firestore_fallback import sync_from_firestore
+    return sync_from_firestore(SYNC_OUTPUT_FILE, progress=progress)
+
+
+class SyncJob:
+    """
+    In-process Appwrite sync run as an asyncio task, one at a time.
+    Pages are fetched concurrently; Firestore is the fallback when Appwrite
+    fails or returns nothing, streamed page by page into the output file.
+    File writes and `reload_fn` run in a worker thread. Progress and the outcome are kept for /sync/status.
+    """
+
+    def __init__(self):
+        self._task = None
+        self.runs = 0
+        self.state = {"status": "idle"}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, reload_fn=None):
+        """Schedule a sync on the running loop; raises SyncInProgress if one is running"""
+        if self.running or DELTA_SYNC.running:
+            raise SyncInProgress("A sync is already running")
+        self.runs += 1
+        self.state = {
+            "status": "running",
+            "run": self.runs,
+            "phase": "fetching",
+            "source": None,
+            "pages_done": 0,
+            "pages_total": None,
+            "documents": 0,
+            "started_at": datetime.now().isoformat(),
+            "finished_at": None,
+            "seconds": None,
+            "error": None,
+            "result": None,
+        }
+        self._task = asyncio.get_running_loop().create_task(self._run(reload_fn))
+        return self._task
+
+    async def wait(self):
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    def _progress(self, pages_done, pages_total, documents):
+        self.state.update(pages_done=pages_done, pages_total=pages_total, documents=documents)
+
+    async def _run(self, reload_fn):
+        start = time.perf_counter()
+        try:
+            print("🔄 Starting event sync from Appwrite...")
+            try:
+                documents = await fetch_documents(progress=self._progress)
+                if not documents:
+                    raise ValueError("No events returned from Appwrite")
+                events = [to_event(doc) for doc in documents]
+                self.state.update(source="Appwrite", documents=len(events), phase="writing")
+                await asyncio.to_thread(write_events, events)
+                count, source = len(events), "Appwrite"
+            except Exception as e:
+                print(f"❌ Appwrite failed: {e}")
+                self.state.update(appwrite_error=f"{type(e).__name__}: {e}", source="Firestore",
+                                  phase="fetching (Firestore)", pages_done=0, pages_total=None, documents=0)
+                count = await asyncio.to_thread(
+                    _sync_from_firestore,
+                    lambda pages, records: self._progress(pages, None, records),
+                )
+                source = "Firestore"
+
+            self.state["documents"] = count
+            print(f"✅ Synced {count} events from {source} into {SYNC_OUTPUT_FILE}")
+
+            if reload_fn is not None:
+                self.state["phase"] = "reloading"
+                self.state["result"] = await asyncio.to_thread(reload_fn)
+            self.state["status"] = "succeeded"
+        except Exception as e:
+            print(f"❌ Sync failed: {e}")
+            traceback.print_exc()
+            self.state.update(status="failed", error=f"{type(e).__name__}: {e}")
+        finally:
+            self.state.update(
+                phase=None,
+                finished_at=datetime.now().isoformat(),
+                seconds=round(time.perf_counter() - start, 3),
+            )
+
+    def status(self) -> dict:
+        return dict(self.state)
+
+
+SYNC_JOB = SyncJob()
+
+
+def _parse_timestamp(value):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+class DeltaSyncScheduler:
+    """
+    Background delta sync every `interval` seconds: fetches documents whose
+    $updatedAt is at or after the store's watermark, merges them into the
+    store and reloads only when something changed. Deletions are detected
+    from a $id-only listing of the whole collection, so that runs only every
+    `delete_check_every` runs. With several workers, the lock file holds the
+    time of the last run and of the last deletion check; a worker whose tick
+    comes while that run is still fresh skips it, so the collection is polled
+    about once per interval in total, not once per worker.
+    """
+
+    def __init__(self, interval: float = APPWRITE_SYNC_INTERVAL, lock_path: str = SYNC_LOCK_FILE,
+                 delete_check_every: int = APPWRITE_DELETE_CHECK_EVERY):
+        self.interval = interval
+        self.lock_path = lock_path
+        self.delete_check_every = max(1, delete_check_every)
+        self._task = None
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.deletion_checks = 0
+        self.upserted_total = 0
+        self.deleted_total = 0
+        self.last_run_at = None
+        self.last_success_at = None
+        self.last_seconds = None
+        self.last_changes = None
+        self.last_error = None
+        self.watermark = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def start(self, reload_fn=None, ready=lambda: True):
+        """Start polling on the running loop (no-op unless APPWRITE_SYNC_INTERVAL > 0)"""
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._loop(reload_fn, ready))
+        print(f"⏱️ Delta sync every {self.interval:g}s")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self, reload_fn, ready):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not ready() or SYNC_JOB.running:
+                self.skipped += 1
+                continue
+            try:
+                await self.run_once(reload_fn)
+            except Exception:
+                # Recorded in run_once; keep polling
+                pass
+
+    def _try_lock(self):
+        """Open lock file held by this run, or None if another worker holds it"""
+        if fcntl is None:
+            return open(os.devnull, "a+")
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        handle = open(self.lock_path, "a+")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return None
+        return handle
+
+    @staticmethod
+    def _read_shared(lock) -> dict:
+        """Last-run times shared by the workers (read under the lock)"""
+        lock.seek(0)
+        try:
+            shared = json.loads(lock.read() or "{}")
+        except ValueError:
+            return {}
+        return shared if isinstance(shared, dict) else {}
+
+    @staticmethod
+    def _write_shared(lock, shared: dict):
+        lock.seek(0)
+        lock.truncate()
+        lock.write(json.dumps(shared))
+        lock.flush()
+
+    async def run_once(self, reload_fn=None, force: bool = False) -> dict:
+        """
+        One delta sync; returns the changes. Skipped if another worker is
+        syncing or ran within the last interval (unless `force`).
+        """
+        lock = self._try_lock()
+        if lock is None:
+            self.skipped += 1
+            return {"skipped": True}
+
+        now = time.time()
+        shared = self._read_shared(lock)
+        # Ticks drift a little, so "fresh" ends slightly before a full interval
+        if not force and now - shared.get("last_run", 0) < self.interval * 0.9:
+            lock.close()
+            self.skipped += 1
+            return {"skipped": True}
+        check_deletions = force or now - shared.get("last_deletion_check", 0) >= self.interval * self.delete_check_every * 0.9
+        shared["last_run"] = now
+        if check_deletions:
+            shared["last_deletion_check"] = now
+        self._write_shared(lock, shared)
+
+        self.running = True
+        self.runs += 1
+        self.last_run_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        try:
+            events = await asyncio.to_thread(read_events)
+            changed, live_ids = await fetch_delta(events, check_deletions)
+            if live_ids is not None:
+                self.deletion_checks += 1
+            merged, upserted, deleted = merge_events(events, changed, live_ids)
+            changes = {"fetched": len(changed), "upserted": len(upserted), "deleted": len(deleted),
+                       "deletions_checked": live_ids is not None}
+
+            if upserted or deleted:
+                await asyncio.to_thread(write_events, merged)
+                print(f"🔄 Delta sync: {len(upserted)} upserted, {len(deleted)} deleted ({len(merged)} events)")
+                if reload_fn is not None:
+                    changes["reload"] = await asyncio.to_thread(reload_fn)
+
+            self.upserted_total += len(upserted)
+            self.deleted_total += len(deleted)
+            self.watermark = watermark_of(merged)
+            self.last_changes = changes
+            self.last_error = None
+            self.last_success_at = self.last_run_at
+            return changes
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"❌ Delta sync failed: {e}")
+            raise
+        finally:
+            self.running = False
+            self.last_seconds = round(time.perf_counter() - start, 3)
+            lock.close()
+
+    def lag_seconds(self):
+        """Seconds since the start of the last successful run (how stale the store may be)"""
+        if self.last_success_at is None:
+            return None
+        return round((datetime.now(timezone.utc) - self.last_success_at).total_seconds(), 3)
+
+    def stats(self) -> dict:
+        watermark = _parse_timestamp(self.watermark) if self.watermark else None
+        return {
+            "enabled": self.enabled,
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "deletion_checks": self.deletion_checks,
+            "delete_check_every": self.delete_check_every,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_success_at": self.last_success_at.isoformat() if self.last_success_at else None,
+            "last_seconds": self.last_seconds,
+            "lag_seconds": self.lag_seconds(),
+            "watermark": self.watermark,
+            "watermark_age_seconds": (
+                round((datetime.now(timezone.utc) - watermark).total_seconds(), 3) if watermark else None
+            ),
+            "last_changes": self.last_changes,
+            "records_upserted_total": self.upserted_total,
+            "records_deleted_total": self.deleted_total,
+            "last_error": self.last_error,
+        }
+
+    def prometheus_lines(self) -> list:
+        lag = self.lag_seconds()
+        lines = [
+            "# HELP chatbot_sync_lag_seconds Seconds since the last successful delta sync started.",
+            "# TYPE chatbot_sync_lag_seconds gauge",
+            f"chatbot_sync_lag_seconds {lag if lag is not None else 'NaN'}",
+            "# HELP chatbot_sync_runs_total Delta sync runs by outcome.",
+            "# TYPE chatbot_sync_runs_total counter",
+            f'chatbot_sync_runs_total{{outcome="success"}} {self.runs - self.failures}',
+            f'chatbot_sync_runs_total{{outcome="failure"}} {self.failures}',
+            "# HELP chatbot_sync_records_changed_total Records changed by delta sync.",
+            "# TYPE chatbot_sync_records_changed_total counter",
+            f'chatbot_sync_records_changed_total{{change="upserted"}} {self.upserted_total}',
+            f'chatbot_sync_records_changed_total{{change="deleted"}} {self.deleted_total}',
+        ]
+        if self.last_run_at is not None:
+            lines += [
+                "# HELP chatbot_sync_last_run_timestamp_seconds Start of the last delta sync run.",
+                "# TYPE chatbot_sync_last_run_timestamp_seconds gauge",
+                f"chatbot_sync_last_run_timestamp_seconds {self.last_run_at.timestamp():.3f}",
+            ]
+        return lines
+
+
+DELTA_SYNC = DeltaSyncScheduler()
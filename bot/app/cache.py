@@ -1,29 +1,189 @@
-# Lightweight in-memory cache with size limits
-EVENT_CACHE = []
-EVENT_INDEX = {}
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+from types import MappingProxyType
+
+from app.eligibility import EligibilityEngine
+from app.lexical_index import LexicalIndex
+
 MAX_EVENTS = 100  # Limit number of cached events
 
-def load_event_cache(events):
+def build_context_block(scheme: dict) -> str:
+    """
+    Render the Scheme/Category/Benefit/Eligibility/Steps context for a scheme.
+    """
+    lines = [f"Scheme: {scheme.get('name', 'Unknown Scheme')}"]
+
+    category = scheme.get('category', '')
+    benefit = scheme.get('benefit', '')
+    eligibility = scheme.get('eligibility', {})
+    roadmap = scheme.get('roadmap', [])
+
+    if category:
+        lines.append(f"Category: {category}")
+    if benefit:
+        lines.append(f"Benefit: {benefit}")
+    if eligibility:
+        lines.append(f"Eligibility: {str(eligibility)}")
+    if roadmap:
+        lines.append(f"Application Steps: {len(roadmap)} steps")
+        for step in roadmap[:3]:  # First 3 steps
+            lines.append(f"  Step {step.get('step')}: {step.get('title')} - {step.get('action')}")
+
+    return "\n".join(lines) + "\n"
+
+def _lexical_documents(events):
+    """(doc_id, scheme) pairs, with the same IDs build_vector_store assigns"""
+    return [
+        (scheme.get('id', f"scheme_{idx}"), scheme)
+        for idx, scheme in enumerate(events)
+        if isinstance(scheme, dict) and 'name' in scheme
+    ]
+
+class DataSnapshot:
+    """
+    One immutable generation of everything retrieval reads: the schemes, the
+    name/id indexes, precompiled context blocks, eligibility rules, the BM25
+    index and the vector index handle. Reloads build a new snapshot and
+    publish it with a single reference swap; requests pin one for their
+    whole lifetime, so they never see a half-loaded mix.
+    """
+
+    __slots__ = ("version", "events", "event_index", "scheme_index", "context_blocks",
+                 "eligibility", "lexical", "backend", "index_version", "created_at")
+
+    def __init__(self, version, events, event_index, scheme_index, context_blocks,
+                 eligibility, lexical, backend=None, index_version=0):
+        for name, value in (
+            ("version", version), ("events", events), ("event_index", event_index),
+            ("scheme_index", scheme_index), ("context_blocks", context_blocks),
+            ("eligibility", eligibility), ("lexical", lexical), ("backend", backend),
+            ("index_version", index_version), ("created_at", datetime.now()),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DataSnapshot is immutable; publish a new one instead")
+
+    def with_vector_index(self, version, backend, index_version):
+        """Same data, another vector index (the data structures are shared, not copied)"""
+        return DataSnapshot(version, self.events, self.event_index, self.scheme_index,
+                            self.context_blocks, self.eligibility, self.lexical, backend, index_version)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "created_at": self.created_at.isoformat(),
+            "events": len(self.events),
+            "lexical_documents": len(self.lexical),
+            "vector_backend": self.backend.name if self.backend is not None else None,
+            "index_version": self.index_version,
+        }
+
+def build_snapshot(events, version: int = 0, backend=None, index_version: int = 0) -> DataSnapshot:
     """
-    Load events into memory with size limit.
+    Build every lookup structure for `events` (limited to MAX_EVENTS) off to the side.
     """
-    EVENT_CACHE.clear()
-    
-    # Limit to MAX_EVENTS
-    limited_events = events[:MAX_EVENTS] if len(events) > MAX_EVENTS else events
-    EVENT_CACHE.extend(limited_events)
+    limited_events = tuple(events[:MAX_EVENTS] if len(events) > MAX_EVENTS else events)
 
-    EVENT_INDEX.clear()
-    EVENT_INDEX.update({
+    event_index = {
         event["event_name"].lower(): event
         for event in limited_events
         if event.get("event_name")
-    })
-    
-    print(f"📦 Cached {len(EVENT_CACHE)} events (limit: {MAX_EVENTS})")
+    }
+    scheme_index = {
+        event["id"]: event
+        for event in limited_events
+        if event.get("id")
+    }
+    context_blocks = {
+        scheme_id: build_context_block(scheme)
+        for scheme_id, scheme in scheme_index.items()
+    }
+
+    return DataSnapshot(
+        version=version,
+        events=limited_events,
+        event_index=MappingProxyType(event_index),
+        scheme_index=MappingProxyType(scheme_index),
+        context_blocks=MappingProxyType(context_blocks),
+        eligibility=EligibilityEngine(limited_events),
+        lexical=LexicalIndex().build(_lexical_documents(limited_events)),
+        backend=backend,
+        index_version=index_version,
+    )
+
+_EMPTY = build_snapshot([])
+_current = _EMPTY
+_publish_lock = threading.Lock()  # orders writers; readers never take it
+
+# Snapshot pinned by the current request (carried across awaits and asyncio.to_thread)
+_PINNED = ContextVar("data_snapshot", default=None)
+
+def _publish(make):
+    """Build the next snapshot from the current one and swap it in"""
+    global _current
+    with _publish_lock:
+        snapshot = make(_current, _current.version + 1)
+        _current = snapshot
+    return snapshot
+
+def load_event_cache(events, backend=None, index_version=None):
+    """
+    Build a snapshot for `events` and publish it in one swap.
+    Without `backend` the current vector index is carried over.
+    """
+    def make(current, version):
+        return build_snapshot(
+            events,
+            version=version,
+            backend=backend if backend is not None else current.backend,
+            index_version=index_version if index_version is not None else current.index_version,
+        )
+
+    snapshot = _publish(make)
+    print(f"📦 Cached {len(snapshot.events)} events (limit: {MAX_EVENTS}, snapshot v{snapshot.version})")
+    return snapshot
+
+def attach_vector_index(backend, index_version: int):
+    """Publish the current data with another vector index (after a sync or reopen)"""
+    return _publish(lambda current, version: current.with_vector_index(version, backend, index_version))
+
+def current_snapshot() -> DataSnapshot:
+    return _current
+
+def pin_snapshot():
+    """Pin the latest snapshot to the current context; returns a token for unpin_snapshot()"""
+    return _PINNED.set(_current)
+
+def unpin_snapshot(token):
+    _PINNED.reset(token)
+
+def get_snapshot() -> DataSnapshot:
+    """The snapshot pinned by this request, or the latest one outside a request"""
+    pinned = _PINNED.get()
+    return pinned if pinned is not None else _current
 
 def get_event_by_name(name: str):
     """
     Fast O(1) lookup by event name.
     """
-    return EVENT_INDEX.get(name.lower())
+    return get_snapshot().event_index.get(name.lower())
+
+def get_scheme_by_id(scheme_id: str):
+    """
+    Fast O(1) lookup by scheme id.
+    """
+    return get_snapshot().scheme_index.get(scheme_id)
+
+def get_context_block(scheme_id: str):
+    """
+    Precompiled context block for a scheme id, or None if unknown.
+    """
+    return get_snapshot().context_blocks.get(scheme_id)
+
+def get_eligibility_engine() -> EligibilityEngine:
+    """
+    Eligibility engine compiled from the cached schemes.
+    """
+    return get_snapshot().eligibility
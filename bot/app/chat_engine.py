@@ -1,7 +1,12 @@
-from app.cache import EVENT_CACHE
-from app.rag_retriever import semantic_search
-from app.llm import generate_answer
-import re
+from app.cache import get_context_block, get_eligibility_engine, get_snapshot
+from app.eligibility import extract_profile, is_eligibility_query, format_eligibility_reply
+from app.rag_retriever import semantic_search, asemantic_search, semantic_search_batch, normalize_query
+from app.embedding_pool import EmbeddingPoolBusy
+from app.llm import generate_answer, agenerate_answer, astream_answer
+from app.intent_router import route_intent, PLEASANTRY_MIN_CONFIDENCE
+from app.singleflight import SingleFlight
+from app.metrics import timed
+import asyncio
 import random
 
 # Import analytics from main (will be set at runtime)
@@ -42,129 +47,282 @@ OUT_OF_CONTEXT_RESPONSES = [
     "I specialize in Kerala welfare schemes. Please ask about scheme eligibility, benefits, or applications!",
 ]
 
-# ---------------- HELPERS ---------------- #
-
-def is_greeting(query: str) -> bool:
-    q_lower = query.lower().strip()
-    q_norm = re.sub(r"(.)\1{2,}", r"\1\1", q_lower)
-    greeting_words = {"hi", "hello", "hey", "hai", "hii", "heyy", "hola", "greetings", "yo"}
-    words = re.findall(r"\b[a-zA-Z]+\b", q_norm)
-    return any(w in greeting_words for w in words)
-
-def is_thankyou(query: str) -> bool:
-    q_lower = query.lower().strip()
-    thanks_phrases = ["thanks", "thank you", "thankyou", "appreciate", "ty", "thx"]
-    return any(phrase in q_lower for phrase in thanks_phrases)
-
-def is_bye(query: str) -> bool:
-    q_lower = query.lower().strip()
-    bye_phrases = ["bye", "goodbye", "good bye", "see you", "see ya", "later", "cya"]
-    return any(phrase in q_lower for phrase in bye_phrases)
-
-def is_relevant_query(query: str) -> bool:
-    """Check if query is about Kerala schemes"""
-    keywords = ["scheme", "pension", "welfare", "benefit", "eligibility", "apply", 
-                "application", "kerala", "sthree", "housing", "employment", "social security",
-                "how to", "what is", "tell me", "register", "enroll"]
-    q_lower = query.lower()
-    return any(kw in q_lower for kw in keywords)
+PLEASANTRY_RESPONSES = {
+    "greeting": GREETING_RESPONSES,
+    "thankyou": THANKYOU_RESPONSES,
+    "bye": BYE_RESPONSES,
+}
+
+# Concurrent identical requests share one retrieval / one LLM call
+RETRIEVAL_FLIGHT = SingleFlight("retrieval")
+LLM_FLIGHT = SingleFlight("llm")
 
 # ---------------- MAIN CHAT ---------------- #
 
+NO_RESULTS_RESPONSE = "I don't have information about that specific scheme. Please try asking about Sthree Suraksha, Social Security Pension, Employment schemes, or Housing schemes."
+ERROR_RESPONSE = "Sorry, something went wrong. Please try again."
+
+def _route_query(query: str, analytics):
+    """
+    Answer pleasantries, eligibility checks and off-topic queries directly.
+    Returns a reply, or None when the query needs retrieval + LLM.
+    """
+    if not query:
+        return "Please ask a question."
+
+    lexical = get_snapshot().lexical
+    intent = route_intent(query, lexical.vocabulary)
+    pleasantry = PLEASANTRY_RESPONSES.get(intent.name)
+
+    # 1. Handle pleasantries
+    if pleasantry and intent.confidence >= PLEASANTRY_MIN_CONFIDENCE:
+        if analytics:
+            analytics["pattern_matches"][intent.name] += 1
+        return random.choice(pleasantry)
+
+    # 2. Profile-based eligibility questions are answered without the LLM
+    profile = extract_profile(query)
+    if is_eligibility_query(query, profile):
+        if analytics:
+            analytics["pattern_matches"]["eligibility"] += 1
+        return format_eligibility_reply(profile, get_eligibility_engine().evaluate(**profile))
+
+    # Low-confidence pleasantry ("hi, how are you doing today")
+    if pleasantry:
+        if analytics:
+            analytics["pattern_matches"][intent.name] += 1
+        return random.choice(pleasantry)
+
+    # 3. Check relevance; a message naming one scheme or its ID ("PENSION_001") is always relevant
+    if intent.name != "scheme" and lexical.exact_match(query) is None:
+        if analytics:
+            analytics["pattern_matches"]["out_of_context"] += 1
+        return random.choice(OUT_OF_CONTEXT_RESPONSES)
+
+    return None
+
+def _build_context(docs) -> str:
+    """Build LLM context from retrieved documents"""
+    context_parts = []
+    for doc in docs:
+        # For schemes, use the block precompiled at cache load time
+        scheme_id = doc.get("metadata", {}).get("scheme_id")
+        block = get_context_block(scheme_id) if scheme_id else None
+
+        # Fallback to just the text
+        context_parts.append(block if block is not None else doc.get("text", ""))
+
+    return "\n\n".join(context_parts)
+
 def chat(user_message: str) -> str:
     """
     Chat function for Kerala schemes assistant
     """
     analytics = get_analytics()
-    
+
     try:
         query = user_message.strip()
-        if not query:
-            return "Please ask a question."
-
-        # 1. Handle pleasantries
-        if is_greeting(query):
-            if analytics:
-                analytics["pattern_matches"]["greeting"] += 1
-            return random.choice(GREETING_RESPONSES)
-        
-        if is_thankyou(query):
-            if analytics:
-                analytics["pattern_matches"]["thankyou"] += 1
-            return random.choice(THANKYOU_RESPONSES)
-        
-        if is_bye(query):
-            if analytics:
-                analytics["pattern_matches"]["bye"] += 1
-            return random.choice(BYE_RESPONSES)
+        with timed("intent"):
+            reply = _route_query(query, analytics)
+        if reply is not None:
+            return reply
 
-        # 2. Check relevance
-        if not is_relevant_query(query):
-            if analytics:
-                analytics["pattern_matches"]["out_of_context"] += 1
-            return random.choice(OUT_OF_CONTEXT_RESPONSES)
-
-        # 3. Use semantic search + LLM for all scheme queries
+        # 4. Use semantic search + LLM for all scheme queries
         if analytics:
             analytics["semantic_search_calls"] += 1
-        
-        docs = semantic_search(query, top_k=3)
-        
+
+        with timed("retrieval"):
+            docs = semantic_search(query, top_k=3)
+
         if not docs:
-            return "I don't have information about that specific scheme. Please try asking about Sthree Suraksha, Social Security Pension, Employment schemes, or Housing schemes."
-        
-        # Build context from retrieved documents
-        context_parts = []
-        for doc in docs:
-            # Get the text from the document
-            text = doc.get("text", "")
-            metadata = doc.get("metadata", {})
-            
-            # For schemes, we need to get the full data from cache
-            scheme_id = metadata.get("scheme_id")
-            if scheme_id:
-                # Get full scheme data from cache
-                from app.cache import EVENT_CACHE
-                scheme = next((s for s in EVENT_CACHE if s.get('id') == scheme_id), None)
-                
-                if scheme:
-                    name = scheme.get('name', 'Unknown Scheme')
-                    category = scheme.get('category', '')
-                    benefit = scheme.get('benefit', '')
-                    eligibility = scheme.get('eligibility', {})
-                    roadmap = scheme.get('roadmap', [])
-                    
-                    context_part = f"Scheme: {name}\n"
-                    if category:
-                        context_part += f"Category: {category}\n"
-                    if benefit:
-                        context_part += f"Benefit: {benefit}\n"
-                    if eligibility:
-                        context_part += f"Eligibility: {str(eligibility)}\n"
-                    if roadmap:
-                        context_part += f"Application Steps: {len(roadmap)} steps\n"
-                        for step in roadmap[:3]:  # First 3 steps
-                            context_part += f"  Step {step.get('step')}: {step.get('title')} - {step.get('action')}\n"
-                    
-                    context_parts.append(context_part)
-                else:
-                    # Fallback to just the text
-                    context_parts.append(text)
-            else:
-                # Fallback to just the text
-                context_parts.append(text)
-        
-        context = "\n\n".join(context_parts)
-        
+            return NO_RESULTS_RESPONSE
+
+        with timed("context"):
+            context = _build_context(docs)
+
         # Generate answer using LLM
         if analytics:
             analytics["llm_calls"] += 1
-        
-        answer = generate_answer(context, query)
+
+        with timed("llm"):
+            answer = generate_answer(context, query)
         return answer
-        
+
     except Exception as e:
         print(f"❌ Chat error: {e}")
         import traceback
         traceback.print_exc()
-        return "Sorry, something went wrong. Please try again."
+        return ERROR_RESPONSE
+
+async def achat(user_message: str) -> str:
+    """
+    Async chat for the event loop: retrieval runs off the loop (worker thread
+    or embedding process pool) and the LLM call is awaited on the pooled async client. Both stages are
+    coalesced across concurrent requests asking the same thing.
+    """
+    analytics = get_analytics()
+
+    try:
+        query = user_message.strip()
+        with timed("intent"):
+            reply = _route_query(query, analytics)
+        if reply is not None:
+            return reply
+
+        if analytics:
+            analytics["semantic_search_calls"] += 1
+
+        key = normalize_query(query)
+        with timed("retrieval"):
+            docs = await RETRIEVAL_FLIGHT.do(key, lambda: asemantic_search(query, 3))
+
+        if not docs:
+            return NO_RESULTS_RESPONSE
+
+        # Same question over the same documents -> same answer
+        llm_key = (key, tuple(doc.get("id") for doc in docs))
+
+        # Context blocks are precompiled, so building it for coalesced callers is cheap
+        with timed("context"):
+            context = _build_context(docs)
+
+        async def generate():
+            if analytics:
+                analytics["llm_calls"] += 1
+            # Raise rather than return ERROR_RESPONSE: /chat/batch callers sharing this
+            # flight report the failure per item (it becomes ERROR_RESPONSE below)
+            return await agenerate_answer(context, query, raise_errors=True)
+
+        with timed("llm"):
+            return await LLM_FLIGHT.do(llm_key, generate)
+
+    except EmbeddingPoolBusy:
+        # Overloaded, not broken: let the endpoint answer 503 so clients retry
+        raise
+    except Exception as e:
+        print(f"❌ Chat error: {e}")
+        import traceback
+        traceback.print_exc()
+        return ERROR_RESPONSE
+
+async def achat_stream(user_message: str):
+    """
+    Streaming chat: yields the same events as llm.astream_answer.
+    Direct replies (pleasantries, no results) arrive as a single token event.
+    """
+    analytics = get_analytics()
+
+    try:
+        query = user_message.strip()
+        with timed("intent"):
+            reply = _route_query(query, analytics)
+        if reply is None:
+            if analytics:
+                analytics["semantic_search_calls"] += 1
+
+            with timed("retrieval"):
+                docs = await asemantic_search(query, 3)
+            if not docs:
+                reply = NO_RESULTS_RESPONSE
+
+        if reply is not None:
+            yield {"type": "token", "content": reply}
+            yield {"type": "done"}
+            return
+
+        with timed("context"):
+            context = _build_context(docs)
+
+        if analytics:
+            analytics["llm_calls"] += 1
+
+        # Time to the last token, so the histogram matches non-streaming calls
+        with timed("llm"):
+            async for event in astream_answer(context, query):
+                yield event
+
+    except Exception as e:
+        print(f"❌ Chat stream error: {e}")
+        import traceback
+        traceback.print_exc()
+        yield {"type": "error", "content": ERROR_RESPONSE}
+        yield {"type": "done"}
+
+async def achat_batch(messages, concurrency: int = 4):
+    """
+    Answer many messages in one call.
+    Intents are routed up front, retrieval-bound queries are deduplicated and
+    embedded together, and LLM calls run concurrently (at most `concurrency`
+    at a time). Returns {"reply", "error"} per message, in input order.
+    """
+    analytics = get_analytics()
+    results = [None] * len(messages)
+    pending = {}  # index -> query that needs retrieval + LLM
+
+    for i, message in enumerate(messages):
+        try:
+            query = message.strip()
+            with timed("intent"):
+                reply = _route_query(query, analytics)
+            if reply is not None:
+                results[i] = {"reply": reply, "error": None}
+            else:
+                pending[i] = query
+        except Exception as e:
+            results[i] = {"reply": None, "error": f"{type(e).__name__}: {e}"}
+
+    if not pending:
+        return results
+
+    try:
+        with timed("retrieval"):
+            docs_per_query = await asyncio.to_thread(semantic_search_batch, list(pending.values()), 3)
+    except Exception as e:
+        print(f"❌ Batch search error: {e}")
+        for i in pending:
+            results[i] = {"reply": None, "error": f"Retrieval failed: {e}"}
+        return results
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def answer(context: str, query: str) -> str:
+        async with semaphore:
+            if analytics:
+                analytics["llm_calls"] += 1
+            with timed("llm"):
+                return await agenerate_answer(context, query, raise_errors=True)
+
+    # Identical queries retrieve identical docs, so they share one LLM call
+    tasks = {}
+    waiting = {}
+    for (i, query), docs in zip(pending.items(), docs_per_query):
+        if not docs:
+            results[i] = {"reply": NO_RESULTS_RESPONSE, "error": None}
+            continue
+        key = (normalize_query(query), tuple(doc.get("id") for doc in docs))
+        if key not in tasks:
+            with timed("context"):
+                context = _build_context(docs)
+            tasks[key] = asyncio.ensure_future(
+                LLM_FLIGHT.do(key, lambda context=context, query=query: answer(context, query))
+            )
+        waiting[i] = tasks[key]
+
+    if analytics:
+        analytics["semantic_search_calls"] += len(pending)
+
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    for i, task in waiting.items():
+        error = task.exception()
+        if error is not None:
+            results[i] = {"reply": None, "error": f"LLM call failed: {error}"}
+        else:
+            results[i] = {"reply": task.result(), "error": None}
+
+    return results
+
+def get_coalescing_stats() -> dict:
+    return {
+        "retrieval": RETRIEVAL_FLIGHT.stats(),
+        "llm": LLM_FLIGHT.stats(),
+    }
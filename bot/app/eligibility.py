@@ -0,0 +1,213 @@
+import re
+import numpy as np
+
+# Eligibility fields evaluated by the engine; everything else is reported
+# back as an extra criterion the user must verify themselves.
+RULE_FIELDS = ("min_age", "max_age", "gender", "income_max", "ration_card")
+
+GENDER_ALIASES = {
+    "female": "female", "woman": "female", "women": "female", "lady": "female",
+    "girl": "female", "mother": "female", "widow": "female", "f": "female",
+    "male": "male", "man": "male", "men": "male", "boy": "male", "father": "male", "m": "male",
+    "transgender": "transgender", "trans": "transgender",
+}
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _normalize_gender(value: str) -> str:
+    value = str(value).strip().lower()
+    return GENDER_ALIASES.get(value, value)
+
+
+class EligibilityEngine:
+    """
+    Scheme eligibility rules compiled into columnar arrays.
+    A profile is checked against every scheme in one vectorized pass; set
+    membership (gender, ration card) is a bitmask test.
+    """
+
+    def __init__(self, schemes):
+        # Records without eligibility rules (synced events) are not schemes one qualifies for
+        schemes = [s for s in schemes if isinstance(s, dict) and s.get("id") and isinstance(s.get("eligibility"), dict)]
+        n = len(schemes)
+        self.schemes = schemes
+
+        self.min_age = np.full(n, -np.inf)
+        self.max_age = np.full(n, np.inf)
+        self.income_max = np.full(n, np.inf)
+        self.gender_mask = np.zeros(n, dtype=np.uint64)  # 0 = no restriction
+        self.ration_mask = np.zeros(n, dtype=np.uint64)
+        self.extra_criteria = []
+
+        self.gender_bits = {}
+        self.ration_bits = {}
+
+        for i, scheme in enumerate(schemes):
+            rules = scheme.get("eligibility") or {}
+            if rules.get("min_age") is not None:
+                self.min_age[i] = rules["min_age"]
+            if rules.get("max_age") is not None:
+                self.max_age[i] = rules["max_age"]
+            if rules.get("income_max") is not None:
+                self.income_max[i] = rules["income_max"]
+            for gender in _as_list(rules.get("gender")):
+                self.gender_mask[i] |= self._bit(self.gender_bits, _normalize_gender(gender))
+            for card in _as_list(rules.get("ration_card")):
+                self.ration_mask[i] |= self._bit(self.ration_bits, str(card).strip().lower())
+            self.extra_criteria.append({k: v for k, v in rules.items() if k not in RULE_FIELDS})
+
+        self.has_age_rule = np.isfinite(self.min_age) | np.isfinite(self.max_age)
+        self.has_income_rule = np.isfinite(self.income_max)
+
+    @staticmethod
+    def _bit(vocab: dict, value: str) -> np.uint64:
+        if value not in vocab:
+            if len(vocab) >= 64:
+                raise ValueError("Too many distinct values for a 64-bit eligibility mask")
+            vocab[value] = len(vocab)
+        return np.uint64(1 << vocab[value])
+
+    @staticmethod
+    def _member(mask, vocab: dict, value: str):
+        bit = np.uint64(1 << vocab[value]) if value in vocab else np.uint64(0)
+        return (mask == 0) | ((mask & bit) != 0)
+
+    def evaluate(self, age=None, income=None, gender=None, ration_card=None):
+        """
+        Schemes the profile may qualify for. Missing profile fields are not
+        filtered on; they are listed per scheme under "to_verify".
+        """
+        ok = np.ones(len(self.schemes), dtype=bool)
+        if age is not None:
+            ok &= (self.min_age <= age) & (age <= self.max_age)
+        if income is not None:
+            ok &= income <= self.income_max
+        if gender:
+            ok &= self._member(self.gender_mask, self.gender_bits, _normalize_gender(gender))
+        if ration_card:
+            ok &= self._member(self.ration_mask, self.ration_bits, str(ration_card).strip().lower())
+
+        results = []
+        for i in np.flatnonzero(ok):
+            scheme = self.schemes[i]
+            to_verify = [
+                f"{k.replace('_', ' ')}: {' or '.join(map(str, _as_list(v)))}"
+                for k, v in self.extra_criteria[i].items()
+            ]
+            if age is None and self.has_age_rule[i]:
+                to_verify.append("age")
+            if income is None and self.has_income_rule[i]:
+                to_verify.append("income")
+            if not gender and self.gender_mask[i]:
+                to_verify.append("gender")
+            if not ration_card and self.ration_mask[i]:
+                to_verify.append("ration card")
+            results.append({
+                "id": scheme["id"],
+                "name": scheme.get("name", ""),
+                "category": scheme.get("category", ""),
+                "benefit": scheme.get("benefit", ""),
+                "to_verify": to_verify,
+            })
+        return results
+
+
+# ---------------- PROFILE EXTRACTION ---------------- #
+
+# "N years" alone is not an age ("5 years of service"): it needs "old", "age(d)" or "I am N"
+_AGE_PATTERNS = [
+    re.compile(r"\b(\d{1,3})[\s-]*(?:years?|yrs?)[\s-]*old\b"),
+    re.compile(r"\bage(?:d)?\s*(?:is\s*|of\s*|:\s*)?(\d{1,3})\b"),
+    re.compile(r"\bi(?:'m| am)\s+(\d{1,3})\b(?!\s*(?:years?|yrs?)\s+(?!old\b)\w)"),
+]
+_INCOME_PATTERN = re.compile(
+    r"\b(?:income|earn(?:s|ing)?|salary|make)\b[^\d₹]{0,20}(?:₹|rs\.?|inr)?\s*"
+    r"(\d[\d,]*(?:\.\d+)?)\s*(lakhs?|lacs?|k|thousand)?(?:\s*(?:per|a|/)\s*(month|year|annum))?"
+)
+_MONTHLY_PATTERN = re.compile(r"\bmonthly\b")
+# Gender only from first-person phrasing ("I am a widow", "as a single mother",
+# "gender: female"), not from the schemes being asked about ("schemes for mothers")
+_GENDER_PATTERN = re.compile(
+    r"(?:\b(?:i am|i'm|im)\s+(?:an?\s+)?|\bas\s+an?\s+|\bgender\s*(?:is\s*|:\s*)?)"
+    r"(?:(?:single|young|old|elderly|poor|working|unemployed|disabled|\d{1,3}[\s-]*(?:years?|yrs?)[\s-]*old)[\s,]+)*"
+    r"(" + "|".join(a for a in GENDER_ALIASES if len(a) > 1) + r")\b"
+)
+_RATION_PATTERN = re.compile(r"\b(yellow|pink|blue|white)\s+(?:ration\s+)?card\b")
+_ASK_PATTERN = re.compile(
+    r"\b(eligible|eligibility|qualify|which schemes?|what schemes?|can i (?:get|apply)|am i)\b"
+)
+_MULTIPLIERS = {"lakh": 100000, "lakhs": 100000, "lac": 100000, "lacs": 100000,
+                "k": 1000, "thousand": 1000}
+
+
+def extract_profile(query: str) -> dict:
+    """Pull age / income / gender / ration card facts out of a free-text query"""
+    q = query.lower()
+    profile = {}
+
+    for pattern in _AGE_PATTERNS:
+        match = pattern.search(q)
+        if match and 0 < int(match.group(1)) < 120:
+            profile["age"] = int(match.group(1))
+            break
+
+    match = _INCOME_PATTERN.search(q)
+    if match:
+        income = float(match.group(1).replace(",", "")) * _MULTIPLIERS.get(match.group(2) or "", 1)
+        if match.group(3) == "month" or _MONTHLY_PATTERN.search(q):
+            income *= 12  # Scheme limits are annual
+        profile["income"] = income
+
+    match = _GENDER_PATTERN.search(q)
+    if match:
+        profile["gender"] = GENDER_ALIASES[match.group(1)]
+
+    match = _RATION_PATTERN.search(q)
+    if match:
+        profile["ration_card"] = match.group(1)
+
+    return profile
+
+
+def is_eligibility_query(query: str, profile: dict) -> bool:
+    """
+    Answer from the engine only when the user describes themselves and asks
+    what they qualify for. Other questions that happen to contain facts
+    ("pension for widows above 60 years old") go through retrieval.
+    """
+    if not any(key in profile for key in ("age", "income", "gender")):
+        return False
+    return bool(_ASK_PATTERN.search(query.lower()))
+
+
+def format_eligibility_reply(profile: dict, results) -> str:
+    """Render engine results as a chat reply"""
+    facts = []
+    if "age" in profile:
+        facts.append(f"age {profile['age']}")
+    if "gender" in profile:
+        facts.append(profile["gender"])
+    if "income" in profile:
+        facts.append(f"annual income ₹{profile['income']:,.0f}")
+    if "ration_card" in profile:
+        facts.append(f"{profile['ration_card']} ration card")
+    described = ", ".join(facts)
+
+    if not results:
+        return (f"Based on what you told me ({described}), I couldn't find a Kerala scheme you qualify for. "
+                "Ask me about a specific scheme to see its full eligibility rules.")
+
+    lines = [f"Based on what you told me ({described}), you may be eligible for:", ""]
+    for r in results:
+        line = f"• **{r['name']}** — {r['benefit']}"
+        if r["to_verify"]:
+            line += f" (also check: {', '.join(r['to_verify'])})"
+        lines.append(line)
+    lines.append("")
+    lines.append("Ask me how to apply for any of these schemes!")
+    return "\n".join(lines)
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import threading
+
+# Micro-batching configuration (window 0 = disabled, the default: every query is encoded on its own).
+# A window adds up to that much latency to a lone query in exchange for shared model calls under
+# concurrency; a few ms pays off only when several queries are regularly in flight at once.
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "0"))
+EMBEDDING_BATCH_MAX = int(os.getenv("EMBEDDING_BATCH_MAX", "16"))
+
+# Batch-size histogram buckets (upper bounds, Prometheus-style `le`)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class MicroBatcher:
+    """
+    Collects texts submitted within `window_ms` (or until `max_batch` are
+    waiting) and encodes them in one call to `encode_fn`, handing each caller
+    its own vector. While `concurrency()` batches are already encoding, new
+    arrivals keep accumulating and go out as soon as one finishes, so batches
+    grow with load instead of queueing single-item calls.
+    """
+
+    def __init__(self, encode_fn, window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+                 max_batch: int = EMBEDDING_BATCH_MAX, concurrency=lambda: 1):
+        self.encode_fn = encode_fn
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.concurrency = concurrency
+        self._loop = None
+        self._pending = []   # (text, future) waiting for the next batch
+        self._timer = None
+        self._inflight = 0
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.deduplicated = 0
+        self.failures = 0
+        self.size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def _bind_loop(self):
+        # State belongs to one event loop (a new loop, e.g. in tests, starts clean)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+            self._inflight = 0
+        return loop
+
+    async def embed(self, text: str):
+        """Embedding for one text, encoded together with concurrent callers"""
+        loop = self._bind_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._on_timer)
+        return await future
+
+    def _on_timer(self):
+        self._timer = None
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending and self._inflight < max(1, self.concurrency()):
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            self._inflight += 1
+            self._loop.create_task(self._run(batch))
+
+    async def _run(self, batch):
+        # Identical texts in one batch are encoded once
+        unique = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = await self.encode_fn(unique)
+        except Exception as e:
+            self.failures += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            by_text = dict(zip(unique, embeddings))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+            self._record(len(batch), len(batch) - len(unique))
+        finally:
+            self._inflight -= 1
+            if self._pending:
+                # Whatever arrived while this batch was encoding goes out now
+                self._flush()
+
+    def _record(self, size: int, duplicates: int):
+        index = next((i for i, bound in enumerate(BATCH_SIZE_BUCKETS) if size <= bound), len(BATCH_SIZE_BUCKETS))
+        with self._stats_lock:
+            self.batches += 1
+            self.items += size
+            self.deduplicated += duplicates
+            self.size_counts[index] += 1
+
+    def stats(self) -> dict:
+        labels = [str(bound) for bound in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "items": self.items,
+            "deduplicated": self.deduplicated,
+            "failures": self.failures,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+            "batch_size_le": dict(zip(labels, self.size_counts)),
+            "queued": len(self._pending),
+            "in_flight": self._inflight,
+        }
+
+    def prometheus_lines(self, name: str = "chatbot_embedding_batch_size") -> list:
+        """Batch-size distribution as a Prometheus histogram"""
+        lines = [
+            f"# HELP {name} Queries per embedding model call (micro-batching).",
+            f"# TYPE {name} histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(BATCH_SIZE_BUCKETS, self.size_counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.batches}')
+        lines.append(f"{name}_sum {self.items}")
+        lines.append(f"{name}_count {self.batches}")
+        return lines
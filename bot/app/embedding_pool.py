@@ -0,0 +1,162 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.metrics import LatencyHistogram
+
+# Embedding worker pool configuration (0 processes = encode inline, the default)
+EMBEDDING_POOL_SIZE = int(os.getenv("EMBEDDING_POOL_SIZE", "0"))
+EMBEDDING_QUEUE_SIZE = int(os.getenv("EMBEDDING_QUEUE_SIZE", "32"))       # pending jobs before rejecting
+EMBEDDING_TIMEOUT = float(os.getenv("EMBEDDING_TIMEOUT", "5"))            # seconds to wait for a result
+
+
+class EmbeddingPoolBusy(RuntimeError):
+    """The pool queue is full or a job timed out; callers should shed the request"""
+
+
+def _init_worker():
+    # Each pool process loads its own encoder once (same EMBEDDING_* settings as the server)
+    from app.vector_store import get_embedding_function
+    get_embedding_function()
+
+
+def _encode(texts):
+    """Runs in a pool process; returns (embeddings, seconds spent encoding)"""
+    from app.vector_store import get_embedding_function
+    start = time.perf_counter()
+    embeddings = get_embedding_function().encode(texts, show_progress_bar=False, convert_to_numpy=True)
+    return embeddings, time.perf_counter() - start
+
+
+class EmbeddingPool:
+    """
+    Query encoding in separate processes, so CPU-bound inference never holds
+    the server's GIL. Jobs beyond `queue_size` are rejected instead of piling
+    up, and callers stop waiting after `timeout`. Processes are started with
+    `spawn` (torch and ONNX Runtime thread pools do not survive fork()).
+    """
+
+    def __init__(self, size: int = EMBEDDING_POOL_SIZE, queue_size: int = EMBEDDING_QUEUE_SIZE,
+                 timeout: float = EMBEDDING_TIMEOUT):
+        self.size = size
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.max_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.last_error = None
+        self.service_time = LatencyHistogram()  # encode time inside the worker
+        self.wait_time = LatencyHistogram()     # queueing + IPC overhead
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self):
+        """Spawn the processes and load the encoder in each (blocks until warm)"""
+        if not self.enabled:
+            return
+        executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        try:
+            # One job per process forces all of them up (the executor spawns lazily)
+            warmups = [executor.submit(_encode, ["warm up"]) for _ in range(self.size)]
+            for future in warmups:
+                future.result()
+        except Exception as e:
+            # Degrade to inline encoding rather than failing the server
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Embedding pool failed to start, encoding inline: {e}")
+            executor.shutdown(wait=False, cancel_futures=True)
+            return
+        with self._lock:
+            self._executor = executor
+        print(f"✅ Embedding pool ready ({self.size} processes)")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _job_done(self, future):
+        # Runs when the job really finishes (or is cancelled before starting), so
+        # queue_depth counts work the processes still owe, including abandoned jobs
+        with self._lock:
+            self.pending -= 1
+
+    async def encode(self, texts):
+        """Encode `texts` in the pool; raises EmbeddingPoolBusy when saturated or slow"""
+        with self._lock:
+            if self.pending >= self.queue_size:
+                self.rejected += 1
+                raise EmbeddingPoolBusy(f"Embedding queue full ({self.pending} pending)")
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+            self.submitted += 1
+
+        start = time.perf_counter()
+        try:
+            try:
+                job = self._executor.submit(_encode, list(texts))
+            except BaseException:
+                self._job_done(None)
+                raise
+            job.add_done_callback(self._job_done)
+            embeddings, service_s = await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise EmbeddingPoolBusy(f"Embedding timed out after {self.timeout}s")
+        except BrokenProcessPool as e:
+            # A process died (e.g. OOM-killed): stop using the pool, callers fall back inline
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"❌ Embedding pool broken, falling back to inline encoding: {e}")
+            self.shutdown()
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+
+        self.completed += 1
+        self.service_time.record(service_s)
+        self.wait_time.record(max(0.0, time.perf_counter() - start - service_s))
+        return embeddings
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "started": self.started,
+            "processes": self.size,
+            "queue_depth": self.pending,
+            "max_queue_depth": self.max_pending,
+            "queue_limit": self.queue_size,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "service_ms": self.service_time.summary_ms(),
+            "wait_ms": self.wait_time.summary_ms(),
+        }
+
+
+EMBEDDING_POOL = EmbeddingPool()
@@ -0,0 +1,149 @@
+import hashlib
+import os
+
+import numpy as np
+
+# ⚡ LIGHTWEIGHT: Use all-MiniLM-L6-v2 (22MB model, very efficient)
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Embedding backend: "torch" (fp32), "torch-int8" (dynamic int8 quantization)
+# or "onnx" (ONNX Runtime, model exported with scripts/export_onnx_model.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_PATH = os.getenv("EMBEDDING_ONNX_PATH", "models/minilm-onnx")
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "2"))
+EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", "128"))  # Shorter context
+# With a data snapshot covering the index, load the model on the first query that needs it
+LAZY_EMBEDDING_MODEL = os.getenv("LAZY_EMBEDDING_MODEL", "true").lower() in ("1", "true", "yes")
+
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx")
+
+
+def _onnx_model_file(path: str) -> str:
+    return path if path.endswith(".onnx") else os.path.join(path, "model.onnx")
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+_signatures = {}
+
+def embedding_signature(backend: str = None, onnx_path: str = None) -> str:
+    """
+    Identifies which model produced an embedding, e.g. "torch-int8:all-MiniLM-L6-v2:128".
+    Stored in document content hashes so switching backends re-embeds the index
+    instead of mixing vectors from different models. Does not load the model.
+    """
+    backend = backend or EMBEDDING_BACKEND
+    onnx_path = onnx_path or EMBEDDING_ONNX_PATH
+    key = (backend, onnx_path)
+    if key not in _signatures:
+        model = MODEL_NAME.rsplit("/", 1)[-1]
+        if backend == "onnx":
+            model_file = _onnx_model_file(onnx_path)
+            model = f"{os.path.basename(os.path.dirname(os.path.abspath(model_file)))}@"
+            model += _file_digest(model_file) if os.path.exists(model_file) else "missing"
+        _signatures[key] = f"{backend}:{model}:{EMBEDDING_MAX_SEQ_LENGTH}"
+    return _signatures[key]
+
+
+class OnnxEmbedder:
+    """
+    Sentence embeddings from an ONNX-exported MiniLM via ONNX Runtime.
+    Mirrors the sentence-transformers pipeline (mean pooling + L2 normalize)
+    and its encode() signature, so it is a drop-in for SentenceTransformer.
+    Expects `model.onnx` and `tokenizer.json` in `path`.
+    """
+
+    def __init__(self, path: str = EMBEDDING_ONNX_PATH, max_seq_length: int = EMBEDDING_MAX_SEQ_LENGTH,
+                 threads: int = EMBEDDING_THREADS):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = _onnx_model_file(path)
+        model_dir = os.path.dirname(model_file)
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(
+                f"ONNX model not found at {model_file}. Export one with: "
+                f"python scripts/export_onnx_model.py --output {model_dir}"
+            )
+
+        self.max_seq_length = max_seq_length
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()  # pad to the longest sentence in each batch
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _embed_batch(self, sentences) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(sentences)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalize
+        mask = attention_mask[..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        if not sentences:
+            dim = self.session.get_outputs()[0].shape[-1]
+            return np.zeros((0, dim if isinstance(dim, int) else 0), dtype=np.float32)
+
+        # Length-sorted batches keep padding small (as sentence-transformers does)
+        order = sorted(range(len(sentences)), key=lambda i: -len(sentences[i]))
+        embeddings = [None] * len(sentences)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            for i, vector in zip(batch, self._embed_batch([sentences[i] for i in batch])):
+                embeddings[i] = vector
+
+        result = np.stack(embeddings).astype(np.float32)
+        return result[0] if single else result
+
+
+def _load_torch_model(int8: bool, threads: int):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    # Use CPU and reduce threads to prevent crashes
+    model = SentenceTransformer(MODEL_NAME, device='cpu')
+    # Reduce model memory footprint
+    model.max_seq_length = EMBEDDING_MAX_SEQ_LENGTH
+
+    if int8:
+        # Linear layers dominate MiniLM inference; int8 weights, fp32 activations
+        quantization = torch.ao.quantization if hasattr(torch, "ao") else torch.quantization
+        quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+def load_embedding_model(backend: str = None, onnx_path: str = None, threads: int = EMBEDDING_THREADS):
+    """Load an encoder exposing SentenceTransformer.encode() for the given backend"""
+    backend = backend or EMBEDDING_BACKEND
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}' (expected one of {list(EMBEDDING_BACKENDS)})")
+
+    if backend == "onnx":
+        return OnnxEmbedder(onnx_path or EMBEDDING_ONNX_PATH, threads=threads)
+    return _load_torch_model(int8=(backend == "torch-int8"), threads=threads)
@@ -0,0 +1,119 @@
+import re
+from typing import NamedTuple
+
+# ---------------- INTENT TABLE ---------------- #
+# Pleasantry phrases tolerate stretched letters ("hiiii", "byeee").
+# Scheme keywords tolerate a plural "s". Everything matches on word boundaries.
+# Scheme names come from the loaded dataset (see route_intent's `vocabulary`).
+
+PLEASANTRY_INTENTS = ("greeting", "thankyou", "bye")
+
+INTENT_PHRASES = {
+    "greeting": [
+        "hi", "hello", "hey", "hai", "hola", "greetings", "yo",
+        "good morning", "good afternoon", "good evening", "namaste", "namaskaram",
+    ],
+    "thankyou": [
+        "thanks", "thank you", "thankyou", "thanks a lot", "appreciate", "appreciate it",
+        "ty", "thx", "tysm",
+    ],
+    "bye": [
+        "bye", "goodbye", "good bye", "bye bye", "see you", "see ya", "later", "cya", "take care",
+    ],
+    "scheme": [
+        "scheme", "pension", "welfare", "benefit", "eligibility", "eligible", "apply", "applying",
+        "application", "kerala", "housing", "employment", "social security",
+        "how to", "what is", "tell me",
+        "register", "registration", "enroll", "enrol", "enrollment", "document",
+    ],
+}
+
+# Pleasantries below this share of the message yield to other routes
+# (e.g. "hi, I'm a 45 year old woman earning 1 lakh")
+PLEASANTRY_MIN_CONFIDENCE = 0.5
+
+
+class Intent(NamedTuple):
+    name: str          # greeting | thankyou | bye | scheme | out_of_context | empty
+    confidence: float  # 0.0 - 1.0
+
+
+def _phrase_atoms(phrase: str, stretch: bool):
+    """Split a phrase into regex atoms (one per letter) for the trie"""
+    atoms = []
+    for i, word in enumerate(phrase.lower().split()):
+        if i:
+            atoms.append(r"\s+")
+        atoms.extend(re.escape(c) + ("+" if stretch else "") for c in word)
+    if not stretch:
+        atoms.append("s?")
+    return atoms
+
+
+def _trie_pattern(sequences) -> str:
+    """
+    Factor phrases into a prefix trie and emit it as one regex, so shared
+    prefixes ("h" in hi/hey/hello) are tried once instead of per phrase.
+    """
+    trie = {}
+    for atoms in sequences:
+        node = trie
+        for atom in atoms:
+            node = node.setdefault(atom, {})
+        node[""] = {}
+
+    def emit(node) -> str:
+        branches = [atom + emit(child) for atom, child in sorted(node.items()) if atom]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+def _compile(table: dict):
+    groups = []
+    for intent, phrases in table.items():
+        stretch = intent in PLEASANTRY_INTENTS
+        body = _trie_pattern(_phrase_atoms(p, stretch) for p in phrases)
+        groups.append(rf"(?P<{intent}>{body}\b)")
+    # Catch-all so the same pass also counts the remaining words
+    groups.append(r"(?P<other>\w+)")
+    # Only attempt matches at word starts
+    return re.compile(r"(?=\w)\b(?:" + "|".join(groups) + ")", re.IGNORECASE)
+
+
+_ROUTER = _compile(INTENT_PHRASES)
+
+
+def route_intent(query: str, vocabulary=frozenset()) -> Intent:
+    """
+    Classify a message in one regex pass.
+
+    Any scheme keyword, or any word in `vocabulary` (scheme name words and
+    IDs from the loaded dataset, LexicalIndex.vocabulary), makes it a scheme
+    query (a leading "hi" or trailing "thanks" doesn't hide the question). Otherwise the pleasantry matched
+    most often wins; its confidence is its share of the message's
+    tokens (a multi-word phrase such as "thank you" is one token).
+    """
+    counts = {"greeting": 0, "thankyou": 0, "bye": 0, "scheme": 0, "other": 0}
+    for match in _ROUTER.finditer(query):
+        group = match.lastgroup
+        if group == "other" and match.group().lower() in vocabulary:
+            group = "scheme"
+        counts[group] += 1
+
+    scheme_hits = counts["scheme"]
+    if scheme_hits:
+        return Intent("scheme", min(1.0, 0.5 + 0.25 * scheme_hits))
+
+    total = counts["other"] + counts["greeting"] + counts["thankyou"] + counts["bye"]
+    if total == 0:
+        return Intent("empty", 1.0)
+
+    best = max(PLEASANTRY_INTENTS, key=counts.__getitem__)
+    if counts[best]:
+        return Intent(best, round(counts[best] / total, 3))
+
+    return Intent("out_of_context", 1.0)
@@ -1,6 +1,11 @@
 import json
+import os
 
-def load_events_from_json(filepath: str = "data/kerala_schemes.json"):
+DEFAULT_SCHEMES_PATH = "data/kerala_schemes.json"
+# Written by the Appwrite/Firestore sync (see app.appwrite_sync)
+SYNCED_EVENTS_PATH = os.getenv("SYNC_OUTPUT_FILE", "data/events.json")
+
+def load_events_from_json(filepath: str = DEFAULT_SCHEMES_PATH):
     """Load schemes/events with error handling"""
     try:
         with open(filepath, "r", encoding="utf-8") as f:
@@ -24,3 +29,50 @@ def load_events_from_json(filepath: str = "data/kerala_schemes.json"):
     except Exception as e:
         print(f"❌ Error loading schemes: {e}")
         return []
+
+
+def event_to_scheme(record: dict) -> dict:
+    """
+    Synced Appwrite event record (see appwrite_sync.to_event) in the scheme
+    schema that the cache, BM25 index and vector index read. Event fields
+    are kept; records that already have a name are returned unchanged.
+    """
+    if record.get("name") or not record.get("event_name"):
+        return record
+    details = [
+        record.get("details"),
+        f"Fest: {record['fest']}" if record.get("fest") else None,
+        f"Venue: {record['venue']}" if record.get("venue") else None,
+        f"Date: {record['date']}" if record.get("date") else None,
+        f"Time: {record['time']}" if record.get("time") else None,
+        f"Fee: {record['amount']}" if record.get("amount") not in (None, "") else None,
+        f"Coordinator: {record['coordinator']}" if record.get("coordinator") else None,
+        f"Phone: {record['phone_number']}" if record.get("phone_number") else None,
+    ]
+    return {
+        **record,
+        "id": record.get("id") or record.get("$id"),
+        "name": record["event_name"],
+        "category": record.get("category") or "Event",
+        "benefit": ". ".join(str(part) for part in details if part),
+    }
+
+
+def load_synced_events(path: str = SYNCED_EVENTS_PATH):
+    """Records from the sync output in the scheme schema; [] before the first sync"""
+    if not os.path.exists(path):
+        return []
+    return [event_to_scheme(record) for record in load_events_from_json(path) if isinstance(record, dict)]
+
+
+def load_all_events(filepath: str = DEFAULT_SCHEMES_PATH, synced_path: str = SYNCED_EVENTS_PATH):
+    """
+    The schemes file plus the synced records. The curated schemes file wins
+    when both have a record with the same ID.
+    """
+    schemes = load_events_from_json(filepath)
+    synced = load_synced_events(synced_path)
+    if not synced:
+        return schemes
+    ids = {s.get("id") for s in schemes if isinstance(s, dict)}
+    return list(schemes) + [record for record in synced if record.get("id") not in ids]
@@ -0,0 +1,148 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Field weights (a term in the scheme name counts three times)
+FIELD_WEIGHTS = {"name": 3, "id": 1, "category": 1, "benefit": 1, "roadmap": 1}
+
+_TOKEN = re.compile(r"\w+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "about", "can", "do", "for", "from", "get", "how", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "s", "the", "to", "what", "which", "who", "with",
+}
+
+# Words too common in scheme names to identify one on their own
+GENERIC_NAME_WORDS = {
+    "scheme", "schemes", "pension", "pensions", "yojana", "kerala", "government", "govt",
+    "state", "programme", "program", "project", "assistance", "welfare",
+}
+
+# A lone name word identifies a scheme only if it is this long and in no other document
+MIN_UNIQUE_TOKEN_LENGTH = 8
+
+
+def tokenize(text: str):
+    return [t for t in _TOKEN.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+def _scheme_fields(scheme: dict) -> dict:
+    roadmap = " ".join(
+        f"{step.get('title', '')} {step.get('action', '')}"
+        for step in scheme.get("roadmap", []) if isinstance(step, dict)
+    )
+    return {
+        "name": scheme.get("name", ""),
+        "id": scheme.get("id", ""),
+        "category": scheme.get("category", ""),
+        "benefit": scheme.get("benefit", ""),
+        "roadmap": roadmap,
+    }
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over scheme name, ID, category, benefit and roadmap.
+    Also keeps a phrase table of scheme names so a query that names exactly
+    one scheme (or contains its ID) can skip embedding altogether.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.postings = {}      # term -> [(doc index, weighted tf)]
+        self.idf = {}
+        self.doc_lengths = []
+        self.avg_length = 0.0
+        self.norms = []         # per-document BM25 length normalization
+        self.name_phrases = {}  # name n-gram -> {doc index}
+        self.id_lookup = {}     # lowercased scheme id -> doc index
+        self.vocabulary = frozenset()  # distinctive scheme name words and lowercased IDs
+
+    def build(self, documents):
+        """documents: iterable of (doc_id, scheme dict)"""
+        postings = defaultdict(list)
+        ids, lengths = [], []
+        name_tokens = []
+
+        for doc_id, scheme in documents:
+            index = len(ids)
+            ids.append(doc_id)
+            counts = Counter()
+            for field, text in _scheme_fields(scheme).items():
+                for token in tokenize(text):
+                    counts[token] += FIELD_WEIGHTS[field]
+            for token, tf in counts.items():
+                postings[token].append((index, tf))
+            lengths.append(sum(counts.values()))
+            name_tokens.append([t for t in tokenize(scheme.get("name", "")) if t not in GENERIC_NAME_WORDS])
+
+        n = len(ids)
+        self.ids = ids
+        self.postings = dict(postings)
+        self.idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in postings.items()}
+        self.doc_lengths = lengths
+        self.avg_length = (sum(lengths) / n) if n else 0.0
+        self.norms = [
+            BM25_K1 * (1 - BM25_B + BM25_B * (length / self.avg_length if self.avg_length else 0.0))
+            for length in lengths
+        ]
+        self.id_lookup = {str(doc_id).lower(): i for i, doc_id in enumerate(ids)}
+        self.vocabulary = frozenset(t for tokens in name_tokens for t in tokens) | frozenset(self.id_lookup)
+
+        phrases = defaultdict(set)
+        for index, tokens in enumerate(name_tokens):
+            for a, b in zip(tokens, tokens[1:]):
+                phrases[f"{a} {b}"].add(index)
+            for token in tokens:
+                if len(token) >= MIN_UNIQUE_TOKEN_LENGTH and len(self.postings.get(token, ())) == 1:
+                    phrases[token].add(index)
+        self.name_phrases = dict(phrases)
+        return self
+
+    def search(self, query: str, top_k: int):
+        """[(doc_id, bm25 score)] best first; empty when no term matches"""
+        scores = defaultdict(float)
+        norms = self.norms
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            weight = idf * (BM25_K1 + 1)
+            for index, tf in self.postings[token]:
+                scores[index] += weight * tf / (tf + norms[index])
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(self.ids[index], score) for index, score in best]
+
+    def exact_match(self, query: str):
+        """Scheme ID if the query contains one scheme's ID or names exactly one scheme"""
+        raw_tokens = _TOKEN.findall(query.lower())
+        for token in raw_tokens:
+            if token in self.id_lookup:
+                return self.ids[self.id_lookup[token]]
+
+        tokens = [t for t in raw_tokens if t not in STOPWORDS and t not in GENERIC_NAME_WORDS]
+        matched = set()
+        for a, b in zip(tokens, tokens[1:]):
+            matched |= self.name_phrases.get(f"{a} {b}", set())
+        for token in tokens:
+            matched |= self.name_phrases.get(token, set())
+        if len(matched) == 1:
+            return self.ids[next(iter(matched))]
+        return None
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def reciprocal_rank_fusion(rankings, k: int = 60):
+    """Fuse ranked ID lists: score(id) = sum of 1 / (k + rank); best first"""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
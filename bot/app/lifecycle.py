@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+import traceback
+from datetime import datetime
+
+# Warm-up configuration
+WARMUP_QUERY = os.getenv("WARMUP_QUERY", "pension scheme eligibility")
+
+# Components warmed in the background, in order; required ones must be ready for /readyz
+COMPONENTS = ("data", "vector_backend", "embedding_model", "vector_index", "warmup", "embedding_pool")
+# Retrieval works without these (cold first query, inline encoding); a failure only degrades
+OPTIONAL_COMPONENTS = ("warmup", "embedding_pool")
+
+
+class Lifecycle:
+    """
+    Tracks startup of the heavy components so the port can answer at once.
+    Schemes are loaded synchronously (milliseconds); the vector backend,
+    embedding model, index sync and a warm-up query run on a background
+    thread. When the data snapshot already holds the index vectors, the model
+    is "deferred" until the first query that needs it (LAZY_EMBEDDING_MODEL).
+    Liveness only needs the process; readiness needs every required component
+    ready or deferred. An optional step that fails is reported as "degraded".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.started_at = None
+        self.ready_at = None
+        self.components = {
+            name: {"state": "pending", "seconds": None, "error": None,
+                   "required": name not in OPTIONAL_COMPONENTS}
+            for name in COMPONENTS
+        }
+
+    def _run_step(self, name: str, fn):
+        component = self.components[name]
+        component["state"] = "loading"
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            component["state"] = "failed"
+            component["error"] = f"{type(e).__name__}: {e}"
+            if not component["required"]:
+                print(f"⚠️ Optional startup step '{name}' failed: {e}; continuing degraded")
+                return None
+            print(f"❌ Startup step '{name}' failed: {e}")
+            traceback.print_exc()
+            raise
+        component["seconds"] = round(time.perf_counter() - start, 3)
+        component["state"] = "ready"
+        return result
+
+    def _defer(self, name: str):
+        self.components[name]["state"] = "deferred"
+
+    def load_data(self, load_fn):
+        """Run the (fast) synchronous data step; returns its result"""
+        self.started_at = datetime.now()
+        return self._run_step("data", load_fn)
+
+    def start_background(self, events):
+        """Warm the heavy components on a daemon thread (once)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._warm, args=(events,), name="lifecycle-warmup", daemon=True
+            )
+            self._thread.start()
+
+    def _warm(self, events):
+        # Heavy imports (chromadb, torch, sentence_transformers) happen here, off the import path
+        from app.vector_store import build_vector_store, get_embedding_function, get_index_version, get_vector_backend
+        from app.embedding_pool import EMBEDDING_POOL
+        from app.embeddings import LAZY_EMBEDDING_MODEL
+        from app.cache import attach_vector_index
+        from app.snapshot_store import covers_index, last_snapshot, refresh_snapshot
+        from app.prefork import PRELOADED, finish_preloaded_index
+
+        try:
+            self._run_step("vector_backend", get_vector_backend)
+            lazy = LAZY_EMBEDDING_MODEL and covers_index()
+            if lazy:
+                model = None
+                self._defer("embedding_model")
+                print("💤 Data snapshot covers the index; embedding model loads on first use")
+            else:
+                model = self._run_step("embedding_model", get_embedding_function)
+
+            def sync_index():
+                if PRELOADED["index_pending"]:
+                    # Forked worker: the master could not embed without inference before fork
+                    summary = finish_preloaded_index(events)
+                    backend = get_vector_backend()
+                else:
+                    summary = build_vector_store(events)
+                    backend = get_vector_backend()
+                    # Next start (and every worker) loads this instead of the JSON and the model
+                    refresh_snapshot(events, backend, summary)
+                # From here on requests read the index through their pinned snapshot
+                attach_vector_index(backend, get_index_version())
+                return summary
+
+            self._run_step("vector_index", sync_index)
+            backend = get_vector_backend()
+
+            def warmup():
+                if model is None:
+                    # Fault the memory-mapped matrix in with a stored vector; no model needed
+                    stored = last_snapshot()
+                    backend.query(stored.embeddings[0], 1)
+                    return
+                # First inference allocates buffers and picks kernels; pay it before traffic does
+                embedding = model.encode([WARMUP_QUERY], show_progress_bar=False, convert_to_numpy=True)[0]
+                if backend.count():
+                    backend.query(embedding, 1)
+
+            self._run_step("warmup", warmup)
+            # No-op unless EMBEDDING_POOL_SIZE > 0; queries encode inline until it is up
+            self._run_step("embedding_pool", EMBEDDING_POOL.start)
+            self.ready_at = datetime.now()
+            elapsed = (self.ready_at - self.started_at).total_seconds() if self.started_at else 0
+            print(f"📡 Ready for retrieval traffic (warmed in {elapsed:.1f}s)")
+        except Exception:
+            # Already recorded on the component; /healthz reports the failure
+            pass
+
+    @property
+    def ready(self) -> bool:
+        return all(
+            c["state"] in ("ready", "deferred") or (c["state"] == "failed" and not c["required"])
+            for c in self.components.values()
+        )
+
+    @property
+    def failed(self) -> bool:
+        """A required step failed: retrieval cannot work"""
+        return any(c["state"] == "failed" and c["required"] for c in self.components.values())
+
+    @property
+    def degraded(self) -> bool:
+        """Only optional steps failed: retrieval works, just slower"""
+        return not self.failed and any(c["state"] == "failed" for c in self.components.values())
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "failed": self.failed,
+            "degraded": self.degraded,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "ready_at": self.ready_at.isoformat() if self.ready_at else None,
+            "components": {name: dict(c) for name, c in self.components.items()},
+        }
+
+
+LIFECYCLE = Lifecycle()
@@ -1,5 +1,7 @@
 import os
-import requests
+import json
+import asyncio
+import httpx
 from dotenv import load_dotenv
 
 # Load .env BEFORE reading variables
@@ -10,18 +12,15 @@ LLM_API_URL = os.getenv("LLM_API_URL", "https://api.groq.com/openai/v1/chat/comp
 LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")
 LLM_API_KEY = os.getenv("LLM_API_KEY", "")
 
-def generate_answer(context: str, question: str) -> str:
-    """
-    Generate answer using cloud LLM API (OpenAI-compatible format).
-    Supports OpenAI, Groq, and other compatible APIs.
-    """
-    # Truncate context aggressively for faster processing
-    max_context_length = 1000
-    if len(context) > max_context_length:
-        context = context[:max_context_length] + "..."
-    
-    # System prompt
-    system_prompt = """You are a helpful assistant for Kerala Government Welfare Schemes.
+# Connection pool configuration (shared keep-alive pool for all LLM calls)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() in ("1", "true", "yes")
+
+SYSTEM_PROMPT = """You are a helpful assistant for Kerala Government Welfare Schemes.
 
 🎯 YOUR JOB:
 Answer questions about Kerala government schemes, benefits, eligibility, and application processes using ONLY the information provided in the context.
@@ -46,6 +45,89 @@ Answer questions about Kerala government schemes, benefits, eligibility, and app
 6. When explaining application process, provide step-by-step roadmap if available in context
 """
 
+# Post-processing filters
+FORBIDDEN_TERMS = ["tamil nadu", "karnataka", "maharashtra", "delhi", "central government"]
+GENERIC_PHRASES = [
+    "typically", "usually", "generally", "most festivals", "common events",
+    "standard events", "popular activities", "traditional"
+]
+
+NO_API_KEY_RESPONSE = "API key not configured. Please set LLM_API_KEY in your .env file."
+FORBIDDEN_RESPONSE = "I can only help with Kerala Government welfare schemes."
+GENERIC_RESPONSE = "I don't have that specific information in the provided context."
+ERROR_RESPONSE = "Sorry, I couldn't generate a response at this time. Please check your API configuration."
+
+_sync_client = None
+_async_client = None
+_async_client_loop = None
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive without it"""
+    if not LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _client_options() -> dict:
+    return {
+        "http2": _http2_enabled(),
+        "limits": httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+    }
+
+
+def get_sync_client() -> httpx.Client:
+    """Lazily create the pooled client used by the synchronous code path"""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(**_client_options())
+    return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Lazily create the pooled async client.
+    Pooled connections belong to one event loop, so the client is
+    recreated if it is first used from a different loop.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(**_client_options())
+        _async_client_loop = loop
+        print(f"🔌 LLM client pool ready (http2={_http2_enabled()}, "
+              f"max_connections={LLM_MAX_CONNECTIONS})")
+    return _async_client
+
+
+async def close_llm_clients():
+    """Close pooled connections (call on shutdown)"""
+    global _sync_client, _async_client, _async_client_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+        _async_client_loop = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
+
+
+def _build_request(context: str, question: str):
+    """Build the OpenAI-compatible payload and headers for a question"""
+    # Truncate context aggressively for faster processing
+    max_context_length = 1000
+    if len(context) > max_context_length:
+        context = context[:max_context_length] + "..."
+
     user_prompt = f"""Context (your ONLY information source):
 {context}
 
@@ -53,62 +135,187 @@ Question: {question}
 
 Answer (be natural and helpful if context has the info, otherwise say you don't have it):"""
 
+    print("🔄 Sending request to LLM API...")
+    print(f"Context length: {len(context)}, Question: {question}")
+
+    # Prepare request payload (OpenAI-compatible format)
+    payload = {
+        "model": LLM_MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": 0.05,
+        "max_tokens": 150,
+        "top_p": 0.7
+    }
+
+    # Prepare headers
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {LLM_API_KEY}"
+    }
+    return payload, headers
+
+
+def _postprocess_answer(result: dict) -> str:
+    """Extract the answer and apply the post-processing filters"""
+    answer = result['choices'][0]['message']['content'].strip()
+    answer_lower = answer.lower()
+
+    # If answer mentions other states' schemes, replace with standard response
+    if any(term in answer_lower for term in FORBIDDEN_TERMS):
+        return FORBIDDEN_RESPONSE
+
+    # Check for suspiciously generic responses that might be hallucinated
+    if any(phrase in answer_lower for phrase in GENERIC_PHRASES):
+        return GENERIC_RESPONSE
+
+    return answer
+
+
+class StreamGuard:
+    """
+    Incremental version of the post-processing filters for streamed answers.
+
+    Text is held back by (longest filter phrase - 1) characters, so a
+    forbidden term is detected before any part of it reaches the client.
+    """
+
+    def __init__(self):
+        self._terms = [(term, FORBIDDEN_RESPONSE) for term in FORBIDDEN_TERMS]
+        self._terms += [(phrase, GENERIC_RESPONSE) for phrase in GENERIC_PHRASES]
+        self._holdback = max(len(term) for term, _ in self._terms) - 1
+        self._pending = ""
+        self._tail = ""
+        self.violation = None
+
+    def feed(self, token: str) -> str:
+        """Add a token; returns the text that is now safe to emit"""
+        self._tail += token.lower()
+        for term, response in self._terms:
+            if term in self._tail:
+                self.violation = response
+                self._pending = ""
+                return ""
+        self._tail = self._tail[-self._holdback:]
+
+        self._pending += token
+        if len(self._pending) <= self._holdback:
+            return ""
+        safe = self._pending[:-self._holdback]
+        self._pending = self._pending[-self._holdback:]
+        return safe
+
+    def flush(self) -> str:
+        """Release held-back text once the stream has finished cleanly"""
+        rest, self._pending = self._pending, ""
+        return rest
+
+
+async def astream_answer(context: str, question: str):
+    """
+    Stream an answer using the provider's `stream: true` mode.
+
+    Yields events:
+        {"type": "token", "content": str}  - safe text to append
+        {"type": "abort", "content": str}  - filter tripped; replace output with content
+        {"type": "error", "content": str}  - provider failure
+        {"type": "done"}                   - stream finished
+    """
+    try:
+        payload, headers = _build_request(context, question)
+
+        if not LLM_API_KEY:
+            yield {"type": "token", "content": NO_API_KEY_RESPONSE}
+            yield {"type": "done"}
+            return
+
+        payload["stream"] = True
+        guard = StreamGuard()
+        started = False
+
+        async with get_async_client().stream("POST", LLM_API_URL, json=payload, headers=headers) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+
+                chunk = json.loads(data)
+                choices = chunk.get("choices") or [{}]
+                token = (choices[0].get("delta") or {}).get("content")
+                if not token:
+                    continue
+
+                safe = guard.feed(token)
+                if guard.violation:
+                    # Leaving the context manager closes the upstream stream early
+                    yield {"type": "abort", "content": guard.violation}
+                    yield {"type": "done"}
+                    return
+                if not started:
+                    # Match the .strip() applied to non-streamed answers
+                    safe = safe.lstrip()
+                if safe:
+                    started = True
+                    yield {"type": "token", "content": safe}
+
+        rest = guard.flush().rstrip()
+        if not started:
+            rest = rest.lstrip()
+        if rest:
+            yield {"type": "token", "content": rest}
+        yield {"type": "done"}
+
+    except Exception as e:
+        print(f"❌ LLM streaming error: {e}")
+        yield {"type": "error", "content": ERROR_RESPONSE}
+        yield {"type": "done"}
+
+
+def generate_answer(context: str, question: str) -> str:
+    """
+    Generate answer using cloud LLM API (OpenAI-compatible format).
+    Supports OpenAI, Groq, and other compatible APIs.
+    """
     try:
-        print("🔄 Sending request to LLM API...")
-        print(f"Context length: {len(context)}, Question: {question}")
-        
+        payload, headers = _build_request(context, question)
+
         if not LLM_API_KEY:
-            return "API key not configured. Please set LLM_API_KEY in your .env file."
-        
-        # Prepare request payload (OpenAI-compatible format)
-        payload = {
-            "model": LLM_MODEL,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            "temperature": 0.05,
-            "max_tokens": 150,
-            "top_p": 0.7
-        }
-        
-        # Prepare headers
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {LLM_API_KEY}"
-        }
-        
-        # Make API request
-        response = requests.post(
-            LLM_API_URL,
-            json=payload,
-            headers=headers,
-            timeout=30
-        )
+            return NO_API_KEY_RESPONSE
+
+        response = get_sync_client().post(LLM_API_URL, json=payload, headers=headers)
         response.raise_for_status()
-        
-        # Extract answer from response
-        result = response.json()
-        answer = result['choices'][0]['message']['content'].strip()
-        
-        # Post-processing filter: Check if answer mentions other states' schemes
-        forbidden_terms = ["tamil nadu", "karnataka", "maharashtra", "delhi", "central government"]
-        answer_lower = answer.lower()
-        
-        # If answer mentions forbidden terms, replace with standard response
-        if any(term in answer_lower for term in forbidden_terms):
-            return "I can only help with Kerala Government welfare schemes."
-        
-        # Check for suspiciously generic responses that might be hallucinated
-        generic_phrases = [
-            "typically", "usually", "generally", "most festivals", "common events",
-            "standard events", "popular activities", "traditional"
-        ]
-        if any(phrase in answer_lower for phrase in generic_phrases):
-            return "I don't have that specific information in the provided context."
-        
-        return answer
-        
+        return _postprocess_answer(response.json())
+
+    except Exception as e:
+        print(f"❌ LLM API error: {e}")
+        return ERROR_RESPONSE
+
+
+async def agenerate_answer(context: str, question: str, raise_errors: bool = False) -> str:
+    """
+    Async variant of generate_answer.
+    Reuses keep-alive (HTTP/2 when available) connections from a shared pool
+    and never blocks a worker thread while waiting on the provider.
+    With raise_errors=True provider failures propagate instead of being
+    turned into the generic error reply (used by batch callers).
+    """
+    try:
+        payload, headers = _build_request(context, question)
+
+        if not LLM_API_KEY:
+            return NO_API_KEY_RESPONSE
+
+        response = await get_async_client().post(LLM_API_URL, json=payload, headers=headers)
+        response.raise_for_status()
+        return _postprocess_answer(response.json())
+
     except Exception as e:
         print(f"❌ LLM API error: {e}")
-        return "Sorry, I couldn't generate a response at this time. Please check your API configuration."
+        if raise_errors:
+            raise
+        return ERROR_RESPONSE
@@ -1,35 +1,50 @@
 from fastapi import FastAPI, HTTPException, Security, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import List, Optional
 # --- ADDED THIS IMPORT ---
 from fastapi.middleware.cors import CORSMiddleware
 # -------------------------
-from app.chat_engine import chat
-from app.json_store import load_events_from_json
-from app.cache import load_event_cache
-from app.vector_store import build_vector_store, cleanup_resources
+from app.chat_engine import achat, achat_stream, achat_batch, get_coalescing_stats
+from app.llm import close_llm_clients
+from app.memory_governor import MEMORY_GOVERNOR
+from app.lifecycle import LIFECYCLE
+from app.embedding_pool import EMBEDDING_POOL, EmbeddingPoolBusy
+from app.prefork import PRELOADED, RELOAD_WATCHER, publish_generation
+from app.appwrite_sync import DELTA_SYNC, SYNC_JOB, SyncInProgress
+from app.metrics import record_latency, latency_summary, render_prometheus
+from app.tracing import span, set_request_id, reset_request_id, get_request_id
+from app.profiler import PROFILER, ProfilerBusy, PROFILE_DEFAULT_INTERVAL_MS, render_collapsed
+from app.snapshot_store import load_events, snapshot_stats, write_snapshot
+from app.cache import load_event_cache, pin_snapshot, unpin_snapshot, get_snapshot
+from app.vector_store import build_vector_store, cleanup_resources, get_index_version, get_vector_backend
 import traceback
+import asyncio
 import gc
+import json
 import os
 import signal
 import sys
 from datetime import datetime
 from collections import defaultdict
 import time
-import subprocess
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# ⚡ LIGHTWEIGHT: Limit worker threads
-os.environ['UVICORN_WORKERS'] = '1'
-os.environ['OMP_NUM_THREADS'] = '2'
+# ⚡ LIGHTWEIGHT: Limit threads per worker (multi-worker: see gunicorn.conf.py)
+os.environ.setdefault('OMP_NUM_THREADS', '2')
 
 # Authentication configuration
 SYNC_TOKEN = os.getenv("SYNC_TOKEN", "your-secret-sync-token-here")
 security = HTTPBearer()
 
+# Batch chat limits
+CHAT_BATCH_MAX_MESSAGES = int(os.getenv("CHAT_BATCH_MAX_MESSAGES", "50"))
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))  # concurrent LLM calls per batch
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
     """Verify bearer token for protected endpoints"""
     if credentials.credentials != SYNC_TOKEN:
@@ -82,6 +97,49 @@ app.add_middleware(
 )
 # -------------------------------------
 
+@app.middleware("http")
+async def memory_governor_middleware(request, call_next):
+    """Shed chat traffic near the hard memory limit; reclaim memory only past watermarks"""
+    if request.url.path.startswith("/chat") and MEMORY_GOVERNOR.should_shed():
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server is under memory pressure. Please retry shortly."},
+            headers={"Retry-After": "5"}
+        )
+    response = await call_next(request)
+    MEMORY_GOVERNOR.after_request()
+    return response
+
+
+@app.middleware("http")
+async def shared_reload_middleware(request, call_next):
+    """
+    Pick up schemes/index rebuilt by /sync in another worker (one stat() per
+    interval; the reload itself runs off the event loop), then pin the latest
+    data snapshot for the rest of the request.
+    """
+    if LIFECYCLE.ready:
+        await RELOAD_WATCHER.acheck()
+    token = pin_snapshot()
+    try:
+        return await call_next(request)
+    finally:
+        unpin_snapshot(token)
+
+
+@app.middleware("http")
+async def request_id_middleware(request, call_next):
+    """Tag each request with an ID (client-supplied X-Request-ID or generated) for logs and spans"""
+    token = set_request_id(request.headers.get("x-request-id"))
+    try:
+        with span(f"{request.method} {request.url.path}"):
+            response = await call_next(request)
+        response.headers["X-Request-ID"] = get_request_id()
+        return response
+    finally:
+        reset_request_id(token)
+
+
 class ChatRequest(BaseModel):
     message: str
 
@@ -92,10 +150,38 @@ class HealthResponse(BaseModel):
     status: str
     events_loaded: int
 
+class BatchChatRequest(BaseModel):
+    messages: List[str]
+
+class BatchChatItem(BaseModel):
+    reply: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatItem]
+
+class EligibilityRequest(BaseModel):
+    age: Optional[int] = None
+    income: Optional[float] = None  # annual, in ₹
+    gender: Optional[str] = None
+    ration_card: Optional[str] = None
+
+class EligibleScheme(BaseModel):
+    id: str
+    name: str
+    category: str
+    benefit: str
+    to_verify: List[str]
+
+class EligibilityResponse(BaseModel):
+    eligible: List[EligibleScheme]
+    schemes_evaluated: int
+    elapsed_us: float
+
 
 @app.on_event("startup")
 def startup_event():
-    """Initialize with memory constraints"""
+    """Answer on the port immediately; warm heavy components in the background"""
     print("🚀 Starting Kerala Schemes Chatbot...")
     print("⚡ Memory-efficient mode enabled")
     
@@ -103,22 +189,26 @@ def startup_event():
     ANALYTICS["start_time"] = datetime.now()
     
     try:
-        # Load schemes
-        events = load_events_from_json()
-        if not events:
-            print("⚠️ No schemes loaded")
-            return
-
-        # Load into memory cache (limited)
-        load_event_cache(events)
+        # Load schemes into memory cache (limited) - fast, needed by eligibility
+        def load_data():
+            if PRELOADED["events"] is not None:
+                # Forked from a preloaded gunicorn master: cache is already shared
+                return PRELOADED["events"]
+            events = load_events()
+            if not events:
+                print("⚠️ No schemes loaded")
+            load_event_cache(events)
+            return events
 
-        # Build vector store (batch processing)
-        build_vector_store(events)
+        events = LIFECYCLE.load_data(load_data)
+        
+        # Vector backend, embedding model, index sync and warm-up (see /readyz)
+        LIFECYCLE.start_background(events)
 
-        # Don't cleanup model immediately - keep it loaded
-        # gc.collect()
+        # Delta sync from Appwrite (APPWRITE_SYNC_INTERVAL > 0); first run once ready
+        DELTA_SYNC.start(_reload_after_sync, ready=lambda: LIFECYCLE.ready)
         
-        print(f"✅ Ready with {len(events)} Kerala schemes")
+        print(f"✅ Serving with {len(events)} Kerala schemes (retrieval warming up)")
         print(f"💾 Memory footprint minimized")
         print("📡 Server ready to accept requests")
         
@@ -131,9 +221,12 @@ def startup_event():
 
 
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
     """Cleanup on shutdown"""
     print("🧹 Cleaning up resources...")
+    await close_llm_clients()
+    DELTA_SYNC.stop()
+    EMBEDDING_POOL.shutdown()
     cleanup_resources()
     gc.collect()
 
@@ -141,15 +234,59 @@ def shutdown_event():
 @app.get("/", response_model=HealthResponse)
 def health_check():
     """Health check endpoint"""
-    from app.cache import EVENT_CACHE
     return {
         "status": "healthy",
-        "events_loaded": len(EVENT_CACHE)
+        "events_loaded": len(get_snapshot().events)
     }
 
 
+@app.get("/healthz")
+def liveness():
+    """Liveness: the process is up and no required startup step failed (restart otherwise)"""
+    if LIFECYCLE.failed:
+        return JSONResponse(status_code=503, content={"status": "failed", **LIFECYCLE.stats()})
+    if LIFECYCLE.degraded:
+        return {"status": "degraded", **LIFECYCLE.stats()}
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+def readiness():
+    """Readiness: retrieval is warm; route traffic here only when this returns 200"""
+    if not LIFECYCLE.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", **LIFECYCLE.stats()})
+    return {"status": "degraded" if LIFECYCLE.degraded else "ready", **LIFECYCLE.stats()}
+
+
+def _record_error(error_type: str, message: str):
+    """Track a failed request in analytics"""
+    ANALYTICS["failed_requests"] += 1
+    ANALYTICS["last_error"] = {
+        "type": error_type,
+        "request_id": get_request_id(),
+        "time": datetime.now().isoformat(),
+        "message": message
+    }
+    ANALYTICS["errors"].append(ANALYTICS["last_error"])
+
+    # Keep only last 50 errors
+    if len(ANALYTICS["errors"]) > 50:
+        ANALYTICS["errors"] = ANALYTICS["errors"][-50:]
+
+
+def _record_response_time(response_time: float):
+    """Track a successful request's response time"""
+    ANALYTICS["successful_requests"] += 1
+    ANALYTICS["response_times"].append(response_time)
+    record_latency("request", response_time)
+
+    # Keep only last 100 response times for memory efficiency
+    if len(ANALYTICS["response_times"]) > 100:
+        ANALYTICS["response_times"] = ANALYTICS["response_times"][-100:]
+
+
 @app.post("/chat", response_model=ChatResponse)
-def chat_endpoint(req: ChatRequest):
+async def chat_endpoint(req: ChatRequest):
     """Chat endpoint with error handling and analytics tracking"""
     start_time = time.time()
     
@@ -161,39 +298,26 @@ def chat_endpoint(req: ChatRequest):
         # Truncate very long messages
         message = req.message[:500] if len(req.message) > 500 else req.message
         
-        answer = chat(message)
-        
-        # Track successful request
-        ANALYTICS["successful_requests"] += 1
+        answer = await achat(message)
         
-        # Track response time
-        response_time = time.time() - start_time
-        ANALYTICS["response_times"].append(response_time)
-        
-        # Keep only last 100 response times for memory efficiency
-        if len(ANALYTICS["response_times"]) > 100:
-            ANALYTICS["response_times"] = ANALYTICS["response_times"][-100:]
-        
-        # Periodic garbage collection
-        gc.collect()
+        # Track successful request and response time
+        _record_response_time(time.time() - start_time)
         
         return {"reply": answer}
 
+    except EmbeddingPoolBusy as e:
+        print(f"⚠️ Embedding pool saturated: {e}")
+        _record_error("EmbeddingPoolBusy", str(e))
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server is busy. Please retry shortly."},
+            headers={"Retry-After": "1"}
+        )
+
     except MemoryError:
         print("❌ MEMORY ERROR - System under pressure")
-        ANALYTICS["failed_requests"] += 1
-        ANALYTICS["last_error"] = {
-            "type": "MemoryError",
-            "time": datetime.now().isoformat(),
-            "message": "System under memory pressure"
-        }
-        ANALYTICS["errors"].append(ANALYTICS["last_error"])
-        
-        # Keep only last 50 errors
-        if len(ANALYTICS["errors"]) > 50:
-            ANALYTICS["errors"] = ANALYTICS["errors"][-50:]
-        
-        gc.collect()
+        _record_error("MemoryError", "System under memory pressure")
+        MEMORY_GOVERNOR.reclaim("memory_error", trim=True, force=True)
         return {
             "reply": "System is under memory pressure. Please try again."
         }
@@ -201,24 +325,123 @@ def chat_endpoint(req: ChatRequest):
     except Exception as e:
         print(f"❌ CHAT ERROR: {e}")
         traceback.print_exc()
-        
-        ANALYTICS["failed_requests"] += 1
-        ANALYTICS["last_error"] = {
-            "type": type(e).__name__,
-            "time": datetime.now().isoformat(),
-            "message": str(e)
-        }
-        ANALYTICS["errors"].append(ANALYTICS["last_error"])
-        
-        # Keep only last 50 errors
-        if len(ANALYTICS["errors"]) > 50:
-            ANALYTICS["errors"] = ANALYTICS["errors"][-50:]
-        
+        _record_error(type(e).__name__, str(e))
         return {
             "reply": "Sorry, something went wrong. Please try again."
         }
 
 
+@app.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch_endpoint(req: BatchChatRequest):
+    """
+    Answer up to CHAT_BATCH_MAX_MESSAGES messages in one call (for queueing
+    gateways). Results come back in input order with a per-item error.
+    """
+    if len(req.messages) > CHAT_BATCH_MAX_MESSAGES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many messages in batch (max {CHAT_BATCH_MAX_MESSAGES})"
+        )
+
+    start_time = time.time()
+    ANALYTICS["total_requests"] += len(req.messages)
+    ANALYTICS["last_request_time"] = datetime.now().isoformat()
+
+    messages = [m[:500] for m in req.messages]
+
+    try:
+        results = await achat_batch(messages, concurrency=CHAT_BATCH_CONCURRENCY)
+    except Exception as e:
+        print(f"❌ CHAT BATCH ERROR: {e}")
+        traceback.print_exc()
+        for _ in messages:
+            _record_error(type(e).__name__, str(e))
+        return {"results": [{"reply": None, "error": "Batch failed"} for _ in messages]}
+
+    elapsed = time.time() - start_time
+    for item in results:
+        if item["error"]:
+            _record_error("BatchItemError", item["error"])
+        else:
+            _record_response_time(elapsed)
+
+    return {"results": results}
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(req: ChatRequest):
+    """
+    Stream the reply as Server-Sent Events.
+
+    Events: `token` (text to append), `abort` (replace everything shown so far
+    with the event text), `error`, and a final `done`.
+    """
+    start_time = time.time()
+    ANALYTICS["total_requests"] += 1
+    ANALYTICS["last_request_time"] = datetime.now().isoformat()
+
+    message = req.message[:500] if len(req.message) > 500 else req.message
+
+    async def event_source():
+        first_byte_time = None
+        failed = False
+        try:
+            async for event in achat_stream(message):
+                if first_byte_time is None:
+                    first_byte_time = time.time() - start_time
+                if event["type"] == "error":
+                    failed = True
+                data = json.dumps({"content": event.get("content", "")}, ensure_ascii=False)
+                yield f"event: {event['type']}\ndata: {data}\n\n"
+        except Exception as e:
+            print(f"❌ CHAT STREAM ERROR: {e}")
+            traceback.print_exc()
+            _record_error(type(e).__name__, str(e))
+            yield 'event: error\ndata: {"content": "Sorry, something went wrong. Please try again."}\n\n'
+            yield 'event: done\ndata: {"content": ""}\n\n'
+            return
+
+        if failed:
+            _record_error("LLMStreamError", "Streaming answer failed")
+            return
+
+        _record_response_time(time.time() - start_time)
+        if first_byte_time is not None:
+            print(f"⚡ Stream first byte after {first_byte_time * 1000:.0f}ms")
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/eligibility", response_model=EligibilityResponse)
+def eligibility_endpoint(req: EligibilityRequest):
+    """
+    Match a user profile against every scheme's eligibility rules.
+    Answered from compiled rules, no LLM call.
+    """
+    from app.cache import get_eligibility_engine
+
+    engine = get_eligibility_engine()
+    start = time.perf_counter()
+    eligible = engine.evaluate(
+        age=req.age,
+        income=req.income,
+        gender=req.gender,
+        ration_card=req.ration_card
+    )
+    elapsed_us = (time.perf_counter() - start) * 1e6
+
+    ANALYTICS["pattern_matches"]["eligibility_api"] += 1
+    return {
+        "eligible": eligible,
+        "schemes_evaluated": len(engine.schemes),
+        "elapsed_us": round(elapsed_us, 1)
+    }
+
+
 @app.get("/stats")
 def stats(token: str = Depends(verify_token)):
     """
@@ -227,9 +450,11 @@ def stats(token: str = Depends(verify_token)):
     
     Usage: curl http://localhost:8000/stats -H "Authorization: Bearer your-token"
     """
-    from app.cache import EVENT_CACHE
-    from app.vector_store import _collection
-    import psutil
+    from app.vector_store import _backend
+    from app.rag_retriever import get_query_cache_stats, get_embedding_batch_stats, get_retrieval_stats
+    
+    snapshot = get_snapshot()
+    backend = snapshot.backend or _backend
     
     # Calculate uptime
     uptime_seconds = 0
@@ -248,9 +473,7 @@ def stats(token: str = Depends(verify_token)):
         avg_response_time = sum(ANALYTICS["response_times"]) / len(ANALYTICS["response_times"])
     
     # Get memory usage
-    process = psutil.Process()
-    memory_info = process.memory_info()
-    memory_mb = memory_info.rss / 1024 / 1024
+    memory_mb = MEMORY_GOVERNOR.sample(force=True)
     
     # Update peak memory if current is higher
     if memory_mb > ANALYTICS["peak_memory_mb"]:
@@ -286,7 +509,8 @@ def stats(token: str = Depends(verify_token)):
             "average_response_time_ms": round(avg_response_time * 1000, 2),
             "total_responses_tracked": len(ANALYTICS["response_times"]),
             "current_memory_mb": round(memory_mb, 2),
-            "peak_memory_mb": round(ANALYTICS["peak_memory_mb"], 2)
+            "peak_memory_mb": round(ANALYTICS["peak_memory_mb"], 2),
+            "stage_latency_ms": latency_summary()
         },
         
         # Usage metrics
@@ -297,10 +521,40 @@ def stats(token: str = Depends(verify_token)):
             "pattern_matches": dict(ANALYTICS["pattern_matches"])
         },
         
+        # Serving process (multi-worker: differs per worker)
+        "worker": RELOAD_WATCHER.stats(),
+        
+        # Startup / warm-up state per component
+        "lifecycle": LIFECYCLE.stats(),
+        
+        # Memory governor decisions and timings
+        "memory_governor": MEMORY_GOVERNOR.stats(),
+        
+        # Request coalescing (identical in-flight queries)
+        "coalescing": get_coalescing_stats(),
+        
+        # Embedding process pool (queue depth, service / wait time)
+        "embedding_pool": EMBEDDING_POOL.stats(),
+        
+        # Query micro-batching (batch-size distribution)
+        "embedding_batcher": get_embedding_batch_stats(),
+        
+        # Query embedding cache
+        "query_cache": get_query_cache_stats(),
+        
+        # Hybrid retrieval (exact-name fast path vs fused BM25 + vector)
+        "retrieval": get_retrieval_stats(),
+        
+        # Delta sync scheduler (last run, lag, records changed)
+        "delta_sync": DELTA_SYNC.stats(),
+        
         # Data metrics
         "data": {
-            "cached_events": len(EVENT_CACHE),
-            "vector_count": _collection.count() if _collection else 0
+            "cached_events": len(snapshot.events),
+            "vector_backend": backend.name if backend else None,
+            "vector_count": backend.count() if backend else 0,
+            "snapshot": snapshot.stats(),
+            "stored_snapshot": snapshot_stats()
         },
         
         # Error tracking
@@ -312,75 +566,102 @@ def stats(token: str = Depends(verify_token)):
     }
 
 
-@app.post("/sync")
-def sync_events(token: str = Depends(verify_token)):
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
     """
-    Sync events from Appwrite database.
-    Requires Bearer token authentication.
+    Prometheus scrape endpoint: per-stage latency summaries and request counters.
     
-    Usage: curl -X POST http://localhost:8000/sync -H "Authorization: Bearer your-token"
+    Usage: curl http://localhost:8000/metrics
     """
-    try:
-        # Get the path to the sync script
-        script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts", "sync_appwrite.py")
-        
-        if not os.path.exists(script_path):
-            raise HTTPException(
-                status_code=500,
-                detail=f"Sync script not found at {script_path}"
-            )
-        
-        # Run the sync script
-        print("🔄 Starting event sync from Appwrite...")
-        result = subprocess.run(
-            [sys.executable, script_path],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode != 0:
-            print(f"❌ Sync failed: {result.stderr}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Sync script failed: {result.stderr}"
-            )
-        
-        print("✅ Sync completed successfully")
-        
-        # Reload events into cache and vector store
-        try:
-            events = load_events_from_json()
-            load_event_cache(events)
-            build_vector_store(events)
-            
-            return {
-                "status": "success",
-                "message": "Events synced successfully from Appwrite",
-                "events_synced": len(events),
-                "timestamp": datetime.now().isoformat(),
-                "output": result.stdout
-            }
-        except Exception as reload_error:
-            print(f"⚠️ Sync succeeded but reload failed: {reload_error}")
-            return {
-                "status": "partial_success",
-                "message": "Events synced but cache reload failed. Restart server to apply changes.",
-                "error": str(reload_error),
-                "timestamp": datetime.now().isoformat(),
-                "output": result.stdout
-            }
+    from app.rag_retriever import QUERY_BATCHER
+
+    return PlainTextResponse(
+        render_prometheus(ANALYTICS) + "\n".join(QUERY_BATCHER.prometheus_lines() + DELTA_SYNC.prometheus_lines()) + "\n",
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.post("/admin/profile", response_class=PlainTextResponse)
+async def profile(seconds: float = 10, interval_ms: float = PROFILE_DEFAULT_INTERVAL_MS,
+                  token: str = Depends(verify_token)):
+    """
+    Sample the live process for `seconds` and return collapsed stacks
+    (flamegraph.pl / speedscope format). Requires Bearer token authentication.
     
-    except subprocess.TimeoutExpired:
-        raise HTTPException(
-            status_code=504,
-            detail="Sync operation timed out after 30 seconds"
-        )
+    Usage: curl -X POST "http://localhost:8000/admin/profile?seconds=10" \
+             -H "Authorization: Bearer your-token" > profile.folded
+    """
+    try:
+        # Sampled from a worker thread so the event loop keeps serving traffic
+        result = await asyncio.to_thread(PROFILER.profile, seconds, interval_ms / 1000)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return PlainTextResponse(
+        render_collapsed(result["stacks"]),
+        headers={
+            "X-Profile-Samples": str(result["samples"]),
+            "X-Profile-Seconds": f"{result['seconds']:.3f}",
+        }
+    )
+
+
+def _reload_after_sync() -> dict:
+    """
+    Reload the schemes file plus the sync output into the cache and vector
+    store (runs in the sync job's thread). Only records whose content hash
+    changed are re-embedded.
+    """
+    events = load_events()
+    # Synced off to the side; readers keep the current snapshot until the swap below
+    index_changes = build_vector_store(events)
+    backend = get_vector_backend()
+    # Written before the generation bump, so other workers reload from it
+    write_snapshot(events, backend)
+    snapshot = load_event_cache(events, backend=backend, index_version=get_index_version())
+    # Other workers reload from disk on their next request
+    generation = publish_generation()
+    return {
+        "events_loaded": len(events),
+        "snapshot_version": snapshot.version,
+        "index_changes": index_changes,
+        "generation": generation,
+    }
+
+
+@app.post("/sync", status_code=202)
+async def sync_events(wait: bool = False, token: str = Depends(verify_token)):
+    """
+    Start syncing events from the Appwrite database (in-process, in the background).
+    Requires Bearer token authentication. Poll /sync/status for progress,
+    or pass ?wait=true to block until the job finishes.
     
-    except Exception as e:
-        print(f"❌ Sync endpoint error: {e}")
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Sync failed: {str(e)}"
-        )
\ No newline at end of file
+    Usage: curl -X POST http://localhost:8000/sync -H "Authorization: Bearer your-token"
+    """
+    if not LIFECYCLE.ready:
+        raise HTTPException(status_code=503, detail="Server is still warming up. Retry once /readyz returns 200.")
+
+    try:
+        SYNC_JOB.start(_reload_after_sync)
+    except SyncInProgress:
+        raise HTTPException(status_code=409, detail="A sync is already running. See /sync/status.")
+
+    if wait:
+        await SYNC_JOB.wait()
+        job = SYNC_JOB.status()
+        if job["status"] == "failed":
+            raise HTTPException(status_code=500, detail=f"Sync failed: {job['error']}")
+        return JSONResponse(status_code=200, content=job)
+
+    return {
+        "status": "accepted",
+        "message": "Sync started. Poll /sync/status for progress.",
+        "job": SYNC_JOB.status(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/sync/status")
+def sync_status(token: str = Depends(verify_token)):
+    """Progress and outcome of the current (or last) sync job, plus the delta sync scheduler"""
+    return {**SYNC_JOB.status(), "scheduler": DELTA_SYNC.stats()}
\ No newline at end of file
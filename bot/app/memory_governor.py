@@ -0,0 +1,150 @@
+import ctypes
+import ctypes.util
+import gc
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import psutil
+
+# Watermarks (resident set size, MB)
+MEMORY_SOFT_LIMIT_MB = float(os.getenv("MEMORY_SOFT_LIMIT_MB", "700"))    # run gc.collect()
+MEMORY_TRIM_LIMIT_MB = float(os.getenv("MEMORY_TRIM_LIMIT_MB", "850"))    # gc.collect() + malloc_trim()
+MEMORY_HARD_LIMIT_MB = float(os.getenv("MEMORY_HARD_LIMIT_MB", "1100"))   # shed load with 503s
+MEMORY_SAMPLE_INTERVAL = float(os.getenv("MEMORY_SAMPLE_INTERVAL", "1.0"))  # seconds between RSS samples
+MEMORY_GC_COOLDOWN = float(os.getenv("MEMORY_GC_COOLDOWN", "10"))         # min seconds between reclaims
+
+
+def _load_malloc_trim():
+    """glibc's malloc_trim returns freed heap pages to the OS; unavailable elsewhere"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        return libc.malloc_trim
+    except (OSError, AttributeError):
+        return None
+
+
+class MemoryGovernor:
+    """
+    Samples RSS at most once per interval and reclaims memory only when a
+    watermark is crossed, instead of forcing a full collection per request.
+    Above the hard limit, requests are shed until memory recovers.
+    """
+
+    def __init__(self, soft_mb=MEMORY_SOFT_LIMIT_MB, trim_mb=MEMORY_TRIM_LIMIT_MB,
+                 hard_mb=MEMORY_HARD_LIMIT_MB, sample_interval=MEMORY_SAMPLE_INTERVAL,
+                 cooldown=MEMORY_GC_COOLDOWN):
+        self.soft_mb = soft_mb
+        self.trim_mb = trim_mb
+        self.hard_mb = hard_mb
+        self.sample_interval = sample_interval
+        self.cooldown = cooldown
+        self._process = psutil.Process()
+        self._malloc_trim = _load_malloc_trim()
+        self._lock = threading.Lock()
+        self._last_sample = 0.0
+        self._last_reclaim = 0.0
+        self.rss_mb = 0.0
+        self.peak_rss_mb = 0.0
+        self.samples = 0
+        self.collections = 0
+        self.trims = 0
+        self.shed_requests = 0
+        self.reclaim_ms_total = 0.0
+        self.decisions = deque(maxlen=20)
+
+    def sample(self, force: bool = False) -> float:
+        """Current RSS in MB (cached for sample_interval seconds)"""
+        now = time.monotonic()
+        if force or now - self._last_sample >= self.sample_interval:
+            self.rss_mb = self._process.memory_info().rss / 1024 / 1024
+            self.peak_rss_mb = max(self.peak_rss_mb, self.rss_mb)
+            self._last_sample = now
+            self.samples += 1
+        return self.rss_mb
+
+    def reclaim(self, reason: str, trim: bool = False, force: bool = False) -> bool:
+        """Run gc (and malloc_trim) unless a reclaim ran within the cooldown"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_reclaim < self.cooldown:
+                return False
+            self._last_reclaim = now
+
+        before = self.sample(force=True)
+        start = time.perf_counter()
+        collected = gc.collect()
+        self.collections += 1
+        trimmed = False
+        if trim and self._malloc_trim is not None:
+            self._malloc_trim(0)
+            self.trims += 1
+            trimmed = True
+        duration_ms = (time.perf_counter() - start) * 1000
+        after = self.sample(force=True)
+
+        self.reclaim_ms_total += duration_ms
+        self.decisions.append({
+            "time": datetime.now().isoformat(),
+            "reason": reason,
+            "rss_before_mb": round(before, 1),
+            "rss_after_mb": round(after, 1),
+            "objects_collected": collected,
+            "malloc_trim": trimmed,
+            "duration_ms": round(duration_ms, 2),
+        })
+        print(f"🧹 Memory reclaim ({reason}): {before:.0f}MB → {after:.0f}MB in {duration_ms:.1f}ms")
+        return True
+
+    def should_shed(self) -> bool:
+        """True if a new request should be rejected (RSS at the hard limit)"""
+        if self.sample() < self.hard_mb:
+            return False
+        # Try to recover before turning traffic away
+        if self.reclaim("hard_limit", trim=True) and self.rss_mb < self.hard_mb:
+            return False
+        self.shed_requests += 1
+        return True
+
+    def after_request(self):
+        """Reclaim memory if a watermark has been crossed"""
+        rss = self.sample()
+        if rss >= self.trim_mb:
+            self.reclaim("trim_watermark", trim=True)
+        elif rss >= self.soft_mb:
+            self.reclaim("soft_watermark")
+
+    def reset_after_fork(self):
+        """psutil.Process caches the PID; a forked worker must measure itself, not the master"""
+        self._process = psutil.Process()
+        self._lock = threading.Lock()
+        self._last_sample = 0.0
+        self.peak_rss_mb = 0.0
+
+    def stats(self) -> dict:
+        rss = self.sample()
+        return {
+            "rss_mb": round(rss, 2),
+            "peak_rss_mb": round(self.peak_rss_mb, 2),
+            "watermarks_mb": {
+                "soft": self.soft_mb,
+                "trim": self.trim_mb,
+                "hard": self.hard_mb,
+            },
+            "shedding": rss >= self.hard_mb,
+            "samples": self.samples,
+            "collections": self.collections,
+            "malloc_trims": self.trims,
+            "malloc_trim_available": self._malloc_trim is not None,
+            "shed_requests": self.shed_requests,
+            "reclaim_ms_total": round(self.reclaim_ms_total, 2),
+            "recent_decisions": list(self.decisions),
+        }
+
+
+MEMORY_GOVERNOR = MemoryGovernor()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=MEMORY_GOVERNOR.reset_after_fork)
@@ -0,0 +1,127 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from app.tracing import span
+
+# chat() stages, plus the end-to-end request
+STAGES = ("intent", "retrieval", "context", "llm", "request")
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram with log-spaced buckets.
+    Buckets grow by `growth` per step (10% -> quantiles within ~5%), from
+    `min_seconds` to `max_seconds`; ~200 integer counters in total.
+    """
+
+    def __init__(self, min_seconds: float = 1e-6, max_seconds: float = 300.0, growth: float = 1.1):
+        self.min_seconds = min_seconds
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self.num_buckets = int(math.ceil(math.log(max_seconds / min_seconds) / self._log_growth)) + 2
+        self.counts = [0] * self.num_buckets
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.min_seconds:
+            return 0
+        index = int(math.log(seconds / self.min_seconds) / self._log_growth) + 1
+        return min(index, self.num_buckets - 1)
+
+    def _midpoint(self, index: int) -> float:
+        # Geometric midpoint of the bucket
+        return self.min_seconds * self.growth ** max(index - 0.5, 0)
+
+    def record(self, seconds: float):
+        index = self._bucket(seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-quantile (0-1) in seconds; 0 when empty"""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= rank and bucket_count:
+                    return min(self._midpoint(index), self.max)
+            return self.max
+
+    def summary_ms(self) -> dict:
+        result = {f"p{int(q * 100)}": round(self.percentile(q) * 1000, 3) for q in QUANTILES}
+        result["count"] = self.count
+        result["mean"] = round(self.sum / self.count * 1000, 3) if self.count else 0
+        result["max"] = round(self.max * 1000, 3)
+        return result
+
+
+STAGE_LATENCY = {stage: LatencyHistogram() for stage in STAGES}
+
+
+def record_latency(stage: str, seconds: float):
+    STAGE_LATENCY[stage].record(seconds)
+
+
+@contextmanager
+def timed(stage: str):
+    """Record the duration of the enclosed block under `stage` (and trace it as a span)"""
+    start = time.perf_counter()
+    try:
+        with span(stage):
+            yield
+    finally:
+        STAGE_LATENCY[stage].record(time.perf_counter() - start)
+
+
+def latency_summary() -> dict:
+    """p50/p95/p99/mean/max in milliseconds per stage"""
+    return {stage: histogram.summary_ms() for stage, histogram in STAGE_LATENCY.items()}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(analytics: dict) -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines = [
+        "# HELP chatbot_stage_latency_seconds Latency of chat stages (log-bucketed histogram quantiles).",
+        "# TYPE chatbot_stage_latency_seconds summary",
+    ]
+    for stage, histogram in STAGE_LATENCY.items():
+        for q in QUANTILES:
+            lines.append(f'chatbot_stage_latency_seconds{{stage="{stage}",quantile="{q}"}} {histogram.percentile(q):.6f}')
+        lines.append(f'chatbot_stage_latency_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+        lines.append(f'chatbot_stage_latency_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+    lines += [
+        "# HELP chatbot_requests_total Chat requests by outcome.",
+        "# TYPE chatbot_requests_total counter",
+        f'chatbot_requests_total{{status="success"}} {analytics["successful_requests"]}',
+        f'chatbot_requests_total{{status="failed"}} {analytics["failed_requests"]}',
+        "# HELP chatbot_llm_calls_total LLM API calls.",
+        "# TYPE chatbot_llm_calls_total counter",
+        f'chatbot_llm_calls_total {analytics["llm_calls"]}',
+        "# HELP chatbot_semantic_search_calls_total Semantic search calls.",
+        "# TYPE chatbot_semantic_search_calls_total counter",
+        f'chatbot_semantic_search_calls_total {analytics["semantic_search_calls"]}',
+        "# HELP chatbot_pattern_matches_total Queries answered by pattern (no LLM).",
+        "# TYPE chatbot_pattern_matches_total counter",
+    ]
+    for pattern, count in sorted(analytics["pattern_matches"].items()):
+        lines.append(f'chatbot_pattern_matches_total{{pattern="{_escape(pattern)}"}} {count}')
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,201 @@
+import asyncio
+import gc
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl  # one index build across workers (POSIX only)
+except ImportError:
+    fcntl = None
+
+from app.cache import load_event_cache
+from app.embeddings import EMBEDDING_BACKEND, LAZY_EMBEDDING_MODEL
+from app.snapshot_store import covers_index, load_events, refresh_snapshot
+from app.vector_store import (
+    VECTOR_BACKEND, VECTOR_DIR, build_vector_store, get_embedding_function, get_index_version,
+    get_vector_backend, release_vector_backend, reload_vector_backend,
+)
+
+# Multi-worker configuration
+GENERATION_PATH = os.path.join(VECTOR_DIR, "generation")  # bumped by /sync, watched by every worker
+INDEX_LOCK_PATH = os.path.join(VECTOR_DIR, ".index.lock")  # held by the worker finishing a preloaded index
+RELOAD_CHECK_INTERVAL = float(os.getenv("RELOAD_CHECK_INTERVAL", "1.0"))  # seconds between stat() calls
+
+# Set in the master by preload_for_workers(); inherited by forked workers
+PRELOADED = {"events": None, "index_pending": 0}
+
+
+def read_generation() -> int:
+    try:
+        with open(GENERATION_PATH, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def publish_generation() -> int:
+    """Tell every worker that schemes and the index on disk changed"""
+    generation = read_generation() + 1
+    os.makedirs(os.path.dirname(GENERATION_PATH) or ".", exist_ok=True)
+    tmp_path = f"{GENERATION_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(str(generation))
+    os.replace(tmp_path, GENERATION_PATH)
+    RELOAD_WATCHER.generation = generation  # this worker already has the new data
+    return generation
+
+
+class ReloadWatcher:
+    """
+    Per-worker check of the shared generation file. At most one stat() per
+    interval; when another worker published a newer generation, re-read the
+    data snapshot (or the schemes JSON) and reopen the vector index from disk.
+    From the event loop use acheck(): the reload runs on a worker thread, one
+    at a time, and requests keep using the current snapshot meanwhile.
+    """
+
+    def __init__(self, interval: float = RELOAD_CHECK_INTERVAL):
+        self.interval = interval
+        self.generation = read_generation()
+        self.reloads = 0
+        self._last_check = 0.0
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+
+    def pending(self) -> bool:
+        """Cheap test (one stat() per interval): another worker published a newer generation"""
+        now = time.monotonic()
+        if now - self._last_check < self.interval:
+            return False
+        self._last_check = now
+
+        try:
+            mtime = os.stat(GENERATION_PATH).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        if read_generation() <= self.generation:
+            self._mtime = mtime
+            return False
+        return True
+
+    def reload(self) -> bool:
+        """Re-read the schemes and reopen the index (blocking)"""
+        with self._lock:
+            try:
+                self._mtime = os.stat(GENERATION_PATH).st_mtime_ns
+            except OSError:
+                pass
+            generation = read_generation()
+            if generation <= self.generation:
+                return False
+            print(f"🔄 Generation {self.generation} -> {generation}: reloading schemes and index (pid {os.getpid()})")
+            events = load_events()
+            backend = reload_vector_backend()
+            # New schemes and reopened index become visible together
+            load_event_cache(events, backend=backend, index_version=get_index_version())
+            self.generation = generation
+            self.reloads += 1
+            return True
+
+    def check(self) -> bool:
+        return self.pending() and self.reload()
+
+    async def acheck(self) -> bool:
+        """check() without blocking the event loop"""
+        if self._async_lock.locked() or not self.pending():
+            return False  # a reload is already running; it publishes its snapshot when done
+        async with self._async_lock:
+            return await asyncio.to_thread(self.reload)
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+        self._last_check = 0.0
+
+    def stats(self) -> dict:
+        return {"pid": os.getpid(), "generation": self.generation, "reloads": self.reloads}
+
+
+RELOAD_WATCHER = ReloadWatcher()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=RELOAD_WATCHER.reset_after_fork)
+
+
+@contextmanager
+def _index_lock():
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(INDEX_LOCK_PATH) or ".", exist_ok=True)
+    with open(INDEX_LOCK_PATH, "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def finish_preloaded_index(events):
+    """
+    In a forked worker, when the master left documents to embed: the first
+    worker to take the lock encodes them, writes the snapshot and bumps the
+    generation; the others wait, then reload what it wrote instead of
+    encoding again. Returns the build summary (None when reloaded).
+    """
+    with _index_lock():
+        if read_generation() > RELOAD_WATCHER.generation:
+            RELOAD_WATCHER.reload()
+            return None
+        summary = build_vector_store(events)
+        refresh_snapshot(events, get_vector_backend(), summary)
+        publish_generation()
+        print(f"✅ Finished the preloaded index for all workers (pid {os.getpid()})")
+        return summary
+
+
+def preload_for_workers():
+    """
+    Run once in the gunicorn master before forking (preload_app).
+    Loads schemes, syncs the index once and loads the model weights, then
+    freezes the GC so workers share these pages copy-on-write.
+    """
+    start = time.perf_counter()
+    if VECTOR_BACKEND != "numpy":
+        print(f"⚠️ VECTOR_BACKEND={VECTOR_BACKEND}: each worker keeps its own index in memory. "
+              f"Use VECTOR_BACKEND=numpy to share one memory-mapped matrix.")
+    events = load_events()
+    load_event_cache(events)
+    PRELOADED["events"] = events
+
+    # One index build for all workers, then reopen: NumPy comes back memory-mapped,
+    # Chroma handles are closed because SQLite connections must not cross fork().
+    # Stored vectors only: encoding here would start torch/OpenMP thread pools that
+    # forked workers inherit in a broken state. Anything left is encoded by one worker.
+    summary = build_vector_store(events, reuse_only=True)
+    PRELOADED["index_pending"] = summary.get("pending", 0)
+    if not PRELOADED["index_pending"]:
+        refresh_snapshot(events, get_vector_backend(), summary)
+    release_vector_backend()
+    if VECTOR_BACKEND == "numpy":
+        get_vector_backend()
+
+    # Weights only; no inference before fork (OpenMP thread pools do not survive it).
+    # ONNX Runtime sessions own thread pools from creation, so each worker loads its own.
+    # Skipped when the data snapshot covers the index (LAZY_EMBEDDING_MODEL=false to share weights instead)
+    if EMBEDDING_BACKEND != "onnx" and not (LAZY_EMBEDDING_MODEL and covers_index()):
+        get_embedding_function()
+
+    RELOAD_WATCHER.generation = read_generation()
+
+    # Move everything allocated so far out of GC tracking: collections in workers
+    # no longer write to these objects' headers, so their pages stay shared
+    gc.collect()
+    gc.freeze()
+    print(f"✅ Preloaded for workers in {time.perf_counter() - start:.1f}s "
+          f"({gc.get_freeze_count()} objects frozen)")
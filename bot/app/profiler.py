@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Profiler limits
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_DEFAULT_INTERVAL_MS = float(os.getenv("PROFILE_DEFAULT_INTERVAL_MS", "5"))
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running"""
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for live traffic.
+    A daemon thread snapshots every thread's stack (sys._current_frames) each
+    `interval` seconds and counts identical stacks. Nothing is installed when
+    idle, so there is no cost outside a profiling window. Output is the
+    collapsed-stack format read by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.last_run = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    @staticmethod
+    def _frame_label(code) -> str:
+        filename = code.co_filename.replace(os.sep, "/")
+        parts = filename.rsplit("/", 2)
+        short = "/".join(parts[-2:]) if len(parts) > 1 else filename
+        return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+    def _collapse(self, frame, thread_name: str) -> str:
+        labels = []
+        while frame is not None:
+            labels.append(self._frame_label(frame.f_code))
+            frame = frame.f_back
+        labels.append(thread_name)
+        # Collapsed stacks go root first; ';' separates frames
+        return ";".join(reversed(labels))
+
+    def profile(self, seconds: float, interval: float = PROFILE_DEFAULT_INTERVAL_MS / 1000) -> dict:
+        """
+        Sample all threads for `seconds`; blocks the calling thread.
+        Returns {"stacks": Counter, "samples", "seconds", "interval_ms"}.
+        """
+        seconds = max(0.1, min(seconds, PROFILE_MAX_SECONDS))
+        interval = max(0.001, interval)
+
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+
+        try:
+            me = threading.get_ident()
+            stacks = Counter()
+            samples = 0
+            start = time.perf_counter()
+            deadline = start + seconds
+
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    stacks[self._collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+                samples += 1
+                time.sleep(max(0.0, min(interval, deadline - time.perf_counter())))
+
+            elapsed = time.perf_counter() - start
+            self.last_run = {
+                "time": time.time(),
+                "seconds": round(elapsed, 3),
+                "samples": samples,
+                "unique_stacks": len(stacks),
+            }
+            return {
+                "stacks": stacks,
+                "samples": samples,
+                "seconds": elapsed,
+                "interval_ms": interval * 1000,
+            }
+        finally:
+            self._lock.release()
+
+
+def render_collapsed(stacks: Counter) -> str:
+    """`frame;frame;frame count` per line, most frequent first"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+PROFILER = SamplingProfiler()
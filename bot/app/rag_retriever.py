@@ -1,45 +1,384 @@
-from app.vector_store import get_vector_components
-import gc
+from app.vector_store import get_embedding_function, get_vector_backend, get_index_version
+from app.cache import get_snapshot
+from app.embedding_pool import EMBEDDING_POOL, EmbeddingPoolBusy
+from app.embedding_batcher import MicroBatcher
+from app.lexical_index import reciprocal_rank_fusion
+from app.tracing import span, traced
+from collections import OrderedDict
+import asyncio
+import os
+import re
+import threading
+import time
 
+# Query cache configuration
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "512"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "3600"))  # seconds
+
+# Hybrid retrieval: BM25 + vector rankings fused with reciprocal rank fusion
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "true").lower() in ("1", "true", "yes")
+RRF_K = int(os.getenv("RRF_K", "60"))
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))  # depth of each ranking before fusion
+
+
+class QueryCache:
+    """
+    Bounded LRU + TTL cache keyed on the normalized query.
+    Stores the query embedding and the top-k hit IDs per k. Entries are
+    tied to the vector index version and dropped when the index changes.
+    """
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: int) -> bool:
+        # Caller holds the lock. A newer index clears the cache; requests still
+        # pinned to an older snapshot bypass it instead of clearing it again
+        if self._version is None or version > self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+        return version == self._version
+
+    def get(self, key: str, version: int):
+        """Return the cached entry for key, or None"""
+        with self._lock:
+            if not self._check_version(version):
+                self.misses += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is None or entry["expires"] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, version: int, embedding, top_k: int, hit_ids):
+        """Store the embedding and the hit IDs for top_k"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if not self._check_version(version):
+                return
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"embedding": embedding, "ids": {}}
+                self._entries[key] = entry
+            entry["ids"][top_k] = list(hit_ids)
+            entry["expires"] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate_percent": round(self.hits / lookups * 100, 2) if lookups else 0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+QUERY_CACHE = QueryCache()
+
+# How queries were answered (exact = lexical fast path, no embedding)
+RETRIEVAL_COUNTS = {"exact": 0, "hybrid": 0, "vector": 0}
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for cache keys: case, whitespace and trailing punctuation"""
+    return _WHITESPACE.sub(" ", query.lower()).strip().rstrip("?!. ")
+
+
+def _log_hits(hits):
+    # Debug output with type info
+    if not hits:
+        print("⚠️ No results")
+    else:
+        types = [h["metadata"].get("type", "unknown") for h in hits]
+        type_counts = {}
+        for t in types:
+            type_counts[t] = type_counts.get(t, 0) + 1
+        print(f"✓ Retrieved {len(hits)} docs: {type_counts}")
+
+
+def _pinned_index():
+    """(backend, lexical index, index version) of the request's snapshot"""
+    snapshot = get_snapshot()
+    if snapshot.backend is not None:
+        return snapshot.backend, snapshot.lexical, snapshot.index_version
+    # Index not attached yet (still warming up): use the live one
+    return get_vector_backend(), snapshot.lexical, get_index_version()
+
+
+def _exact_hits(backend, lexical, query, top_k):
+    """
+    Hits for a query that names one scheme or contains its ID: that scheme
+    first, then the best BM25 matches. None when there is no confident match,
+    so the caller embeds as usual.
+    """
+    if not HYBRID_RETRIEVAL:
+        return None
+    scheme_id = lexical.exact_match(query)
+    if scheme_id is None:
+        return None
+    with span("lexical_query"):
+        ids = [scheme_id] + [doc_id for doc_id, _ in lexical.search(query, top_k + 1) if doc_id != scheme_id]
+        hits = backend.get(ids[:top_k])
+    if not hits or hits[0]["id"] != scheme_id:
+        # Lexical index ahead of the vector index (sync in progress): take the normal path
+        return None
+    RETRIEVAL_COUNTS["exact"] += 1
+    print(f"✓ Exact match {scheme_id}: skipped embedding")
+    _log_hits(hits)
+    return hits
+
+
+def _fuse(backend, lexical, query, vector_hits, top_k):
+    """
+    Reciprocal rank fusion of the vector ranking and the BM25 ranking.
+    Hits keep the backend's cosine "score" (None for BM25-only hits) and
+    carry the fusion score as "rrf_score".
+    """
+    with span("lexical_query"):
+        lexical = lexical.search(query, HYBRID_CANDIDATES)
+    if not lexical:
+        return vector_hits[:top_k]
+    fused = reciprocal_rank_fusion(
+        [[h["id"] for h in vector_hits], [doc_id for doc_id, _ in lexical]], k=RRF_K
+    )[:top_k]
+    by_id = {h["id"]: h for h in vector_hits}
+    missing = [doc_id for doc_id, _ in fused if doc_id not in by_id]
+    if missing:
+        by_id.update((h["id"], h) for h in backend.get(missing))
+    hits = []
+    for doc_id, score in fused:
+        if doc_id in by_id:
+            hit = dict(by_id[doc_id])
+            hit.setdefault("score", None)
+            hit["rrf_score"] = score
+            hits.append(hit)
+    return hits
+
+
+def _search_embedding(backend, lexical, key, version, embedding, top_k, query):
+    with span("vector_query"):
+        hits = backend.query(embedding, max(top_k, HYBRID_CANDIDATES) if HYBRID_RETRIEVAL else top_k)
+    if HYBRID_RETRIEVAL:
+        hits = _fuse(backend, lexical, query, hits, top_k)
+        RETRIEVAL_COUNTS["hybrid"] += 1
+    else:
+        RETRIEVAL_COUNTS["vector"] += 1
+    QUERY_CACHE.put(key, version, embedding, top_k, [h["id"] for h in hits])
+    _log_hits(hits)
+    return hits
+
+
+@traced()
 def semantic_search(query: str, top_k: int = 2):  # Conservative for system resources
     """Lightweight semantic search with minimal memory usage"""
     try:
-        model, collection = get_vector_components()
+        backend, lexical, version = _pinned_index()
 
         # Truncate long queries to save processing
         if len(query) > 200:
             query = query[:200]
 
-        results = collection.query(
-            query_texts=[query],
-            n_results=top_k
-        )
+        key = normalize_query(query)
+        entry = QUERY_CACHE.get(key, version)
 
-        documents = results.get("documents", [[]])[0]
-        metadatas = results.get("metadatas", [[]])[0]
+        if entry is not None and top_k in entry["ids"]:
+            # Full hit: no model inference, no vector search
+            hits = backend.get(entry["ids"][top_k])
+            print(f"✓ Retrieved {len(hits)} docs from query cache")
+            return hits
 
-        hits = []
-        for doc, meta in zip(documents, metadatas):
-            hits.append({
-                "text": doc,
-                "metadata": meta
-            })
+        hits = _exact_hits(backend, lexical, query, top_k)
+        if hits is not None:
+            return hits
 
-        # Debug output with type info
-        if not hits:
-            print("⚠️ No results")
+        if entry is not None:
+            embedding = entry["embedding"]
         else:
-            types = [h["metadata"].get("type", "unknown") for h in hits]
-            type_counts = {}
-            for t in types:
-                type_counts[t] = type_counts.get(t, 0) + 1
-            print(f"✓ Retrieved {len(hits)} docs: {type_counts}")
-
-        # Clean up
-        gc.collect()
-        
-        return hits
+            with span("embed"):
+                # Loaded here, not up front: cache hits and exact matches never need the model
+                model = get_embedding_function()
+                embedding = model.encode(
+                    [query],
+                    show_progress_bar=False,
+                    convert_to_numpy=True
+                )[0]
+
+        return _search_embedding(backend, lexical, key, version, embedding, top_k, query)
         
     except Exception as e:
         print(f"❌ Search error: {e}")
-        return []
\ No newline at end of file
+        return []
+
+
+async def _encode_batch(texts):
+    if EMBEDDING_POOL.started:
+        return await EMBEDDING_POOL.encode(texts)
+    # First use may load the model (deferred when the data snapshot covers the index)
+    model = await asyncio.to_thread(get_embedding_function)
+    return await asyncio.to_thread(model.encode, texts, show_progress_bar=False, convert_to_numpy=True)
+
+
+# Concurrent queries share model calls; one batch per pool process (or one inline) at a time
+QUERY_BATCHER = MicroBatcher(
+    _encode_batch,
+    concurrency=lambda: EMBEDDING_POOL.size if EMBEDDING_POOL.started else 1,
+)
+
+
+async def _aencode(query: str):
+    if QUERY_BATCHER.enabled:
+        return await QUERY_BATCHER.embed(query)
+    return (await EMBEDDING_POOL.encode([query]))[0]
+
+
+async def _on_backend(backend, fn, *args):
+    # The NumPy backend is a sub-millisecond in-memory scan; others may do I/O
+    if backend.name == "numpy":
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+async def asemantic_search(query: str, top_k: int = 2):
+    """
+    semantic_search for the event loop. Queries arriving within
+    EMBEDDING_BATCH_WINDOW_MS are encoded in one model call, in the embedding
+    process pool when EMBEDDING_POOL_SIZE > 0. With neither, the whole search
+    runs in a worker thread. Raises EmbeddingPoolBusy when the pool sheds the job.
+    """
+    pool_started = EMBEDDING_POOL.started
+    if not (pool_started or QUERY_BATCHER.enabled):
+        return await asyncio.to_thread(semantic_search, query, top_k)
+
+    try:
+        # May block on first use (disk, or the warm-up thread still opening it)
+        backend, lexical, version = await asyncio.to_thread(_pinned_index)
+
+        # Truncate long queries to save processing
+        if len(query) > 200:
+            query = query[:200]
+
+        key = normalize_query(query)
+        entry = QUERY_CACHE.get(key, version)
+
+        if entry is not None and top_k in entry["ids"]:
+            hits = await _on_backend(backend, backend.get, entry["ids"][top_k])
+            print(f"✓ Retrieved {len(hits)} docs from query cache")
+            return hits
+
+        hits = await _on_backend(backend, _exact_hits, backend, lexical, query, top_k)
+        if hits is not None:
+            return hits
+
+        if entry is not None:
+            embedding = entry["embedding"]
+        else:
+            with span("embed"):
+                embedding = await _aencode(query)
+
+        return await _on_backend(backend, _search_embedding, backend, lexical, key, version, embedding, top_k, query)
+
+    except EmbeddingPoolBusy:
+        raise
+    except Exception as e:
+        if pool_started and not EMBEDDING_POOL.started:
+            # The pool broke under this request; answer it inline
+            return await asyncio.to_thread(semantic_search, query, top_k)
+        print(f"❌ Search error: {e}")
+        return []
+
+
+@traced()
+def semantic_search_batch(queries, top_k: int = 2):
+    """
+    Semantic search for many queries at once.
+    Identical (normalized) queries are searched once, queries naming a scheme
+    skip embedding, and all other cache misses are embedded in a single model.encode call. Returns hits per query, in order.
+    Raises on failure so batch callers can report per-item errors.
+    """
+    backend, lexical, version = _pinned_index()
+
+    keys = []
+    unique = {}  # normalized key -> truncated query
+    for query in queries:
+        query = query[:200]
+        key = normalize_query(query)
+        keys.append(key)
+        unique.setdefault(key, query)
+
+    results = {}
+    embeddings = {}
+    to_encode = []
+    for key, query in unique.items():
+        entry = QUERY_CACHE.get(key, version)
+        if entry is not None and top_k in entry["ids"]:
+            results[key] = backend.get(entry["ids"][top_k])
+            continue
+        exact = _exact_hits(backend, lexical, query, top_k)
+        if exact is not None:
+            results[key] = exact
+        elif entry is not None:
+            embeddings[key] = entry["embedding"]
+        else:
+            to_encode.append(key)
+
+    if to_encode:
+        with span("embed"):
+            model = get_embedding_function()
+            encoded = model.encode(
+                [unique[key] for key in to_encode],
+                show_progress_bar=False,
+                convert_to_numpy=True
+            )
+        embeddings.update(zip(to_encode, encoded))
+
+    for key, embedding in embeddings.items():
+        results[key] = _search_embedding(backend, lexical, key, version, embedding, top_k, unique[key])
+
+    print(f"✓ Batch search: {len(queries)} queries, {len(unique)} unique, {len(to_encode)} encoded")
+    return [results[key] for key in keys]
+
+
+def get_query_cache_stats() -> dict:
+    return QUERY_CACHE.stats()
+
+
+def get_embedding_batch_stats() -> dict:
+    return QUERY_BATCHER.stats()
+
+
+def get_retrieval_stats() -> dict:
+    return {
+        "hybrid": HYBRID_RETRIEVAL,
+        "rrf_k": RRF_K,
+        "lexical_documents": len(get_snapshot().lexical),
+        "answered": dict(RETRIEVAL_COUNTS),
+    }
@@ -1,70 +1,137 @@
 import json
-import re
+import os
+import threading
+import time
 
-def load_schemes():
+from app.lexical_index import LexicalIndex, tokenize
+
+SCHEMES_PATH = os.getenv("SIMPLE_SCHEMES_PATH", "data/kerala_schemes.json")
+SIMPLE_RELOAD_CHECK_INTERVAL = float(os.getenv("SIMPLE_RELOAD_CHECK_INTERVAL", "1.0"))  # seconds between stat() calls
+
+GREETING_WORDS = {"hi", "hello", "hey"}
+
+GREETING_REPLY = "Hello! I can help you find information about Kerala government schemes. Ask me about schemes for women, seniors, employment, housing, etc."
+THANKS_REPLY = "You're welcome! Feel free to ask if you need more information."
+NO_MATCH_REPLY = "I couldn't find any schemes matching your query. Try asking about women welfare, senior citizens, employment, or housing schemes."
+
+def load_schemes(path: str = SCHEMES_PATH):
     """Load schemes from JSON file"""
     try:
-        with open("data/kerala_schemes.json", "r", encoding="utf-8") as f:
+        with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
             return data.get("kerala_schemes", [])
     except Exception as e:
         print(f"Error loading schemes: {e}")
         return []
 
-def search_schemes(query: str, schemes: list) -> str:
-    """Simple keyword-based search in schemes"""
-    query_lower = query.lower()
-    
-    # Check for greetings
-    if any(word in query_lower for word in ["hi", "hello", "hey"]):
-        return "Hello! I can help you find information about Kerala government schemes. Ask me about schemes for women, seniors, employment, housing, etc."
-    
-    # Check for thanks
-    if any(word in query_lower for word in ["thank", "thanks"]):
-        return "You're welcome! Feel free to ask if you need more information."
-    
-    # Search for matching schemes
-    results = []
-    for scheme in schemes:
-        # Search in name, category, and benefit
-        searchable_text = f"{scheme.get('name', '')} {scheme.get('category', '')} {scheme.get('benefit', '')}".lower()
-        
-        # Check if query words are in the scheme
-        query_words = query_lower.split()
-        matches = sum(1 for word in query_words if len(word) > 2 and word in searchable_text)
-        
-        if matches > 0:
-            results.append((matches, scheme))
-    
-    # Sort by number of matches
-    results.sort(reverse=True, key=lambda x: x[0])
-    
-    if not results:
-        return "I couldn't find any schemes matching your query. Try asking about women welfare, senior citizens, employment, or housing schemes."
-    
-    # Return top result
-    scheme = results[0][1]
-    
+def render_scheme(scheme: dict) -> str:
+    """Reply text for a scheme: name, category, benefit, eligibility, first steps"""
     response = f"**{scheme['name']}**\n\n"
-    response += f"Category: {scheme['category']}\n"
-    response += f"Benefit: {scheme['benefit']}\n\n"
-    
+    response += f"Category: {scheme.get('category', '')}\n"
+    response += f"Benefit: {scheme.get('benefit', '')}\n\n"
+
     # Add eligibility
-    if 'eligibility' in scheme:
+    if scheme.get('eligibility'):
         response += "**Eligibility:**\n"
         for key, value in scheme['eligibility'].items():
             response += f"- {key.replace('_', ' ').title()}: {value}\n"
         response += "\n"
-    
+
     # Add application steps
-    if 'roadmap' in scheme and scheme['roadmap']:
+    if scheme.get('roadmap'):
         response += "**How to Apply:**\n"
         for step in scheme['roadmap'][:3]:  # Show first 3 steps
             response += f"{step['step']}. {step['title']}: {step['action']}\n"
-    
+
     return response
 
+class SchemeIndex:
+    """
+    Schemes as a BM25 inverted index plus a pre-rendered reply per scheme.
+    Built on first use and rebuilt only when the JSON file's mtime changes,
+    checked with one stat() per interval. Readers use the current state
+    without locking; a rebuild swaps it in with one assignment. A file that
+    fails to load keeps the previous state and is retried on the next check.
+    """
+
+    def __init__(self, path: str = SCHEMES_PATH, interval: float = SIMPLE_RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.reloads = 0
+        self._state = None  # (mtime, lexical index, replies by scheme id)
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _build(self, mtime):
+        start = time.perf_counter()
+        schemes = load_schemes(self.path)
+        documents = [
+            (scheme.get('id', f"scheme_{idx}"), scheme)
+            for idx, scheme in enumerate(schemes)
+            if isinstance(scheme, dict) and scheme.get('name')
+        ]
+        if not documents and self._state is not None:
+            print(f"⚠️ No schemes in {self.path}; keeping the previous index")
+            return None
+        lexical = LexicalIndex().build(documents)
+        replies = {doc_id: render_scheme(scheme) for doc_id, scheme in documents}
+        self.reloads += 1
+        print(f"📇 Indexed {len(documents)} schemes from {self.path} "
+              f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return mtime, lexical, replies
+
+    def current(self):
+        """(lexical index, replies by scheme id), reloaded if the file changed"""
+        state = self._state
+        now = time.monotonic()
+        if state is not None and now - self._last_check < self.interval:
+            return state[1], state[2]
+        self._last_check = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if state is None or mtime != state[0]:
+            with self._lock:
+                if self._state is None or mtime != self._state[0]:
+                    built = self._build(mtime)
+                    if built is not None:
+                        self._state = built
+            state = self._state
+        return state[1], state[2]
+
+    def stats(self) -> dict:
+        lexical = self._state[1] if self._state is not None else None
+        return {"path": self.path, "schemes": len(lexical) if lexical is not None else 0, "reloads": self.reloads}
+
+
+SCHEME_INDEX = SchemeIndex()
+
+def search_schemes(query: str, index: SchemeIndex = SCHEME_INDEX) -> str:
+    """Keyword search: greetings and thanks by whole word, then the best BM25 match"""
+    tokens = set(tokenize(query))
+
+    # Check for greetings ("hi" in "Kochi" is not one)
+    if tokens & GREETING_WORDS:
+        return GREETING_REPLY
+
+    # Check for thanks
+    if any(token.startswith("thank") for token in tokens):
+        return THANKS_REPLY
+
+    lexical, replies = index.current()
+
+    # A query naming one scheme (or its ID) goes straight to it
+    scheme_id = lexical.exact_match(query)
+    if scheme_id is None:
+        best = lexical.search(query, 1)
+        if not best:
+            return NO_MATCH_REPLY
+        scheme_id = best[0][0]
+
+    return replies[scheme_id]
+
 def simple_chat(message: str) -> str:
     """Simple chat without AI - just keyword matching"""
-    schemes = load_schemes()
-    return search_schemes(message, schemes)
+    return search_schemes(message)
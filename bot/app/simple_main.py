@@ -1,7 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from app.simple_chat import simple_chat
+from app.simple_chat import SCHEME_INDEX, simple_chat
 
 app = FastAPI(
     title="Kerala Schemes Chatbot",
@@ -24,9 +24,14 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     reply: str
 
+@app.on_event("startup")
+def startup_event():
+    """Build the scheme index before the first request (rebuilt when the JSON changes)"""
+    SCHEME_INDEX.current()
+
 @app.get("/")
 def health_check():
-    return {"status": "healthy", "message": "Kerala Schemes Chatbot is running"}
+    return {"status": "healthy", "message": "Kerala Schemes Chatbot is running", "index": SCHEME_INDEX.stats()}
 
 @app.post("/chat", response_model=ChatResponse)
 def chat_endpoint(req: ChatRequest):
@@ -0,0 +1,292 @@
+"""
+Versioned on-disk data snapshot: the schemes plus the vector index they
+produce, written by the sync pipeline so a process can boot without parsing
+the pretty-printed source JSON or embedding anything.
+
+Layout (DATA_SNAPSHOT_DIR):
+    header.json               format, content hash, counts, embedding signature, source file stats
+    records-<hash>.jsonl      compact JSON lines (orjson): vector IDs/documents/metadata, then one event per line
+    embeddings-<hash>.npy     float32 matrix, L2-normalized, row i = ids[i]; memory-mapped on load
+
+Events are decoded when first accessed, so loading costs one read, a hash
+and a newline scan; the cache and index only ever touch the first MAX_EVENTS.
+
+Data files are named by content hash and the header is replaced last, so a
+reader sees either the previous snapshot or the new one, never a mix.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections.abc import Sequence
+from datetime import datetime
+
+import numpy as np
+
+from app.embeddings import embedding_signature
+from app.json_store import DEFAULT_SCHEMES_PATH, SYNCED_EVENTS_PATH, load_all_events
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib (slower, same format)
+    orjson = None
+
+DATA_SNAPSHOT = os.getenv("DATA_SNAPSHOT", "true").lower() in ("1", "true", "yes")
+DATA_SNAPSHOT_DIR = os.getenv("DATA_SNAPSHOT_DIR", os.path.join("vector_store_lite", "data_snapshot"))
+SNAPSHOT_FORMAT = 1  # bump when the layout changes; older snapshots are ignored
+
+HEADER_FILE = "header.json"
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _source_stat(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _sources(path: str):
+    """Stats of the files the events come from: the schemes file and the sync output"""
+    return {"schemes": _source_stat(path), "synced": _source_stat(SYNCED_EVENTS_PATH)}
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class RecordArray(Sequence):
+    """Read-only list of JSON-lines records, each decoded on first access"""
+
+    def __init__(self, data: bytes, starts, ends):
+        self._data = data
+        self._starts = starts
+        self._ends = ends
+        self._decoded = [None] * len(starts)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        record = self._decoded[index]
+        if record is None:
+            record = _loads(self._data[self._starts[index]:self._ends[index]])
+            self._decoded[index] = record
+        return record
+
+
+def _split_lines(data: bytes):
+    """Start/end offsets of each line; JSON encoders escape newlines inside strings"""
+    ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 0x0A)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    return starts.tolist(), ends.tolist()
+
+
+class StoredSnapshot:
+    """A snapshot read from disk; `embeddings` is a read-only memory map"""
+
+    __slots__ = ("header", "events", "ids", "documents", "metadatas", "embeddings")
+
+    def __init__(self, header, events, ids, documents, metadatas, embeddings):
+        self.header = header
+        self.events = events
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.embeddings = embeddings
+
+    @property
+    def content_hash(self) -> str:
+        return self.header["content_hash"]
+
+    def is_current(self, source_path: str) -> bool:
+        """Built from `source_path` and the sync output as they are now (else its events are outdated; vectors stay reusable)"""
+        return self.header.get("source") == _sources(source_path)
+
+    def covers(self, signature: str = None) -> bool:
+        """True if the vectors were made by the current embedding model (no re-embedding needed)"""
+        return bool(self.ids) and self.header.get("embedding_signature") == (signature or embedding_signature())
+
+    def vectors_by_hash(self) -> dict:
+        """Document content hash -> stored vector, for reuse when indexing"""
+        if not self.covers():
+            return {}
+        return {
+            meta.get("content_hash"): self.embeddings[i]
+            for i, meta in enumerate(self.metadatas)
+            if meta.get("content_hash")
+        }
+
+
+_last = None  # most recent snapshot read or written by this process
+
+
+def last_snapshot():
+    return _last
+
+
+def covers_index() -> bool:
+    """The last snapshot holds vectors for the current embedding model"""
+    return _last is not None and _last.covers()
+
+
+def read_snapshot(directory: str = DATA_SNAPSHOT_DIR):
+    """
+    Load the snapshot if it exists, has the current format and is intact;
+    None otherwise. Check is_current() before trusting its events.
+    """
+    global _last
+
+    if not DATA_SNAPSHOT:
+        return None
+    try:
+        with open(os.path.join(directory, HEADER_FILE), "rb") as f:
+            header = _loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+    if header.get("format") != SNAPSHOT_FORMAT:
+        print(f"⚠️ Data snapshot format {header.get('format')} != {SNAPSHOT_FORMAT}; ignoring it")
+        return None
+
+    try:
+        with open(os.path.join(directory, header["records_file"]), "rb") as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != header["records_digest"]:
+            print("⚠️ Data snapshot records are corrupt; loading JSON")
+            return None
+        starts, ends = _split_lines(data)
+        vectors = _loads(data[starts[0]:ends[0]])
+        events = RecordArray(data, starts[1:], ends[1:])
+        embeddings = np.load(os.path.join(directory, header["embeddings_file"]), mmap_mode="r")
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        print(f"⚠️ Could not read data snapshot: {e}")
+        return None
+
+    _last = StoredSnapshot(
+        header, events, vectors["ids"], vectors["documents"], vectors["metadatas"], embeddings
+    )
+    return _last
+
+
+def write_snapshot(events, backend, source_path: str = DEFAULT_SCHEMES_PATH, directory: str = DATA_SNAPSHOT_DIR):
+    """
+    Write `events` and the contents of `backend` as the current snapshot.
+    Nothing is written when the content and source are unchanged. Returns the header.
+    """
+    if not DATA_SNAPSHOT:
+        return None
+    start = time.perf_counter()
+    ids, embeddings, documents, metadatas = backend.export()
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2:
+        matrix = matrix.reshape(len(ids), -1)
+
+    lines = [_dumps({"ids": list(ids), "documents": list(documents), "metadatas": list(metadatas)})]
+    lines.extend(_dumps(event) for event in events)
+    records = b"\n".join(lines) + b"\n"
+    records_digest = hashlib.sha256(records).hexdigest()
+    matrix_digest = hashlib.sha256(matrix.tobytes()).hexdigest()
+    content_hash = hashlib.sha256(f"{records_digest}:{matrix_digest}".encode("ascii")).hexdigest()[:16]
+    source = _sources(source_path)
+
+    current = _last
+    if current is not None and current.content_hash == content_hash and current.header.get("source") == source:
+        return current.header
+
+    os.makedirs(directory, exist_ok=True)
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "content_hash": content_hash,
+        "records_digest": records_digest,
+        "records_file": f"records-{content_hash}.jsonl",
+        "embeddings_file": f"embeddings-{content_hash}.npy",
+        "events": len(events),
+        "vectors": len(ids),
+        "dimensions": int(matrix.shape[1]) if matrix.size else 0,
+        "embedding_signature": embedding_signature(),
+        "source": source,
+        "created_at": datetime.now().isoformat(),
+    }
+    _write_atomic(os.path.join(directory, header["records_file"]), records)
+    tmp_path = os.path.join(directory, f"{header['embeddings_file']}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp_path, os.path.join(directory, header["embeddings_file"]))
+    _write_atomic(os.path.join(directory, HEADER_FILE), _dumps(header))
+    _prune(directory, keep={header["records_file"], header["embeddings_file"]})
+
+    read_snapshot(directory)
+    print(f"💾 Wrote data snapshot {content_hash} ({len(events)} events, {len(ids)} vectors) "
+          f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return header
+
+
+def refresh_snapshot(events, backend, summary: dict, source_path: str = DEFAULT_SCHEMES_PATH):
+    """
+    After build_vector_store: write the snapshot unless it already mirrors
+    `source_path` and the index (skips exporting the index on every start).
+    """
+    changed = summary["added"] or summary["updated"] or summary["removed"]
+    if covers_index() and not changed and _last.is_current(source_path):
+        return _last.header
+    return write_snapshot(events, backend, source_path)
+
+
+def _prune(directory: str, keep: set):
+    # Processes that already mapped an older matrix keep reading it after the unlink
+    for name in os.listdir(directory):
+        if name.startswith(("records-", "embeddings-")) and name not in keep and not name.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def load_events(filepath: str = DEFAULT_SCHEMES_PATH):
+    """
+    Schemes from the data snapshot when it is current (a lazily decoded
+    sequence), else from the JSON file plus the sync output (a list).
+    """
+    stored = read_snapshot()
+    if stored is None:
+        return load_all_events(filepath)
+    if not stored.is_current(filepath):
+        # Unchanged schemes still reuse their stored vectors when the index syncs
+        print(f"⚠️ {filepath} or {SYNCED_EVENTS_PATH} changed since data snapshot {stored.content_hash}; loading JSON")
+        return load_all_events(filepath)
+    print(f"📄 Loaded {len(stored.events)} schemes from data snapshot {stored.content_hash}")
+    return stored.events
+
+
+def snapshot_stats() -> dict:
+    if _last is None:
+        return {"enabled": DATA_SNAPSHOT, "loaded": False}
+    header = _last.header
+    return {
+        "enabled": DATA_SNAPSHOT,
+        "loaded": True,
+        "content_hash": header["content_hash"],
+        "created_at": header["created_at"],
+        "events": header["events"],
+        "vectors": header["vectors"],
+        "covers_index": _last.covers(),
+    }
@@ -0,0 +1,73 @@
+import functools
+import os
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Tracing configuration
+TRACE_SPANS = os.getenv("TRACE_SPANS", "false").lower() in ("1", "true", "yes")
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "0"))  # only log spans at least this slow
+
+# Request ID and current span path, carried across awaits and asyncio.to_thread
+REQUEST_ID = ContextVar("request_id", default="-")
+_SPAN_PATH = ContextVar("span_path", default="")
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def set_request_id(request_id: str = None):
+    """Bind a request ID to the current context; returns a token for reset_request_id()"""
+    return REQUEST_ID.set(request_id or new_request_id())
+
+
+def reset_request_id(token):
+    REQUEST_ID.reset(token)
+
+
+def get_request_id() -> str:
+    return REQUEST_ID.get()
+
+
+def log_span(name: str, seconds: float):
+    """Log a finished span, e.g. `🔎 [req=3f2a9c1d0b7e] POST /chat > retrieval 12.41ms`"""
+    elapsed_ms = seconds * 1000
+    if elapsed_ms < TRACE_SLOW_MS:
+        return
+    path = _SPAN_PATH.get()
+    full_name = f"{path} > {name}" if path else name
+    print(f"🔎 [req={REQUEST_ID.get()}] {full_name} {elapsed_ms:.2f}ms")
+
+
+@contextmanager
+def _traced(name: str):
+    path = _SPAN_PATH.get()
+    token = _SPAN_PATH.set(f"{path} > {name}" if path else name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _SPAN_PATH.reset(token)
+        log_span(name, elapsed)
+
+
+# With TRACE_SPANS off a span is a bare nullcontext: no clock reads, no logging
+span = _traced if TRACE_SPANS else nullcontext
+
+
+def traced(name: str = None):
+    """Decorator form of span(); returns the function untouched when tracing is off"""
+    def decorator(fn):
+        if not TRACE_SPANS:
+            return fn
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _traced(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
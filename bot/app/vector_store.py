@@ -1,78 +1,478 @@
-import chromadb
-from chromadb.config import Settings
+import numpy as np
+import hashlib
+from abc import ABC, abstractmethod
+import json
 import os
 import gc
+import threading
 
-# Force CPU mode and disable GPU
-os.environ['CUDA_VISIBLE_DEVICES'] = ''
-os.environ['OMP_NUM_THREADS'] = '2'  # Limit threading
+# Default to CPU mode and a small thread pool; values set in the environment win
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')
+os.environ.setdefault('OMP_NUM_THREADS', '2')  # Limit threading unless configured
 
-from app.doc_loader import load_fest_documents
-
-# ⚡ LIGHTWEIGHT: Use all-MiniLM-L6-v2 (22MB model, very efficient)
-MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+from app.tracing import span, traced
+from app.embeddings import EMBEDDING_BACKEND, embedding_signature, load_embedding_model
+from app.snapshot_store import last_snapshot
 VECTOR_DIR = "vector_store_lite"
 COLLECTION_NAME = "event_details_lite"
 FEST_DOC_PATH = "data/festivals.txt"
 
+# Vector index backend: "chroma" (persistent HNSW) or "numpy" (in-process exact search)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+NUMPY_INDEX_PATH = os.path.join(VECTOR_DIR, "numpy_index")  # .npy matrix + .json records
+# Memory-map the NumPy matrix read-only: pages come from the OS page cache and are shared by all workers
+NUMPY_INDEX_MMAP = os.getenv("NUMPY_INDEX_MMAP", "true").lower() in ("1", "true", "yes")
+
 # Memory limits
 MAX_BATCH_SIZE = 25  # Smaller batches
 MAX_CACHE_SIZE = 100  # Limit in-memory cache
 
+
+def _unit_rows(vectors) -> np.ndarray:
+    """float32 copy of `vectors` scaled to unit L2 norm (zero vectors left as is)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorBackend(ABC):
+    """
+    Interface for vector index backends.
+    Hits are dicts with "id", "text", "metadata" and (for queries) "score".
+    Vectors are stored unit-length and "score" is always cosine similarity
+    (higher is better, 1.0 = same direction), whatever the backend measures.
+    """
+    name = "base"
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored documents"""
+
+    @abstractmethod
+    def upsert(self, ids, embeddings, documents, metadatas):
+        """Insert or replace documents with their embeddings"""
+
+    @abstractmethod
+    def delete(self, ids):
+        """Remove documents by ID (unknown IDs are ignored)"""
+
+    @abstractmethod
+    def get_hashes(self) -> dict:
+        """Stored content hash per document ID (None for legacy entries)"""
+
+    @abstractmethod
+    def get(self, ids):
+        """Fetch documents by ID, preserving the requested order"""
+
+    @abstractmethod
+    def query(self, embedding, top_k: int):
+        """Top-k nearest documents for one query embedding"""
+
+    @abstractmethod
+    def export(self):
+        """Everything stored, as (ids, embeddings, documents, metadatas), for the data snapshot"""
+
+    def persist(self):
+        """Flush pending writes to disk (no-op for self-persisting backends)"""
+
+    def close(self):
+        """Release handles so the index can be reopened (e.g. after another process rebuilt it)"""
+
+    def clone(self) -> "VectorBackend":
+        """
+        A private copy to apply a sync to, so readers of this one are unaffected.
+        Backends that cannot copy cheaply (Chroma) return themselves and change in place.
+        """
+        return self
+
+
+class ChromaBackend(VectorBackend):
+    """ChromaDB PersistentClient (SQLite + HNSW)"""
+    name = "chroma"
+
+    def __init__(self, path: str = VECTOR_DIR, collection_name: str = COLLECTION_NAME):
+        import chromadb
+        from chromadb.config import Settings
+
+        # Use PersistentClient for actual persistence
+        self.client = chromadb.PersistentClient(
+            path=path,
+            settings=Settings(
+                anonymized_telemetry=False,
+                allow_reset=True
+            )
+        )
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name
+        )
+        # Distance function of the collection ("l2" unless created otherwise)
+        self.space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def close(self):
+        # PersistentClient caches one system per path; drop it so a reopen re-reads the index
+        try:
+            self.client.clear_system_cache()
+        except AttributeError:
+            pass
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.collection.upsert(
+            documents=documents,
+            embeddings=[list(map(float, e)) for e in _unit_rows(embeddings)],
+            metadatas=metadatas,
+            ids=ids
+        )
+
+    def delete(self, ids):
+        if ids:
+            self.collection.delete(ids=list(ids))
+
+    def get_hashes(self) -> dict:
+        results = self.collection.get(include=["metadatas"])
+        return {
+            doc_id: (meta or {}).get("content_hash")
+            for doc_id, meta in zip(results["ids"], results["metadatas"])
+        }
+
+    def get(self, ids):
+        if not ids:
+            return []
+        results = self.collection.get(ids=list(ids), include=["documents", "metadatas"])
+        by_id = {
+            doc_id: {"id": doc_id, "text": doc, "metadata": meta}
+            for doc_id, doc, meta in zip(results["ids"], results["documents"], results["metadatas"])
+        }
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
+    def export(self):
+        results = self.collection.get(include=["embeddings", "documents", "metadatas"])
+        embeddings = results["embeddings"]
+        if embeddings is None or len(embeddings) == 0:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        return results["ids"], _unit_rows(embeddings), results["documents"], results["metadatas"]
+
+    def _similarity(self, distance):
+        # Unit vectors: squared L2 = 2 - 2 cos; "cosine" and "ip" distances are 1 - cos
+        if distance is None:
+            return None
+        if self.space == "l2":
+            return 1.0 - float(distance) / 2.0
+        return 1.0 - float(distance)
+
+    def query(self, embedding, top_k: int):
+        results = self.collection.query(
+            query_embeddings=[list(map(float, _unit_rows(embedding)))],
+            n_results=top_k
+        )
+        ids = results.get("ids", [[]])[0]
+        documents = results.get("documents", [[]])[0]
+        metadatas = results.get("metadatas", [[]])[0]
+        distances = (results.get("distances") or [[None] * len(ids)])[0]
+        return [
+            {"id": doc_id, "text": doc, "metadata": meta, "score": self._similarity(dist)}
+            for doc_id, doc, meta, dist in zip(ids, documents, metadatas, distances)
+        ]
+
+
+class NumpyBackend(VectorBackend):
+    """
+    In-process exact search over a contiguous, L2-normalized float32 matrix.
+    Top-k is one matrix-vector product plus argpartition. The matrix is
+    persisted to `<path>.npy`, documents and metadata to `<path>.json`.
+    """
+    name = "numpy"
+
+    def __init__(self, path: str = NUMPY_INDEX_PATH, mmap: bool = NUMPY_INDEX_MMAP):
+        self.path = path
+        self.mmap = mmap
+        self.matrix = None
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self._positions = {}
+        self._load()
+
+    def _load(self):
+        matrix_path, records_path = self.path + ".npy", self.path + ".json"
+        if not (os.path.exists(matrix_path) and os.path.exists(records_path)):
+            return
+        with open(records_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        matrix = np.load(matrix_path, mmap_mode="r" if self.mmap else None)
+        if matrix.size == 0:
+            matrix = None  # persisted empty index; the next upsert sets the dimension
+        elif matrix.dtype != np.float32 or not matrix.flags["C_CONTIGUOUS"]:
+            matrix = np.ascontiguousarray(matrix, dtype=np.float32)  # copies; persist() writes float32
+        self.matrix = matrix
+        self.ids = records["ids"]
+        self.documents = records["documents"]
+        self.metadatas = records["metadatas"]
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        mode = "memory-mapped" if isinstance(matrix, np.memmap) else "in memory"
+        print(f"📂 Loaded NumPy vector index ({len(self.ids)} vectors, {mode})")
+
+    @classmethod
+    def from_snapshot(cls, stored, path: str = NUMPY_INDEX_PATH, mmap: bool = NUMPY_INDEX_MMAP) -> "NumpyBackend":
+        """Serve the data snapshot's vectors directly (no JSON parse, matrix memory-mapped)"""
+        backend = cls.__new__(cls)
+        backend.path = path
+        backend.mmap = mmap
+        if stored.embeddings.size == 0:
+            backend.matrix = None
+        else:
+            backend.matrix = stored.embeddings if mmap else np.array(stored.embeddings, dtype=np.float32)
+        backend.ids = list(stored.ids)
+        backend.documents = list(stored.documents)
+        backend.metadatas = list(stored.metadatas)
+        backend._positions = {doc_id: i for i, doc_id in enumerate(backend.ids)}
+        print(f"📂 Loaded NumPy vector index from data snapshot {stored.content_hash} ({len(backend.ids)} vectors)")
+        return backend
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        return _unit_rows(vectors)
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def clone(self) -> "NumpyBackend":
+        copy = NumpyBackend.__new__(NumpyBackend)
+        copy.path = self.path
+        copy.mmap = self.mmap
+        # Rows are updated in place, so the copy gets its own matrix (at most MAX_CACHE_SIZE rows)
+        copy.matrix = None if self.matrix is None else np.array(self.matrix, dtype=np.float32)
+        copy.ids = list(self.ids)
+        copy.documents = list(self.documents)
+        copy.metadatas = list(self.metadatas)
+        copy._positions = dict(self._positions)
+        return copy
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        vectors = self._normalize(embeddings)
+        if self.matrix is not None and not self.matrix.flags.writeable:
+            # Memory-mapped read-only: write to a private copy, persist() swaps the file
+            self.matrix = np.array(self.matrix)
+        new_rows = []
+        for doc_id, vector, doc, meta in zip(ids, vectors, documents, metadatas):
+            pos = self._positions.get(doc_id)
+            if pos is not None:
+                self.matrix[pos] = vector
+                self.documents[pos] = doc
+                self.metadatas[pos] = meta
+            else:
+                self._positions[doc_id] = len(self.ids)
+                self.ids.append(doc_id)
+                self.documents.append(doc)
+                self.metadatas.append(meta)
+                new_rows.append(vector)
+        if new_rows:
+            stacked = np.stack(new_rows)
+            empty = self.matrix is None or self.matrix.size == 0
+            self.matrix = stacked if empty else np.concatenate([self.matrix, stacked])
+            self.matrix = np.ascontiguousarray(self.matrix, dtype=np.float32)
+
+    def delete(self, ids):
+        remove = {doc_id for doc_id in ids if doc_id in self._positions}
+        if not remove:
+            return
+        keep = [i for i, doc_id in enumerate(self.ids) if doc_id not in remove]
+        self.matrix = np.ascontiguousarray(self.matrix[keep])
+        self.ids = [self.ids[i] for i in keep]
+        self.documents = [self.documents[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+
+    def get_hashes(self) -> dict:
+        return {doc_id: meta.get("content_hash") for doc_id, meta in zip(self.ids, self.metadatas)}
+
+    def _hit(self, pos: int, score=None) -> dict:
+        hit = {"id": self.ids[pos], "text": self.documents[pos], "metadata": self.metadatas[pos]}
+        if score is not None:
+            hit["score"] = score
+        return hit
+
+    def get(self, ids):
+        return [self._hit(self._positions[doc_id]) for doc_id in ids if doc_id in self._positions]
+
+    def export(self):
+        matrix = self.matrix if self.matrix is not None else np.zeros((0, 0), dtype=np.float32)
+        return list(self.ids), matrix, list(self.documents), list(self.metadatas)
+
+    def query(self, embedding, top_k: int):
+        n = len(self.ids)
+        if n == 0 or top_k <= 0:
+            return []
+        query = self._normalize(embedding)
+        scores = self.matrix @ query
+        k = min(top_k, n)
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top])]
+        return [self._hit(int(pos), float(scores[pos])) for pos in top]
+
+    def persist(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        matrix = self.matrix if self.matrix is not None else np.zeros((0, 0), dtype=np.float32)
+        # Write to temp files and rename so readers never see a partial index
+        with open(self.path + ".npy.tmp", "wb") as f:
+            np.save(f, matrix)
+        with open(self.path + ".json.tmp", "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "documents": self.documents, "metadatas": self.metadatas},
+                      f, ensure_ascii=False)
+        os.replace(self.path + ".npy.tmp", self.path + ".npy")
+        os.replace(self.path + ".json.tmp", self.path + ".json")
+
+
+BACKENDS = {
+    "chroma": ChromaBackend,
+    "numpy": NumpyBackend,
+}
+
 _model = None
-_collection = None
-_client = None
+_backend = None
+# Init-once guards: concurrent first callers wait for one load instead of loading twice
+_model_lock = threading.Lock()
+_backend_lock = threading.Lock()
+_index_version = 0  # Bumped whenever the index contents change
+
+def get_index_version() -> int:
+    """Current index version; caches keyed on search results must match it"""
+    return _index_version
+
+def _bump_index_version():
+    global _index_version
+    _index_version += 1
 
 def get_embedding_function():
     """Lazy load embedding model only when needed"""
     global _model
     
     if _model is None:
-        print("🔧 Loading lightweight embedding model...")
-        try:
-            from sentence_transformers import SentenceTransformer
-            # Use CPU and reduce threads to prevent crashes
-            _model = SentenceTransformer(MODEL_NAME, device='cpu')
-            # Reduce model memory footprint
-            _model.max_seq_length = 128  # Shorter context
-            print("✅ Model loaded successfully")
-        except Exception as e:
-            print(f"❌ Failed to load embedding model: {e}")
-            raise
+        with _model_lock:
+            if _model is None:
+                print(f"🔧 Loading lightweight embedding model ({EMBEDDING_BACKEND})...")
+                try:
+                    _model = load_embedding_model()
+                    print("✅ Model loaded successfully")
+                except Exception as e:
+                    print(f"❌ Failed to load embedding model: {e}")
+                    raise
     
     return _model
 
-def get_vector_components():
-    global _collection, _client
+def get_vector_backend() -> VectorBackend:
+    """Open the configured vector backend (VECTOR_BACKEND=chroma|numpy)"""
+    global _backend
 
-    if _collection is None:
-        print("🔧 Initializing lightweight ChromaDB...")
-        # Use PersistentClient for actual persistence
-        _client = chromadb.PersistentClient(
-            path=VECTOR_DIR,
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
-        _collection = _client.get_or_create_collection(
-            name=COLLECTION_NAME
-        )
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if VECTOR_BACKEND not in BACKENDS:
+                    raise ValueError(f"Unknown VECTOR_BACKEND '{VECTOR_BACKEND}' (expected one of {sorted(BACKENDS)})")
+                print(f"🔧 Initializing lightweight {VECTOR_BACKEND} vector index...")
+                stored = last_snapshot()
+                if VECTOR_BACKEND == "numpy" and stored is not None and stored.covers():
+                    _backend = NumpyBackend.from_snapshot(stored)
+                else:
+                    _backend = BACKENDS[VECTOR_BACKEND]()
+
+    return _backend
+
+def reload_vector_backend() -> VectorBackend:
+    """Reopen the index from disk after another process rebuilt it; drops cached results"""
+    global _backend
+
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = None
+    backend = get_vector_backend()
+    _bump_index_version()
+    return backend
+
+def _swap_vector_backend(backend):
+    """Make a synced copy the current backend (the old object stays valid for pinned readers)"""
+    global _backend
 
+    with _backend_lock:
+        _backend = backend
+
+def release_vector_backend():
+    """Close the index without reopening (before fork: each worker opens its own handles)"""
+    global _backend
+
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = None
+
+def get_vector_components():
+    backend = get_vector_backend()
     model = get_embedding_function()
-    return model, _collection
+    return model, backend
 
 
-def build_vector_store(events):
-    """Build vector store with memory optimization"""
-    model, collection = get_vector_components()
+def _content_hash(text: str, metadata: dict) -> str:
+    """Stable hash of everything stored for a document, including the model that embeds it"""
+    digest = hashlib.sha256(embedding_signature().encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    digest.update(json.dumps(metadata, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()[:32]
 
-    # Skip if already built
-    if collection.count() > 0:
-        print("✅ Vector store already built. Skipping rebuild.")
-        # Free model from memory after checking
-        gc.collect()
-        return
+
+def _scheme_document(scheme, idx):
+    """Searchable (id, text, metadata) for a scheme, or None if it is invalid"""
+    # Skip None/invalid schemes
+    if scheme is None or not isinstance(scheme, dict):
+        return None
+
+    # Skip schemes without required fields
+    if 'name' not in scheme:
+        print(f"⚠️ Skipping scheme with missing name: {scheme}")
+        return None
+
+    # Use scheme id or generate one
+    scheme_id = scheme.get('id', f"scheme_{idx}")
+
+    # Build comprehensive text representation
+    name = scheme.get('name', '')
+    category = scheme.get('category', '')
+    benefit = scheme.get('benefit', '')
+    eligibility = str(scheme.get('eligibility', {}))
+    roadmap = scheme.get('roadmap', [])
+
+    # Create searchable text
+    text = f"{name}. Category: {category}. Benefit: {benefit}. Eligibility: {eligibility}"
+    if roadmap:
+        text += f". Application has {len(roadmap)} steps."
+
+    metadata = {
+        "type": "scheme",
+        "scheme_id": scheme_id,
+        "scheme_name": name
+    }
+    metadata["content_hash"] = _content_hash(text, metadata)
+    return scheme_id, text, metadata
+
+
+@traced()
+def build_vector_store(events, reuse_only: bool = False):
+    """
+    Incrementally sync the vector store with `events`.
+    Only new or changed schemes (by content hash) are upserted, reusing
+    vectors from the data snapshot where the hash matches and embedding the
+    rest; schemes that disappeared are deleted. Changes go to a clone of the
+    backend that replaces it once persisted. Returns a summary of the changes.
+    With `reuse_only` nothing is embedded (the gunicorn master, before fork):
+    schemes without a stored vector are left out and counted as "pending".
+    """
+    backend = get_vector_backend()
 
     documents = []
     metadatas = []
@@ -83,84 +483,118 @@ def build_vector_store(events):
 
     # Scheme documents - keep text concise
     for idx, scheme in enumerate(events_to_process):
-        # Skip None/invalid schemes
-        if scheme is None or not isinstance(scheme, dict):
+        doc = _scheme_document(scheme, idx)
+        if doc is None:
             continue
-        
-        # Skip schemes without required fields
-        if 'name' not in scheme:
-            print(f"⚠️ Skipping scheme with missing name: {scheme}")
-            continue
-        
-        # Use scheme id or generate one
-        scheme_id = scheme.get('id', f"scheme_{idx}")
-            
-        # Build comprehensive text representation
-        name = scheme.get('name', '')
-        category = scheme.get('category', '')
-        benefit = scheme.get('benefit', '')
-        eligibility = str(scheme.get('eligibility', {}))
-        roadmap = scheme.get('roadmap', [])
-        
-        # Create searchable text
-        text = f"{name}. Category: {category}. Benefit: {benefit}. Eligibility: {eligibility}"
-        if roadmap:
-            text += f". Application has {len(roadmap)} steps."
-        
+        scheme_id, text, metadata = doc
         documents.append(text)
-        metadatas.append({
-            "type": "scheme",
-            "scheme_id": scheme_id,
-            "scheme_name": name
-        })
+        metadatas.append(metadata)
         ids.append(scheme_id)
 
     # No additional documents needed - schemes are self-contained
 
-    # Check if we have any documents to process
+    # Check if we have any documents to process (never wipe the index on an empty load)
     if not documents:
         print("⚠️ No valid documents found to add to vector store")
-        return
+        return {"added": 0, "updated": 0, "removed": 0, "unchanged": backend.count()}
 
-    # Process in small batches
-    batch_size = MAX_BATCH_SIZE
-    print(f"🔧 Encoding {len(documents)} documents (batches of {batch_size})...")
-    
-    for i in range(0, len(documents), batch_size):
-        batch_end = min(i + batch_size, len(documents))
-        batch_docs = documents[i:batch_end]
-        batch_meta = metadatas[i:batch_end]
-        batch_ids = ids[i:batch_end]
-        
-        # Encode with minimal memory footprint
-        try:
-            batch_embeddings = model.encode(
-                batch_docs, 
-                show_progress_bar=False,
-                batch_size=8,  # Very small batch
-                convert_to_numpy=True
-            ).tolist()
-            
-            collection.upsert(
-                documents=batch_docs,
-                embeddings=batch_embeddings,
-                metadatas=batch_meta,
-                ids=batch_ids
+    # Diff against stored hashes
+    with span("diff"):
+        existing = backend.get_hashes()
+        current_ids = set(ids)
+        changed = [i for i, doc_id in enumerate(ids) if existing.get(doc_id) != metadatas[i]["content_hash"]]
+        removed = [doc_id for doc_id in existing if doc_id not in current_ids]
+    summary = {
+        "added": sum(1 for i in changed if ids[i] not in existing),
+        "updated": sum(1 for i in changed if ids[i] in existing),
+        "removed": len(removed),
+        "unchanged": len(ids) - len(changed),
+    }
+
+    if not changed and not removed:
+        print(f"✅ Vector store up to date ({len(ids)} documents). Skipping rebuild.")
+        return summary
+
+    # Requests pinned to the current snapshot keep reading the old copy
+    backend = backend.clone()
+
+    if removed:
+        with span("delete"):
+            backend.delete(removed)
+        print(f"🗑️ Removed {len(removed)} stale documents")
+
+    # Content hashes include the embedding model, so a stored vector for the same hash is exact
+    stored = last_snapshot()
+    stored_vectors = stored.vectors_by_hash() if stored is not None and changed else {}
+    reuse = [i for i in changed if metadatas[i]["content_hash"] in stored_vectors]
+    if reuse:
+        with span("upsert"):
+            backend.upsert(
+                ids=[ids[i] for i in reuse],
+                embeddings=[stored_vectors[metadatas[i]["content_hash"]] for i in reuse],
+                documents=[documents[i] for i in reuse],
+                metadatas=[metadatas[i] for i in reuse]
             )
-            
-            # Clear memory after each batch
-            del batch_embeddings
-            gc.collect()
-            
-            print(f"  ✓ Batch {i//batch_size + 1}/{(len(documents)-1)//batch_size + 1}")
-        except Exception as e:
-            print(f"❌ Error processing batch {i//batch_size + 1}: {e}")
-            continue
+        print(f"♻️ Reused {len(reuse)} embeddings from the data snapshot")
+        changed = [i for i in changed if metadatas[i]["content_hash"] not in stored_vectors]
 
-    print(f"✅ Lightweight vector store built with {len(documents)} documents.")
-    
-    # Gentle cleanup (don't force aggressive collection)
-    # gc.collect()
+    if changed and reuse_only:
+        summary["pending"] = len(changed)
+        print(f"⏭️ {len(changed)} documents need embedding; left for a worker")
+    elif changed:
+        model = get_embedding_function()
+        documents = [documents[i] for i in changed]
+        metadatas = [metadatas[i] for i in changed]
+        ids = [ids[i] for i in changed]
+
+        # Process in small batches
+        batch_size = MAX_BATCH_SIZE
+        print(f"🔧 Encoding {len(documents)} new/changed documents (batches of {batch_size})...")
+
+        for i in range(0, len(documents), batch_size):
+            batch_end = min(i + batch_size, len(documents))
+            batch_docs = documents[i:batch_end]
+            batch_meta = metadatas[i:batch_end]
+            batch_ids = ids[i:batch_end]
+
+            # Encode with minimal memory footprint
+            try:
+                with span("encode"):
+                    batch_embeddings = model.encode(
+                        batch_docs, 
+                        show_progress_bar=False,
+                        batch_size=8,  # Very small batch
+                        convert_to_numpy=True
+                    )
+
+                with span("upsert"):
+                    backend.upsert(
+                        ids=batch_ids,
+                        embeddings=batch_embeddings,
+                        documents=batch_docs,
+                        metadatas=batch_meta
+                    )
+
+                # Clear memory after each batch
+                del batch_embeddings
+                gc.collect()
+
+                print(f"  ✓ Batch {i//batch_size + 1}/{(len(documents)-1)//batch_size + 1}")
+            except Exception as e:
+                # Hashes of failed batches are not stored, so they are retried next time
+                print(f"❌ Error processing batch {i//batch_size + 1}: {e}")
+                continue
+
+    with span("persist"):
+        backend.persist()
+
+    _swap_vector_backend(backend)
+    # Invalidate anything cached against the previous index contents
+    _bump_index_version()
+
+    print(f"✅ Vector store synced: {summary['added']} added, {summary['updated']} updated, "
+          f"{summary['removed']} removed, {summary['unchanged']} unchanged")
+    return summary
 
 
 def cleanup_resources():
@@ -0,0 +1,33 @@
+# Multi-worker serving: gunicorn -c gunicorn.conf.py
+#
+# The master imports the app, loads schemes, syncs the index and loads the
+# model weights once (preload_app + when_ready), then forks. Workers share
+# those pages copy-on-write; the NumPy index is memory-mapped from disk.
+# /sync in any worker bumps vector_store_lite/generation and the others reload.
+
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+# .env first, so the defaults below never override explicit settings
+load_dotenv()
+
+bind = os.getenv("BIND", "0.0.0.0:4002")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 10
+
+# Split cores between workers instead of oversubscribing them (read before the app is imported)
+threads_per_worker = max(1, multiprocessing.cpu_count() // workers)
+os.environ.setdefault("EMBEDDING_THREADS", str(threads_per_worker))
+os.environ.setdefault("OMP_NUM_THREADS", str(threads_per_worker))
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported, before any worker is forked
+    from app.prefork import preload_for_workers
+    preload_for_workers()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Appwrite documents API, for testing (delta) sync.
+
+Serves one in-memory collection with the JSON queries the sync uses
+(limit, offset, cursorAfter, orderAsc, greaterThan(Equal) on $updatedAt,
+select) and caps `total` like Appwrite does. Documents can be changed and
+deleted through /stub/documents to exercise delta sync. Tests run it
+in-process with serve_in_thread() and inspect STATE (the query log, or
+`error_status` to fail every listing).
+
+Usage:
+    python scripts/appwrite_stub.py --port 9100 --documents 5000
+    # then in .env:
+    APPWRITE_ENDPOINT=http://127.0.0.1:9100/v1
+    APPWRITE_SYNC_INTERVAL=5
+
+    curl -X POST http://127.0.0.1:9100/stub/documents -H "Content-Type: application/json" \
+      -d '{"$id": "evt00042", "event_name": "Renamed event"}'
+    curl -X DELETE http://127.0.0.1:9100/stub/documents/evt00007
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi import FastAPI, HTTPException, Query, Request
+import uvicorn
+
+app = FastAPI(title="Appwrite stub")
+
+STATE = {
+    "documents": {},   # $id -> document
+    "total_cap": 5000,  # Appwrite stops counting here
+    "delay": 0.0,
+    "requests": 0,
+    "queries": [],        # decoded queries of each listing request, in order
+    "error_status": None,  # answer listings with this HTTP status (simulated outage)
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def seed(count: int):
+    base = datetime.now(timezone.utc) - timedelta(days=1)
+    for i in range(count):
+        stamp = (base + timedelta(seconds=i)).isoformat(timespec="milliseconds")
+        doc_id = f"evt{i:05d}"
+        STATE["documents"][doc_id] = {
+            "$id": doc_id,
+            "$createdAt": stamp,
+            "$updatedAt": stamp,
+            "event_name": f"Event {i}",
+            "venue": f"Hall {i % 7}",
+            "time": "10:00",
+            "date": "2026-06-02T00:00:00.000+00:00",
+            "details": f"Details for event {i}",
+            "coordinator": "Coordinator",
+            "fest": "Fest",
+            "slots": 50,
+            "poster": None,
+            "amount": 100,
+            "phone_number": "0000000000",
+            "category": "technical",
+        }
+
+
+@app.get("/v1/databases/{database_id}/collections/{collection_id}/documents")
+async def list_documents(database_id: str, collection_id: str, queries: List[str] = Query(default=[], alias="queries[]")):
+    """Apply the supported queries to the collection"""
+    STATE["requests"] += 1
+    STATE["queries"].append([json.loads(raw) for raw in queries])
+    if STATE["delay"]:
+        await asyncio.sleep(STATE["delay"])
+    if STATE["error_status"]:
+        raise HTTPException(status_code=STATE["error_status"], detail="Simulated outage")
+
+    docs = list(STATE["documents"].values())
+    limit, offset, cursor, select = 25, 0, None, None
+    order = "$id"
+    for query in STATE["queries"][-1]:
+        method, values = query["method"], query.get("values", [])
+        if method == "limit":
+            limit = values[0]
+        elif method == "offset":
+            offset = values[0]
+        elif method == "cursorAfter":
+            cursor = values[0]
+        elif method == "orderAsc":
+            order = query["attribute"]
+        elif method == "greaterThan":
+            docs = [d for d in docs if d.get(query["attribute"], "") > values[0]]
+        elif method == "greaterThanEqual":
+            docs = [d for d in docs if d.get(query["attribute"], "") >= values[0]]
+        elif method == "select":
+            select = values
+        else:
+            raise HTTPException(status_code=400, detail=f"Unsupported query method '{method}'")
+
+    docs.sort(key=lambda d: d.get(order, ""))
+    total = len(docs)
+    if cursor is not None:
+        ids = [d["$id"] for d in docs]
+        if cursor not in ids:
+            raise HTTPException(status_code=400, detail=f"Cursor document '{cursor}' not found")
+        docs = docs[ids.index(cursor) + 1:]
+    page = docs[offset:offset + limit]
+    if select is not None:
+        page = [{key: d.get(key) for key in select} for d in page]
+    return {"total": min(total, STATE["total_cap"]), "documents": page}
+
+
+@app.post("/stub/documents")
+async def upsert_document(request: Request):
+    """Create or update a document ($updatedAt is set to now)"""
+    body = await request.json()
+    doc_id = body.get("$id")
+    if not doc_id:
+        raise HTTPException(status_code=400, detail="$id is required")
+    now = _now()
+    doc = STATE["documents"].get(doc_id, {"$id": doc_id, "$createdAt": now})
+    doc.update(body)
+    doc["$updatedAt"] = now
+    STATE["documents"][doc_id] = doc
+    return doc
+
+
+@app.delete("/stub/documents/{doc_id}")
+def delete_document(doc_id: str):
+    if STATE["documents"].pop(doc_id, None) is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"deleted": doc_id}
+
+
+@app.get("/stub/stats")
+def stats():
+    return {"documents": len(STATE["documents"]), "requests": STATE["requests"]}
+
+
+def serve_in_thread(host: str = "127.0.0.1", port: int = 0):
+    """Start the stub on a background thread; returns (server, endpoint). Stop with server.should_exit = True"""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started:
+        if not thread.is_alive() or time.time() > deadline:
+            raise RuntimeError("Appwrite stub did not start")
+        time.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://{host}:{bound_port}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Appwrite documents API stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--documents", type=int, default=1000, help="Documents to seed")
+    parser.add_argument("--total-cap", type=int, default=5000, help="Largest `total` reported")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait per request")
+    args = parser.parse_args()
+
+    STATE["total_cap"] = args.total_cap
+    STATE["delay"] = args.delay
+    seed(args.documents)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark startup loading: pretty-printed JSON + NumPy index files vs the
+data snapshot (compact records + memory-mapped embeddings).
+
+Builds a synthetic scheme set (copies of data/kerala_schemes.json with new
+IDs) and random unit vectors in a temporary directory, so no embedding model
+is needed. Then checks that a fresh process answers a query naming a scheme
+ID from the snapshot without importing the model.
+
+Usage (from the bot/ directory):
+    python scripts/bench_data_snapshot.py
+    python scripts/bench_data_snapshot.py --schemes 5000 --rounds 20
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.json_store import load_events_from_json
+from app.snapshot_store import read_snapshot, write_snapshot
+from app.vector_store import NumpyBackend, _scheme_document
+
+BOOT_CHECK = """
+import sys
+from app.snapshot_store import load_events
+from app.cache import load_event_cache
+from app.rag_retriever import semantic_search
+events = load_events({source!r})
+load_event_cache(events)
+hits = semantic_search("Am I eligible for " + events[0]["id"] + "?", 2)
+print(hits[0]["id"] if hits else None, "sentence_transformers" in sys.modules)
+"""
+
+
+def synthetic_schemes(count: int):
+    base = [s for s in load_events_from_json() if isinstance(s, dict) and s.get("name")]
+    schemes = []
+    for i in range(count):
+        scheme = dict(base[i % len(base)])
+        scheme["id"] = f"SYN_{i:05d}"
+        scheme["name"] = f"{scheme['name']} {i}"
+        schemes.append(scheme)
+    return schemes
+
+
+def timed(fn, rounds):
+    times = []
+    for _ in range(rounds):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON vs data snapshot load time")
+    parser.add_argument("--schemes", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    schemes = synthetic_schemes(args.schemes)
+    documents = [doc for doc in (_scheme_document(s, i) for i, s in enumerate(schemes)) if doc]
+    vectors = np.random.default_rng(0).normal(size=(len(documents), args.dim)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "schemes.json")
+        with open(source, "w", encoding="utf-8") as f:
+            json.dump({"kerala_schemes": schemes}, f, indent=2, ensure_ascii=False)
+
+        index_path = os.path.join(tmp, "numpy_index")
+        snapshot_dir = os.path.join(tmp, "snapshot")
+        with contextlib.redirect_stdout(io.StringIO()):
+            backend = NumpyBackend(index_path, mmap=True)
+            backend.upsert([d[0] for d in documents], vectors, [d[1] for d in documents], [d[2] for d in documents])
+            backend.persist()
+            write_snapshot(schemes, backend, source, snapshot_dir)
+
+        json_ms = timed(lambda: (load_events_from_json(source), NumpyBackend(index_path, mmap=True)), args.rounds)
+        snapshot_ms = timed(lambda: NumpyBackend.from_snapshot(read_snapshot(snapshot_dir), index_path), args.rounds)
+        sizes = {
+            "json": os.path.getsize(source) + os.path.getsize(index_path + ".json"),
+            "snapshot": sum(os.path.getsize(os.path.join(snapshot_dir, n))
+                            for n in os.listdir(snapshot_dir) if n.startswith("records-")),
+        }
+
+        print(f"{len(schemes)} schemes, {len(documents)} vectors x {args.dim}, median of {args.rounds}")
+        print(f"{'load':<22} {'ms':>8} {'records MB':>11}")
+        print(f"{'JSON + NumPy index':<22} {json_ms:>8.1f} {sizes['json'] / 1e6:>11.2f}")
+        print(f"{'data snapshot':<22} {snapshot_ms:>8.1f} {sizes['snapshot'] / 1e6:>11.2f}")
+        print(f"speedup: {json_ms / snapshot_ms:.1f}x")
+
+        # Cold process: snapshot -> answer for a scheme ID, model never imported
+        env = dict(os.environ, DATA_SNAPSHOT_DIR=snapshot_dir, VECTOR_BACKEND="numpy")
+        t0 = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", BOOT_CHECK.format(source=source)],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=env, capture_output=True, text=True,
+        )
+        lines = result.stdout.strip().splitlines()
+        if result.returncode or not lines:
+            print(f"cold boot check failed:\n{result.stderr[-2000:]}")
+            return
+        hit, model_imported = lines[-1].split()
+        print(f"cold boot to first answer: {(time.perf_counter() - t0) * 1000:.0f}ms "
+              f"(hit {hit}, embedding model imported: {model_imported})")
+
+
+if __name__ == "__main__":
+    main()
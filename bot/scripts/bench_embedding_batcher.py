@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark query-embedding micro-batching under concurrent load.
+
+Simulates N concurrent users, each encoding a stream of queries, once with
+one model call per query and once through app.embedding_batcher.MicroBatcher.
+Reports queries/s, latency percentiles and the batch sizes actually formed.
+
+By default the model is synthetic (fixed cost per call + small cost per
+item, roughly MiniLM on 2 CPU threads); --real uses the configured encoder.
+
+Usage (from the bot/ directory):
+    python scripts/bench_embedding_batcher.py
+    python scripts/bench_embedding_batcher.py --users 1 10 50 100 --window-ms 3 --max-batch 32
+    python scripts/bench_embedding_batcher.py --real --users 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.embedding_batcher import MicroBatcher
+
+QUERIES = [
+    "sthree suraksha eligibility", "pension for senior citizens", "housing scheme for homeless",
+    "jobs for young graduates", "support for unwed mothers", "how to apply for pension",
+    "scholarship for girl students", "financial help for widows", "schemes for fishermen",
+    "medical treatment assistance for cancer patients",
+]
+
+
+class SyntheticEncoder:
+    """Per-call overhead dominates small batches, as with a real transformer on CPU"""
+
+    def __init__(self, call_ms: float, item_ms: float, dim: int = 384):
+        self.call_ms = call_ms
+        self.item_ms = item_ms
+        self.dim = dim
+
+    def encode(self, texts, **kwargs):
+        time.sleep((self.call_ms + self.item_ms * len(texts)) / 1000)
+        return np.zeros((len(texts), self.dim), dtype=np.float32)
+
+
+async def run(model, users: int, per_user: int, window_ms: float, max_batch: int):
+    # One model instance runs one call at a time (its intra-op threads are already busy)
+    model_lock = threading.Lock()
+
+    def encode_locked(texts):
+        with model_lock:
+            return model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
+
+    async def encode(texts):
+        return await asyncio.to_thread(encode_locked, texts)
+
+    batcher = MicroBatcher(encode, window_ms=window_ms, max_batch=max_batch) if window_ms > 0 else None
+    latencies = []
+
+    async def user(u):
+        for i in range(per_user):
+            # Distinct texts so in-batch deduplication does not flatter the result
+            text = f"{QUERIES[(u + i) % len(QUERIES)]} {u}-{i}"
+            t0 = time.perf_counter()
+            if batcher is not None:
+                await batcher.embed(text)
+            else:
+                (await encode([text]))[0]
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(u) for u in range(users)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    stats = batcher.stats() if batcher else {"mean_batch_size": 1.0}
+    return {
+        "qps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "mean_batch": stats["mean_batch_size"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching throughput for query embeddings")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--per-user", type=int, default=20)
+    parser.add_argument("--window-ms", type=float, default=3.0)
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--call-ms", type=float, default=8.0, help="Synthetic cost per model call")
+    parser.add_argument("--item-ms", type=float, default=0.6, help="Synthetic cost per query in a call")
+    parser.add_argument("--real", action="store_true", help="Use the configured embedding model")
+    args = parser.parse_args()
+
+    if args.real:
+        from app.vector_store import get_embedding_function
+        model = get_embedding_function()
+        model.encode(QUERIES, show_progress_bar=False, convert_to_numpy=True)  # warm up
+    else:
+        model = SyntheticEncoder(args.call_ms, args.item_ms)
+
+    print(f"Window {args.window_ms}ms, max batch {args.max_batch}, {args.per_user} queries per user"
+          f"{'' if args.real else f' (synthetic: {args.call_ms}ms/call + {args.item_ms}ms/query)'}")
+    print(f"{'users':>5} {'mode':<9} {'q/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'batch':>6}")
+    for users in args.users:
+        baseline = None
+        for mode, window in (("single", 0), ("batched", args.window_ms)):
+            result = asyncio.run(run(model, users, args.per_user, window, args.max_batch))
+            speedup = "" if baseline is None else f"  {result['qps'] / baseline:.1f}x"
+            baseline = baseline or result["qps"]
+            print(f"{users:>5} {mode:<9} {result['qps']:>8.1f} {result['p50_ms']:>8.2f} "
+                  f"{result['p95_ms']:>8.2f} {result['mean_batch']:>6.1f}{speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Parity and throughput check for embedding backends against fp32 torch.
+
+For each candidate backend (torch-int8, onnx) it reports:
+  - cosine drift: cosine similarity between candidate and fp32 embeddings
+    of the same text (1.0 = identical), mean and worst case
+  - recall@k: overlap of the candidate's top-k schemes with fp32's top-k
+  - query throughput: single-query encode latency (what /chat pays) and
+    batch throughput (what build_vector_store pays), with speedup vs fp32
+
+Usage (from the bot/ directory):
+    python scripts/bench_embeddings.py
+    python scripts/bench_embeddings.py --backends torch-int8 onnx --onnx-path models/minilm-onnx
+    python scripts/bench_embeddings.py --threads 2 --repeat 5 --top-k 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.embeddings import EMBEDDING_THREADS, load_embedding_model
+
+LABELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_labels.json")
+
+EXTRA_QUERIES = [
+    "sthree suraksha eligibility", "pension for senior citizens", "housing scheme for homeless",
+    "jobs for young graduates", "support for unwed mothers", "how to apply for pension",
+    "scholarship for girl students", "financial help for widows", "schemes for fishermen",
+    "medical treatment assistance for cancer patients",
+]
+
+
+def load_corpus():
+    """Scheme documents as indexed by build_vector_store, plus scheme-style questions"""
+    from app.json_store import load_events_from_json
+    from app.vector_store import _scheme_document
+
+    documents = []
+    for idx, scheme in enumerate(load_events_from_json()):
+        doc = _scheme_document(scheme, idx)
+        if doc is not None:
+            documents.append(doc[1])
+
+    with open(LABELS_PATH, "r", encoding="utf-8") as f:
+        labelled = [item["text"] for item in json.load(f) if item["intent"] == "scheme"]
+    return documents, labelled + EXTRA_QUERIES
+
+
+def top_k(doc_embeddings, query_embeddings, k):
+    scores = query_embeddings @ doc_embeddings.T
+    return [set(np.argsort(-row)[:k].tolist()) for row in scores]
+
+
+def row_cosine(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def measure(model, documents, queries, repeat):
+    # Warm up (first calls allocate buffers / JIT kernels)
+    model.encode(queries[:4], show_progress_bar=False, convert_to_numpy=True)
+
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            t0 = time.perf_counter()
+            model.encode([query], show_progress_bar=False, convert_to_numpy=True)
+            latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+
+    t0 = time.perf_counter()
+    doc_embeddings = model.encode(documents, show_progress_bar=False, batch_size=8, convert_to_numpy=True)
+    batch_s = time.perf_counter() - t0
+    query_embeddings = model.encode(queries, show_progress_bar=False, convert_to_numpy=True)
+
+    return {
+        "docs": np.asarray(doc_embeddings, dtype=np.float32),
+        "queries": np.asarray(query_embeddings, dtype=np.float32),
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "docs_per_s": len(documents) / batch_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding backends against fp32 torch")
+    parser.add_argument("--backends", nargs="+", default=["torch-int8", "onnx"])
+    parser.add_argument("--onnx-path", default=None, help="Directory with model.onnx + tokenizer.json")
+    parser.add_argument("--threads", type=int, default=EMBEDDING_THREADS)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the queries for latency")
+    args = parser.parse_args()
+
+    documents, queries = load_corpus()
+    k = min(args.top_k, len(documents))
+    print(f"Corpus: {len(documents)} scheme documents, {len(queries)} queries, top-{k}, {args.threads} threads")
+
+    t0 = time.perf_counter()
+    reference = measure(load_embedding_model("torch", threads=args.threads), documents, queries, args.repeat)
+    reference["load_s"] = time.perf_counter() - t0
+    truth = top_k(reference["docs"], reference["queries"], k)
+
+    header = (f"{'backend':<11} {'cos mean':>9} {'cos min':>8} {'recall@k':>9} "
+              f"{'p50 ms':>7} {'p95 ms':>7} {'docs/s':>8} {'speedup':>8}")
+    print(header)
+    print(f"{'torch':<11} {1.0:>9.4f} {1.0:>8.4f} {1.0:>9.3f} {reference['p50_ms']:>7.2f} "
+          f"{reference['p95_ms']:>7.2f} {reference['docs_per_s']:>8.1f} {1.0:>7.2f}x")
+
+    for backend in args.backends:
+        try:
+            model = load_embedding_model(backend, onnx_path=args.onnx_path, threads=args.threads)
+        except (ImportError, FileNotFoundError, ValueError) as e:
+            print(f"{backend:<11} skipped ({e})")
+            continue
+
+        result = measure(model, documents, queries, args.repeat)
+        cosines = np.concatenate([
+            row_cosine(result["docs"], reference["docs"]),
+            row_cosine(result["queries"], reference["queries"]),
+        ])
+        found = top_k(result["docs"], result["queries"], k)
+        recall = statistics.fmean(len(f & t) / len(t) for f, t in zip(found, truth))
+        speedup = reference["p50_ms"] / result["p50_ms"]
+        print(f"{backend:<11} {cosines.mean():>9.4f} {cosines.min():>8.4f} {recall:>9.3f} "
+              f"{result['p50_ms']:>7.2f} {result['p95_ms']:>7.2f} {result['docs_per_s']:>8.1f} {speedup:>7.2f}x")
+        del model
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Compare vector-only retrieval with hybrid (BM25 + vector, RRF) retrieval.
+
+Indexes data/kerala_schemes.json with the configured embedding model in a
+temporary NumPy index, then answers the labelled queries in
+scripts/retrieval_labels.json both ways. Reports recall@1, recall@k, MRR,
+latency percentiles and how many queries skipped embedding (exact name / ID).
+
+Usage (from the bot/ directory):
+    python scripts/bench_hybrid_retrieval.py
+    python scripts/bench_hybrid_retrieval.py --top-k 3 --rounds 20 --show-misses
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.json_store import load_events_from_json
+from app.cache import build_snapshot
+from app.rag_retriever import HYBRID_CANDIDATES, _exact_hits, _fuse
+from app.vector_store import NumpyBackend, _scheme_document, get_embedding_function
+
+LABELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "retrieval_labels.json")
+
+
+def encode(model, text):
+    return model.encode([text], show_progress_bar=False, convert_to_numpy=True)[0]
+
+
+def vector_only(model, backend, lexical, query, top_k):
+    return backend.query(encode(model, query), top_k), False
+
+
+def hybrid(model, backend, lexical, query, top_k):
+    hits = _exact_hits(backend, lexical, query, top_k)
+    if hits is not None:
+        return hits, True
+    candidates = backend.query(encode(model, query), max(top_k, HYBRID_CANDIDATES))
+    return _fuse(backend, lexical, query, candidates, top_k), False
+
+
+def run(search, model, backend, lexical, labels, top_k, rounds):
+    latencies = []
+    first, in_top_k, reciprocal, skipped = 0, 0, 0.0, 0
+    misses = []
+    # Retrieval logs every query; keep them out of the timings and the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for round_no in range(rounds):
+            for label in labels:
+                t0 = time.perf_counter()
+                hits, exact = search(model, backend, lexical, label["text"], top_k)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                if round_no:
+                    continue
+                ids = [h["id"] for h in hits]
+                expected = label["scheme_id"]
+                skipped += exact
+                if ids[:1] == [expected]:
+                    first += 1
+                if expected in ids:
+                    in_top_k += 1
+                    reciprocal += 1 / (ids.index(expected) + 1)
+                else:
+                    misses.append((label["text"], expected, ids))
+
+    latencies.sort()
+    n = len(labels)
+    return {
+        "recall@1": first / n,
+        "recall@k": in_top_k / n,
+        "mrr": reciprocal / n,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "skipped": skipped,
+        "misses": misses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector-only vs hybrid retrieval on labelled queries")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=10, help="Timing repetitions over the query set")
+    parser.add_argument("--show-misses", action="store_true")
+    args = parser.parse_args()
+
+    with open(LABELS_PATH, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+
+    schemes = load_events_from_json()
+    documents = [doc for doc in (_scheme_document(s, i) for i, s in enumerate(schemes)) if doc]
+    model = get_embedding_function()
+    embeddings = model.encode([text for _, text, _ in documents], show_progress_bar=False, convert_to_numpy=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = NumpyBackend(os.path.join(tmp, "index"), mmap=False)
+        backend.upsert([d[0] for d in documents], embeddings, [d[1] for d in documents], [d[2] for d in documents])
+        lexical = build_snapshot(schemes).lexical
+        encode(model, "warm up")
+
+        print(f"{len(labels)} labelled queries, {len(documents)} schemes, top-k {args.top_k}, {args.rounds} rounds")
+        print(f"{'mode':<8} {'R@1':>6} {'R@k':>6} {'MRR':>6} {'p50 ms':>8} {'p95 ms':>8} {'no-embed':>9}")
+        for name, search in (("vector", vector_only), ("hybrid", hybrid)):
+            result = run(search, model, backend, lexical, labels, args.top_k, args.rounds)
+            print(f"{name:<8} {result['recall@1']:>6.2f} {result['recall@k']:>6.2f} {result['mrr']:>6.2f} "
+                  f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['skipped']:>4}/{len(labels)}")
+            if args.show_misses:
+                for text, expected, ids in result["misses"]:
+                    print(f"    miss: {text!r} expected {expected}, got {ids}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark and accuracy check for the chat intent router.
+
+Compares app.intent_router.route_intent against the previous sequence of
+is_greeting / is_thankyou / is_bye / is_relevant_query checks on the
+labelled set in scripts/intent_labels.json.
+
+Usage (from the bot/ directory):
+    python scripts/bench_intent_router.py
+    python scripts/bench_intent_router.py --rounds 20000 --show-errors
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.cache import build_snapshot
+from app.intent_router import route_intent
+from app.json_store import load_events_from_json
+
+LABELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_labels.json")
+
+
+# ---- Previous implementation (chat_engine before the router) ---- #
+
+def legacy_is_greeting(query: str) -> bool:
+    q_lower = query.lower().strip()
+    q_norm = re.sub(r"(.)\1{2,}", r"\1\1", q_lower)
+    greeting_words = {"hi", "hello", "hey", "hai", "hii", "heyy", "hola", "greetings", "yo"}
+    words = re.findall(r"\b[a-zA-Z]+\b", q_norm)
+    return any(w in greeting_words for w in words)
+
+def legacy_is_thankyou(query: str) -> bool:
+    q_lower = query.lower().strip()
+    thanks_phrases = ["thanks", "thank you", "thankyou", "appreciate", "ty", "thx"]
+    return any(phrase in q_lower for phrase in thanks_phrases)
+
+def legacy_is_bye(query: str) -> bool:
+    q_lower = query.lower().strip()
+    bye_phrases = ["bye", "goodbye", "good bye", "see you", "see ya", "later", "cya"]
+    return any(phrase in q_lower for phrase in bye_phrases)
+
+def legacy_is_relevant_query(query: str) -> bool:
+    keywords = ["scheme", "pension", "welfare", "benefit", "eligibility", "apply",
+                "application", "kerala", "sthree", "housing", "employment", "social security",
+                "how to", "what is", "tell me", "register", "enroll"]
+    q_lower = query.lower()
+    return any(kw in q_lower for kw in keywords)
+
+def legacy_route(query: str) -> str:
+    if legacy_is_greeting(query):
+        return "greeting"
+    if legacy_is_thankyou(query):
+        return "thankyou"
+    if legacy_is_bye(query):
+        return "bye"
+    if not legacy_is_relevant_query(query):
+        return "out_of_context"
+    return "scheme"
+
+
+# Scheme names and IDs from the dataset, as /chat passes them
+VOCABULARY = build_snapshot(load_events_from_json()).lexical.vocabulary
+
+
+def router_route(query: str) -> str:
+    return route_intent(query, VOCABULARY).name
+
+
+def evaluate(name, classify, labels, rounds, show_errors):
+    errors = [(item["text"], item["intent"], classify(item["text"]))
+              for item in labels if classify(item["text"]) != item["intent"]]
+    accuracy = 1 - len(errors) / len(labels)
+
+    texts = [item["text"] for item in labels]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            classify(text)
+    per_query_us = (time.perf_counter() - start) / (rounds * len(texts)) * 1e6
+
+    print(f"{name:<8} accuracy {accuracy:6.1%}  ({len(errors)} wrong / {len(labels)})  {per_query_us:6.2f} µs/query")
+    if show_errors:
+        for text, expected, got in errors:
+            print(f"    {text!r}: expected {expected}, got {got}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chat intent router")
+    parser.add_argument("--rounds", type=int, default=5000)
+    parser.add_argument("--show-errors", action="store_true")
+    args = parser.parse_args()
+
+    with open(LABELS_PATH, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+
+    print(f"Labelled queries: {len(labels)}, rounds: {args.rounds}")
+    evaluate("legacy", legacy_route, labels, args.rounds, args.show_errors)
+    evaluate("router", router_route, labels, args.rounds, args.show_errors)
+
+
+if __name__ == "__main__":
+    main()
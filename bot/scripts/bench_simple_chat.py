@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compare the lightweight keyword engine (app.simple_chat) with the previous
+implementation: a JSON parse plus a substring scan over every scheme on
+every request.
+
+Reports requests per second and per-request latency for both, accuracy on
+the labelled queries in scripts/retrieval_labels.json (reply names the
+expected scheme), and how many non-greetings each mistakes for a greeting
+("hi" inside "Kochi"). --schemes scales the corpus with renamed copies.
+
+Usage (from the bot/ directory):
+    python scripts/bench_simple_chat.py
+    python scripts/bench_simple_chat.py --schemes 2000 --seconds 3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.simple_chat import GREETING_REPLY, SchemeIndex, load_schemes, search_schemes
+
+LABELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "retrieval_labels.json")
+
+# Not greetings, but contain "hi"/"hey" as substrings
+GREETING_TRAPS = [
+    "schemes in Kochi",
+    "which scheme is for children",
+    "housing help for my thiruvananthapuram family",
+    "they need a pension",
+]
+
+
+def legacy_chat(message: str, path: str) -> str:
+    """The previous simple_chat: reload the JSON and scan every scheme per request"""
+    schemes = load_schemes(path)
+    query_lower = message.lower()
+    if any(word in query_lower for word in ["hi", "hello", "hey"]):
+        return GREETING_REPLY
+    if any(word in query_lower for word in ["thank", "thanks"]):
+        return "You're welcome!"
+    results = []
+    for scheme in schemes:
+        searchable_text = f"{scheme.get('name', '')} {scheme.get('category', '')} {scheme.get('benefit', '')}".lower()
+        matches = sum(1 for word in query_lower.split() if len(word) > 2 and word in searchable_text)
+        if matches > 0:
+            results.append((matches, scheme))
+    results.sort(reverse=True, key=lambda x: x[0])
+    if not results:
+        return "No match"
+    return f"**{results[0][1]['name']}**\n\n"
+
+
+def throughput(fn, queries, seconds):
+    """Requests per second and per-request latency percentiles (µs) over the query mix"""
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for query in queries:
+            t0 = time.perf_counter()
+            fn(query)
+            latencies.append((time.perf_counter() - t0) * 1e6)
+    latencies.sort()
+    return {
+        "rps": len(latencies) / (sum(latencies) / 1e6),
+        "p50_us": statistics.median(latencies),
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+def accuracy(fn, labels, names):
+    correct = sum(1 for label in labels if fn(label["text"]).startswith(f"**{names[label['scheme_id']]}**"))
+    return correct / len(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword engine vs the previous simple_chat")
+    parser.add_argument("--schemes", type=int, default=0, help="Scale the corpus to this many schemes")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Timing duration per engine")
+    args = parser.parse_args()
+
+    with open(LABELS_PATH, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+
+    schemes = load_schemes()
+    names = {s["id"]: s["name"] for s in schemes}
+    if args.schemes > len(schemes):
+        base = list(schemes)
+        for i in range(len(base), args.schemes):
+            copy = dict(base[i % len(base)])
+            copy["id"] = f"SYN_{i:05d}"
+            copy["name"] = f"Synthetic {i} {copy['name']}"
+            schemes.append(copy)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "kerala_schemes.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"kerala_schemes": schemes}, f, indent=2, ensure_ascii=False)
+
+        index = SchemeIndex(path)
+        engines = (
+            ("previous", lambda q: legacy_chat(q, path)),
+            ("indexed", lambda q: search_schemes(q, index)),
+        )
+        queries = [label["text"] for label in labels] + GREETING_TRAPS
+
+        print(f"{len(schemes)} schemes, {len(queries)} queries, {args.seconds:.0f}s per engine")
+        print(f"{'engine':<10} {'req/s':>10} {'p50 µs':>9} {'p99 µs':>9} {'accuracy':>9} {'false hi':>9}")
+        results = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, fn in engines:
+                fn("warm up")
+                results[name] = throughput(fn, queries, args.seconds)
+                results[name]["accuracy"] = accuracy(fn, labels, names)
+                results[name]["false_greetings"] = sum(1 for q in GREETING_TRAPS if fn(q) == GREETING_REPLY)
+        for name, r in results.items():
+            print(f"{name:<10} {r['rps']:>10.0f} {r['p50_us']:>9.1f} {r['p99_us']:>9.1f} "
+                  f"{r['accuracy']:>9.2f} {r['false_greetings']:>4}/{len(GREETING_TRAPS)}")
+        print(f"speedup: {results['indexed']['rps'] / results['previous']['rps']:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark vector index backends: query latency and recall@k.
+
+Recall is measured against exact cosine search (brute force), so it shows
+how much the Chroma HNSW index loses, and confirms the NumPy backend is exact.
+
+Usage (from the bot/ directory):
+    python scripts/bench_vector_backends.py                 # synthetic vectors
+    python scripts/bench_vector_backends.py --docs 2000 --queries 500 --top-k 3
+    python scripts/bench_vector_backends.py --real          # embed data/kerala_schemes.json
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.vector_store import ChromaBackend, NumpyBackend
+
+
+def synthetic_corpus(n_docs: int, n_queries: int, dim: int, seed: int = 0):
+    """Clustered random vectors (closer to real embeddings than uniform noise)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(n_docs // 20, 1), dim))
+    docs = centers[rng.integers(0, len(centers), n_docs)] + 0.3 * rng.normal(size=(n_docs, dim))
+    queries = docs[rng.integers(0, n_docs, n_queries)] + 0.2 * rng.normal(size=(n_queries, dim))
+    texts = [f"doc {i}" for i in range(n_docs)]
+    return docs.astype(np.float32), queries.astype(np.float32), texts
+
+
+def real_corpus(n_queries: int):
+    """Embed the scheme documents and a few hand-written questions"""
+    from app.json_store import load_events_from_json
+    from app.vector_store import get_embedding_function
+
+    schemes = load_events_from_json()
+    texts = [f"{s.get('name', '')}. Category: {s.get('category', '')}. Benefit: {s.get('benefit', '')}"
+             for s in schemes]
+    questions = [
+        "sthree suraksha eligibility", "pension for senior citizens", "housing scheme for homeless",
+        "jobs for young graduates", "support for unwed mothers", "how to apply for pension",
+    ]
+    questions = (questions * (n_queries // len(questions) + 1))[:n_queries]
+    model = get_embedding_function()
+    docs = model.encode(texts, convert_to_numpy=True)
+    queries = model.encode(questions, convert_to_numpy=True)
+    return docs.astype(np.float32), queries.astype(np.float32), texts
+
+
+def exact_top_k(docs, queries, k):
+    docs_n = docs / np.linalg.norm(docs, axis=1, keepdims=True)
+    queries_n = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries_n @ docs_n.T
+    return [set(np.argsort(-row)[:k].tolist()) for row in scores]
+
+
+def run_backend(backend, docs, queries, texts, k, truth):
+    ids = [str(i) for i in range(len(docs))]
+    start = time.perf_counter()
+    for i in range(0, len(ids), 500):
+        backend.upsert(ids[i:i + 500], docs[i:i + 500], texts[i:i + 500], [{"i": j} for j in range(i, min(i + 500, len(ids)))])
+    backend.persist()
+    build_s = time.perf_counter() - start
+
+    # Warm up
+    for q in queries[:5]:
+        backend.query(q, k)
+
+    latencies = []
+    recalls = []
+    for q, expected in zip(queries, truth):
+        t0 = time.perf_counter()
+        hits = backend.query(q, k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        found = {int(h["id"]) for h in hits}
+        recalls.append(len(found & expected) / len(expected))
+
+    latencies.sort()
+    return {
+        "build_s": build_s,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "mean_ms": statistics.fmean(latencies),
+        "recall": statistics.fmean(recalls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Chroma and NumPy vector backends")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--real", action="store_true", help="Use real scheme embeddings (loads the model)")
+    parser.add_argument("--skip-chroma", action="store_true")
+    args = parser.parse_args()
+
+    if args.real:
+        docs, queries, texts = real_corpus(args.queries)
+    else:
+        docs, queries, texts = synthetic_corpus(args.docs, args.queries, args.dim)
+    k = min(args.top_k, len(docs))
+    truth = exact_top_k(docs, queries, k)
+
+    workdir = tempfile.mkdtemp(prefix="bench_vectors_")
+    try:
+        backends = [("numpy", lambda: NumpyBackend(os.path.join(workdir, "numpy_index")))]
+        if not args.skip_chroma:
+            backends.append(("chroma", lambda: ChromaBackend(os.path.join(workdir, "chroma"), "bench")))
+
+        print(f"Corpus: {len(docs)} docs x {docs.shape[1]} dims, {len(queries)} queries, top-{k}")
+        print(f"{'backend':<8} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'recall@k':>9}")
+        for name, factory in backends:
+            try:
+                result = run_backend(factory(), docs, queries, texts, k, truth)
+            except ImportError as e:
+                print(f"{name:<8} skipped ({e})")
+                continue
+            print(f"{name:<8} {result['build_s']:>8.2f} {result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f} "
+                  f"{result['mean_ms']:>8.3f} {result['recall']:>9.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Export all-MiniLM-L6-v2 to ONNX for EMBEDDING_BACKEND=onnx.
+
+Writes `model.onnx` (token embeddings; pooling happens in app/embeddings.py)
+and `tokenizer.json` to the output directory. With --int8 the graph is also
+dynamically quantized with ONNX Runtime (fp32 copy kept as model_fp32.onnx).
+
+Needs torch + transformers at export time only; serving needs onnxruntime + tokenizers.
+
+Usage (from the bot/ directory):
+    python scripts/export_onnx_model.py --output models/minilm-onnx
+    python scripts/export_onnx_model.py --output models/minilm-onnx-int8 --int8
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.embeddings import MODEL_NAME
+
+
+def export(output_dir: str, opset: int):
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModel.from_pretrained(MODEL_NAME).eval()
+
+    sample = tokenizer(["export sample sentence"], return_tensors="pt")
+    model_file = os.path.join(output_dir, "model.onnx")
+    dynamic = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+            model_file,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": dynamic,
+                "attention_mask": dynamic,
+                "token_type_ids": dynamic,
+                "last_hidden_state": dynamic,
+            },
+            opset_version=opset,
+        )
+
+    # tokenizer.json is what app/embeddings.py loads (fast tokenizer, no transformers needed)
+    tokenizer.save_pretrained(output_dir)
+    print(f"✅ Exported {MODEL_NAME} to {model_file}")
+    return model_file
+
+
+def quantize(model_file: str):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    fp32_file = model_file.replace(".onnx", "_fp32.onnx")
+    os.replace(model_file, fp32_file)
+    quantize_dynamic(fp32_file, model_file, weight_type=QuantType.QInt8)
+    size_fp32 = os.path.getsize(fp32_file) / 1024 / 1024
+    size_int8 = os.path.getsize(model_file) / 1024 / 1024
+    print(f"✅ Quantized to int8: {size_fp32:.1f}MB -> {size_int8:.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument("--output", default="models/minilm-onnx")
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument("--int8", action="store_true", help="Also apply dynamic int8 quantization")
+    args = parser.parse_args()
+
+    model_file = export(args.output, args.opset)
+    if args.int8:
+        quantize(model_file)
+
+    print(f"Set EMBEDDING_BACKEND=onnx EMBEDDING_ONNX_PATH={args.output}, then check parity with:")
+    print(f"  python scripts/bench_embeddings.py --backends torch-int8 onnx --onnx-path {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,195 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+#!/usr/bin/env python3
+"""
+Firestore fallback for event sync (used when Appwrite is down).
+
+Pages through the collection in document-ID order, FIRESTORE_PAGE_SIZE
+documents at a time, reading only the event fields. Records are spooled to
+disk page by page with a cursor, so memory stays flat and an interrupted
+sync resumes after the last page it finished.
+
+Runs against the Firestore emulator when FIRESTORE_EMULATOR_HOST is set
+(no service account needed):
+    gcloud emulators firestore start --host-port=localhost:8080
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python scripts/firestore_fallback.py --seed 5000
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python scripts/firestore_fallback.py --page-size 500
+"""
+
+import json
+import os
+from datetime import datetime
+
+FIRESTORE_COLLECTION = os.getenv("FIRESTORE_COLLECTION", "events")
+FIRESTORE_PAGE_SIZE = int(os.getenv("FIRESTORE_PAGE_SIZE", "500"))
+FIRESTORE_CREDENTIALS = os.getenv("FIRESTORE_CREDENTIALS", "firebase_service_account.json")
+FIRESTORE_PROJECT_ID = os.getenv("FIRESTORE_PROJECT_ID", "demo-nexagov")  # emulator only
+
+# Projection: the only fields read from each document
+EVENT_FIELDS = (
+    "event_name", "venue", "time", "date", "details", "coordinator",
+    "fest", "slots", "poster", "amount", "phone_number", "category",
+)
+
 
 def init_firestore():
+    if os.getenv("FIRESTORE_EMULATOR_HOST"):
+        # The emulator accepts anonymous clients; no service account involved
+        from google.cloud import firestore as gcloud_firestore
+        return gcloud_firestore.Client(project=FIRESTORE_PROJECT_ID)
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
     if not firebase_admin._apps:
-        cred = credentials.Certificate("firebase_service_account.json")
+        cred = credentials.Certificate(FIRESTORE_CREDENTIALS)
         firebase_admin.initialize_app(cred)
     return firestore.client()
 
 
-def fetch_events_from_firestore():
+def _to_event(doc_id: str, data: dict) -> dict:
+    """Firestore document -> event record, same shape as the Appwrite sync"""
+    event = {"$id": doc_id, "$updatedAt": None}
+    for field in EVENT_FIELDS:
+        value = data.get(field)
+        if isinstance(value, datetime):
+            # Firestore timestamps are not JSON-serializable; match Appwrite's DD/MM/YYYY
+            value = value.strftime("%d/%m/%Y") if field == "date" else value.isoformat()
+        event[field] = value
+    return event
+
+
+def iter_event_pages(page_size: int = FIRESTORE_PAGE_SIZE, start_after: str = None, db=None):
+    """
+    Yield (records, last document ID) one page at a time, in document-ID
+    order, starting after `start_after` if given.
+    """
+    db = db or init_firestore()
+    collection = db.collection(FIRESTORE_COLLECTION)
+    base = collection.select(list(EVENT_FIELDS)).order_by("__name__").limit(page_size)
+    last_id = start_after
+
+    while True:
+        query = base
+        if last_id is not None:
+            query = query.start_after({"__name__": collection.document(last_id)})
+        docs = query.get()
+        if not docs:
+            return
+        records = [_to_event(doc.id, doc.to_dict() or {}) for doc in docs]
+        last_id = docs[-1].id
+        yield records, last_id
+        if len(docs) < page_size:
+            return
+
+
+def _read_cursor(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def sync_from_firestore(output_path: str, page_size: int = FIRESTORE_PAGE_SIZE, progress=None, db=None) -> int:
+    """
+    Write every event to `output_path` (compact JSON array) and return the count.
+    Pages are appended to `<output>.firestore.jsonl` and the last ID to
+    `<output>.firestore.cursor`; a rerun after an interruption continues from
+    there. `progress(pages, records)` is called after each page.
+    """
+    spool_path = output_path + ".firestore.jsonl"
+    cursor_path = output_path + ".firestore.cursor"
+
+    cursor = _read_cursor(cursor_path) if os.path.exists(spool_path) else None
+    if cursor:
+        print(f"⚠️ Resuming Firestore sync after {cursor['last_id']} ({cursor['records']} records spooled)")
+        # Drop anything written after the last completed page
+        with open(spool_path, "r+", encoding="utf-8") as f:
+            f.truncate(cursor["offset"])
+    else:
+        cursor = {"last_id": None, "records": 0, "pages": 0, "offset": 0}
+        open(spool_path, "w").close()
+
     print("⚠️ Falling back to Firebase Firestore...")
-    db = init_firestore()
+    with open(spool_path, "a", encoding="utf-8") as spool:
+        for records, last_id in iter_event_pages(page_size, cursor["last_id"], db=db):
+            for record in records:
+                spool.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            spool.flush()
+            os.fsync(spool.fileno())
+            cursor = {
+                "last_id": last_id,
+                "records": cursor["records"] + len(records),
+                "pages": cursor["pages"] + 1,
+                "offset": spool.tell(),
+            }
+            with open(cursor_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(cursor, f)
+            os.replace(cursor_path + ".tmp", cursor_path)
+            if progress:
+                progress(cursor["pages"], cursor["records"])
 
-    docs = db.collection("events").stream()
-    events = []
+    # Spool (one record per line) -> JSON array, without loading it all
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(spool_path, "r", encoding="utf-8") as src, open(output_path + ".tmp", "w", encoding="utf-8") as dst:
+        dst.write("[")
+        for i, line in enumerate(src):
+            if i:
+                dst.write(",")
+            dst.write(line.rstrip("\n"))
+        dst.write("]")
+    os.replace(output_path + ".tmp", output_path)
+    os.remove(spool_path)
+    if os.path.exists(cursor_path):
+        os.remove(cursor_path)
+
+    print(f"✅ Loaded {cursor['records']} events from Firestore ({cursor['pages']} pages)")
+    return cursor["records"]
 
-    for doc in docs:
-        data = doc.to_dict()
-        events.append({
-            "event_name": data.get("event_name"),
-            "venue": data.get("venue"),
-            "time": data.get("time"),
-            "date": data.get("date"),
-            "details": data.get("details"),
-            "coordinator": data.get("coordinator"),
-            "fest": data.get("fest"),
-            "slots": data.get("slots"),
-            "poster": data.get("poster"),
-            "amount": data.get("amount"),
-            "phone_number":doc.get("phone_number"),
-            "category": data.get("category")
-        })
 
+def fetch_events_from_firestore(page_size: int = FIRESTORE_PAGE_SIZE):
+    """All events as a list (small collections; the sync itself uses sync_from_firestore)"""
+    events = []
+    for records, _ in iter_event_pages(page_size):
+        events.extend(records)
     print(f"✅ Loaded {len(events)} events from Firestore")
     return events
+
+
+def seed_emulator(count: int, db=None):
+    """Fill the emulator's collection with synthetic events (refuses without an emulator)"""
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        raise SystemExit("Refusing to seed: FIRESTORE_EMULATOR_HOST is not set")
+    db = db or init_firestore()
+    collection = db.collection(FIRESTORE_COLLECTION)
+    for start in range(0, count, 500):
+        batch = db.batch()
+        for i in range(start, min(start + 500, count)):
+            batch.set(collection.document(f"evt{i:06d}"), {
+                "event_name": f"Event {i}", "venue": f"Hall {i % 7}", "time": "10:00",
+                "date": datetime(2026, 6, 2), "details": f"Details for event {i}",
+                "coordinator": "Coordinator", "fest": "Fest", "slots": 50, "poster": None,
+                "amount": 100, "phone_number": "0000000000", "category": "technical",
+                "internal_notes": "x" * 2000,  # not in the projection, never downloaded
+            })
+        batch.commit()
+    print(f"✅ Seeded {count} events into the emulator")
+
+
+if __name__ == "__main__":
+    import argparse
+    import resource
+    import time
+
+    parser = argparse.ArgumentParser(description="Sync events from Firestore (or seed the emulator)")
+    parser.add_argument("--output", default="data/events.json")
+    parser.add_argument("--page-size", type=int, default=FIRESTORE_PAGE_SIZE)
+    parser.add_argument("--seed", type=int, default=0, help="Seed this many events into the emulator and exit")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed_emulator(args.seed)
+    else:
+        start = time.perf_counter()
+        count = sync_from_firestore(args.output, args.page_size)
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{count} events in {time.perf_counter() - start:.2f}s, peak RSS {peak_mb:.0f}MB")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible LLM stub for testing and load tests.
+
+Usage:
+    python scripts/llm_stub.py --port 9000 --delay 0.2
+    # then in .env:
+    LLM_API_URL=http://127.0.0.1:9000/v1/chat/completions
+    LLM_API_KEY=stub
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+import uvicorn
+
+app = FastAPI(title="LLM stub")
+
+STATE = {
+    "delay": 0.0,
+    "token_delay": 0.02,
+    "reply": "Sthree Suraksha gives ₹1000/month to eligible women aged 35-60.",
+    "requests": 0,
+}
+
+
+async def _stream_reply(completion_id: str, model: str):
+    """Emit the canned reply word by word in OpenAI's SSE chunk format"""
+    words = STATE["reply"].split(" ")
+    for i, word in enumerate(words):
+        token = word if i == 0 else " " + word
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+        if STATE["token_delay"]:
+            await asyncio.sleep(STATE["token_delay"])
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    """Return a canned completion after an optional artificial delay"""
+    body = await request.json()
+    STATE["requests"] += 1
+
+    if STATE["delay"]:
+        await asyncio.sleep(STATE["delay"])
+
+    if body.get("stream"):
+        return StreamingResponse(
+            _stream_reply(f"stub-{STATE['requests']}", body.get("model", "stub")),
+            media_type="text/event-stream"
+        )
+
+    return {
+        "id": f"stub-{STATE['requests']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": STATE["reply"]},
+            "finish_reason": "stop"
+        }],
+    }
+
+
+@app.get("/stats")
+def stats():
+    return {"requests": STATE["requests"]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible LLM stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before replying")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds between streamed tokens")
+    parser.add_argument("--reply", default=None, help="Canned answer text")
+    args = parser.parse_args()
+
+    STATE["delay"] = args.delay
+    STATE["token_delay"] = args.token_delay
+    if args.reply:
+        STATE["reply"] = args.reply
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -20,17 +20,23 @@ if [ "$AVAILABLE_MEM" -lt 1500 ]; then
     export WORKERS=1
 else
     echo "✅ Memory: ${AVAILABLE_MEM}MB available"
-    export WORKERS=1
+    export WORKERS=${WORKERS:-1}
 fi
 
-# Start uvicorn with memory-efficient settings
-uvicorn app.main:app \
-    --host 0.0.0.0 \
-    --port 4002 \
-    --workers ${WORKERS} \
-    --limit-concurrency 10 \
-    --timeout-keep-alive 10 \
-    --log-level info
+if [ "$WORKERS" -gt 1 ]; then
+    # Preloaded master + forked workers sharing the model and a memory-mapped index
+    echo "⚡ Starting ${WORKERS} workers (gunicorn preload)..."
+    WEB_CONCURRENCY=${WORKERS} gunicorn -c gunicorn.conf.py app.main:app
+else
+    # Start uvicorn with memory-efficient settings
+    uvicorn app.main:app \
+        --host 0.0.0.0 \
+        --port 4002 \
+        --workers 1 \
+        --limit-concurrency 10 \
+        --timeout-keep-alive 10 \
+        --log-level info
+fi
 
 # Cleanup on exit
 trap 'echo "🧹 Cleaning up..."; pkill -f uvicorn' EXIT
@@ -0,0 +1,240 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app import appwrite_sync
+from app.appwrite_sync import DeltaSyncScheduler, fetch_documents, merge_events, to_event, watermark_of
+from app.eligibility import EligibilityEngine
+from app.json_store import event_to_scheme, load_all_events
+from scripts import appwrite_stub
+
+
+@pytest.fixture(scope="module")
+def stub_endpoint():
+    server, endpoint = appwrite_stub.serve_in_thread()
+    yield endpoint
+    server.should_exit = True
+
+
+@pytest.fixture
+def appwrite(stub_endpoint, monkeypatch):
+    """The Appwrite stub with an empty collection; returns its STATE"""
+    monkeypatch.setattr(appwrite_sync, "APPWRITE_ENDPOINT", stub_endpoint)
+    state = appwrite_stub.STATE
+    state.update(documents={}, total_cap=5000, delay=0.0, requests=0, queries=[], error_status=None)
+    return state
+
+
+def _doc(doc_id, updated, **fields):
+    return {"$id": doc_id, "$updatedAt": updated, "event_name": f"Event {doc_id}", **fields}
+
+
+def test_to_event_formats_date_and_keeps_sync_fields():
+    event = to_event(_doc("a", "2026-01-02T10:00:00.000+00:00", date="2026-06-02T00:00:00.000+00:00"))
+    assert event["$id"] == "a"
+    assert event["$updatedAt"] == "2026-01-02T10:00:00.000+00:00"
+    assert event["date"] == "02/06/2026"
+
+
+def test_watermark_is_latest_updated_at():
+    events = [to_event(_doc("a", "2026-01-01T00:00:00.000+00:00")),
+              to_event(_doc("b", "2026-03-01T00:00:00.000+00:00"))]
+    assert watermark_of(events) == "2026-03-01T00:00:00.000+00:00"
+
+
+def test_watermark_needs_ids_on_every_record():
+    assert watermark_of([]) is None
+    assert watermark_of([{"event_name": "from firestore"}]) is None
+
+
+def test_merge_upserts_changed_documents_only():
+    store = [to_event(_doc("a", "t1")), to_event(_doc("b", "t1"))]
+    merged, upserted, deleted = merge_events(store, [_doc("b", "t1"), _doc("b", "t1"), _doc("c", "t2")])
+    assert upserted == ["c"]  # b is unchanged at the watermark boundary
+    assert deleted == []
+    assert [e["$id"] for e in merged] == ["a", "b", "c"]
+
+    merged, upserted, _ = merge_events(merged, [_doc("a", "t3", venue="Hall 2")])
+    assert upserted == ["a"]
+    assert merged[0]["venue"] == "Hall 2"
+
+
+def test_merge_deletes_only_with_a_listing():
+    store = [to_event(_doc("a", "t1")), to_event(_doc("b", "t1"))]
+    assert merge_events(store, [], None)[2] == []
+    merged, _, deleted = merge_events(store, [], {"b"})
+    assert deleted == ["a"]
+    assert [e["$id"] for e in merged] == ["b"]
+
+
+def test_event_to_scheme_maps_appwrite_fields():
+    scheme = event_to_scheme(to_event(_doc(
+        "ev1", "t1", category="Music", details="Live band", venue="Main Hall",
+        date="2026-06-02T00:00:00.000+00:00", amount=100,
+    )))
+    assert scheme["id"] == "ev1"
+    assert scheme["name"] == "Event ev1"
+    assert scheme["category"] == "Music"
+    assert scheme["benefit"] == "Live band. Venue: Main Hall. Date: 02/06/2026. Fee: 100"
+    assert scheme["event_name"] == "Event ev1"  # event fields are kept
+
+    curated = {"id": "S1", "name": "Scheme"}
+    assert event_to_scheme(curated) is curated
+
+
+def test_load_all_events_adds_synced_records(tmp_path):
+    schemes = tmp_path / "schemes.json"
+    synced = tmp_path / "events.json"
+    schemes.write_text(json.dumps({"kerala_schemes": [{"id": "S1", "name": "Scheme", "eligibility": {}}]}))
+    assert [e["id"] for e in load_all_events(str(schemes), str(synced))] == ["S1"]
+
+    synced.write_text(json.dumps([to_event(_doc("ev1", "t1")), {"id": "S1", "name": "Stale copy"}]))
+    events = load_all_events(str(schemes), str(synced))
+    assert [(e["id"], e["name"]) for e in events] == [("S1", "Scheme"), ("ev1", "Event ev1")]
+    # Synced events carry no eligibility rules, so they never match a profile
+    assert [r["id"] for r in EligibilityEngine(events).evaluate(age=30)] == ["S1"]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """The synced events file, in tmp_path"""
+    path = str(tmp_path / "events.json")
+    read, write = appwrite_sync.read_events, appwrite_sync.write_events
+    monkeypatch.setattr(appwrite_sync, "read_events", lambda: read(path))
+    monkeypatch.setattr(appwrite_sync, "write_events", lambda events: write(events, path))
+    return lambda: read(path)
+
+
+def _stub_call(endpoint, method, path, **kwargs):
+    response = httpx.request(method, endpoint.rsplit("/v1", 1)[0] + path, **kwargs)
+    response.raise_for_status()
+
+
+def _listings(state, method):
+    """Queries of `method` sent since the last reset of the stub's query log"""
+    return [q for queries in state["queries"] for q in queries if q["method"] == method]
+
+
+def test_fetch_delta_asks_for_changes_since_the_watermark(appwrite, stub_endpoint):
+    appwrite_stub.seed(250)
+    events = [to_event(doc) for doc in asyncio.run(fetch_documents(page_size=100))]
+    watermark = watermark_of(events)
+    _stub_call(stub_endpoint, "POST", "/stub/documents", json={"$id": "evt00003", "venue": "Hall 9"})
+    _stub_call(stub_endpoint, "DELETE", "/stub/documents/evt00007")
+    appwrite["queries"].clear()
+
+    changed, live_ids = asyncio.run(appwrite_sync.fetch_delta(events))
+
+    assert _listings(appwrite, "greaterThanEqual") == [
+        {"method": "greaterThanEqual", "attribute": "$updatedAt", "values": [watermark]}
+    ]
+    # The last document sits on the watermark itself; merging drops it as unchanged
+    assert sorted(doc["$id"] for doc in changed) == ["evt00003", "evt00249"]
+    assert _listings(appwrite, "select") == [{"method": "select", "values": ["$id"]}] * 3
+    assert len(live_ids) == 249 and "evt00007" not in live_ids
+
+    merged, upserted, deleted = merge_events(events, changed, live_ids)
+    assert upserted == ["evt00003"] and deleted == ["evt00007"]
+
+
+def test_fetch_delta_pages_through_many_changes(appwrite):
+    appwrite_stub.seed(250)
+    # Watermark at the oldest document: everything counts as changed
+    events = [to_event(appwrite["documents"]["evt00000"])]
+    appwrite["queries"].clear()
+
+    changed, live_ids = asyncio.run(appwrite_sync.fetch_delta(events, check_deletions=False))
+
+    assert len({doc["$id"] for doc in changed}) == 250 and live_ids is None
+    assert not _listings(appwrite, "select")
+    # Every page of changes carries the watermark filter
+    assert appwrite["requests"] == 3
+    assert len(_listings(appwrite, "greaterThanEqual")) == 3
+
+
+def test_fetch_delta_without_watermark_is_a_full_fetch(appwrite):
+    appwrite_stub.seed(5)
+    changed, live_ids = asyncio.run(appwrite_sync.fetch_delta([{"event_name": "from firestore"}]))
+    assert len(changed) == 5 and live_ids == set(appwrite["documents"])
+    assert not _listings(appwrite, "greaterThanEqual")
+
+
+def test_http_error_fails_the_run_and_keeps_the_store(appwrite, store, tmp_path):
+    appwrite_stub.seed(3)
+    scheduler = DeltaSyncScheduler(interval=60, lock_path=str(tmp_path / ".sync.lock"))
+    asyncio.run(scheduler.run_once())
+    appwrite["error_status"] = 503
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(scheduler.run_once(force=True))
+    assert scheduler.failures == 1 and "503" in scheduler.last_error
+    assert len(store()) == 3
+
+
+def test_scheduler_applies_changes_and_skips_a_fresh_run(appwrite, store, stub_endpoint, tmp_path):
+    appwrite_stub.seed(3)
+    lock_path = str(tmp_path / ".sync.lock")
+    first = DeltaSyncScheduler(interval=60, lock_path=lock_path)
+    second = DeltaSyncScheduler(interval=60, lock_path=lock_path)
+
+    changes = asyncio.run(first.run_once())
+    assert changes["upserted"] == 3 and changes["deletions_checked"]
+    assert sorted(e["$id"] for e in store()) == ["evt00000", "evt00001", "evt00002"]
+
+    # Another worker's tick within the interval does not poll Appwrite again
+    requests = appwrite["requests"]
+    assert asyncio.run(second.run_once()) == {"skipped": True}
+    assert second.skipped == 1 and appwrite["requests"] == requests
+
+    # Until the shared last-run time is an interval old
+    _stub_call(stub_endpoint, "POST", "/stub/documents", json={"$id": "evt00001", "venue": "Hall 9"})
+    shared = json.loads((tmp_path / ".sync.lock").read_text())
+    shared["last_run"] -= 60
+    (tmp_path / ".sync.lock").write_text(json.dumps(shared))
+    changes = asyncio.run(second.run_once())
+    assert changes["upserted"] == 1 and not changes["deletions_checked"]
+    assert {e["$id"]: e["venue"] for e in store()}["evt00001"] == "Hall 9"
+    assert second.watermark == appwrite["documents"]["evt00001"]["$updatedAt"]
+
+
+def test_scheduler_lists_ids_every_n_runs(appwrite, store, stub_endpoint, tmp_path):
+    appwrite_stub.seed(3)
+    lock_path = tmp_path / ".sync.lock"
+    scheduler = DeltaSyncScheduler(interval=10, lock_path=str(lock_path), delete_check_every=3)
+    listed = []
+
+    for run in range(4):
+        if run == 2:
+            _stub_call(stub_endpoint, "DELETE", "/stub/documents/evt00002")
+        appwrite["queries"].clear()
+        asyncio.run(scheduler.run_once())
+        listed.append(bool(_listings(appwrite, "select")))
+        # Age the shared state by one interval, as if a tick had passed
+        shared = json.loads(lock_path.read_text())
+        lock_path.write_text(json.dumps({key: value - 10 for key, value in shared.items()}))
+
+    # The first run has no watermark (full fetch, no separate listing)
+    assert listed == [False, False, False, True]
+    assert scheduler.deletion_checks == 2
+    # The deletion is noticed at the next $id listing, not before
+    assert sorted(e["$id"] for e in store()) == ["evt00000", "evt00001"]
+
+
+def test_fetch_documents_pages_past_the_total_cap(appwrite):
+    appwrite_stub.seed(1234)
+    appwrite["total_cap"] = 500  # Appwrite stops counting; the cursor sweep fetches the rest
+    progress = []
+
+    documents = asyncio.run(fetch_documents(page_size=100, concurrency=4,
+                                            progress=lambda *args: progress.append(args)))
+
+    ids = [doc["$id"] for doc in documents]
+    assert len(ids) == len(set(ids)) == 1234
+    assert set(ids) == set(appwrite["documents"])
+    # 5 offset pages up to the reported total, then 8 cursor pages (the last one short)
+    assert appwrite["requests"] == 13
+    assert progress[0] == (1, 5, 100)
+    assert progress[-1] == (13, 13, 1234)
+    assert [done for done, _, _ in progress] == list(range(1, 14))
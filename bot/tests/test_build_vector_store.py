@@ -0,0 +1,159 @@
+import numpy as np
+import pytest
+
+from app import vector_store
+from app.vector_store import NumpyBackend, _scheme_document, build_vector_store
+
+
+class CountingEncoder:
+    """Stands in for SentenceTransformer: a deterministic vector per text, counting what it encodes"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        return np.array([[len(text), sum(map(ord, text)) % 97 + 1, 1.0] for text in texts], dtype=np.float32)
+
+
+class StoredVectors:
+    """Minimal data snapshot exposing vectors by content hash"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def vectors_by_hash(self):
+        return self.vectors
+
+
+def _scheme(scheme_id, benefit="₹1000/month"):
+    return {"id": scheme_id, "name": f"Scheme {scheme_id}", "category": "Welfare", "benefit": benefit}
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    backend = NumpyBackend(str(tmp_path / "numpy_index"), mmap=False)
+    encoder = CountingEncoder()
+    monkeypatch.setattr(vector_store, "_backend", backend)
+    monkeypatch.setattr(vector_store, "_model", encoder)
+    monkeypatch.setattr(vector_store, "last_snapshot", lambda: None)
+    return tmp_path, encoder
+
+
+def test_first_build_embeds_everything(index):
+    tmp_path, encoder = index
+    summary = build_vector_store([_scheme("A"), _scheme("B"), {"id": "no-name"}])
+
+    assert summary == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0}
+    assert len(encoder.encoded) == 2
+    assert vector_store.get_vector_backend().count() == 2
+
+
+def test_only_changes_are_embedded(index):
+    tmp_path, encoder = index
+    build_vector_store([_scheme("A"), _scheme("B"), _scheme("C")])
+    encoder.encoded.clear()
+
+    summary = build_vector_store([_scheme("A"), _scheme("B", benefit="₹2000/month"), _scheme("D")])
+
+    assert summary == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+    assert sorted(encoder.encoded) == sorted(
+        _scheme_document(s, 0)[1] for s in (_scheme("B", benefit="₹2000/month"), _scheme("D"))
+    )
+    backend = vector_store.get_vector_backend()
+    assert sorted(backend.get_hashes()) == ["A", "B", "D"]
+    assert "₹2000" in backend.get(["B"])[0]["text"]
+
+
+def test_unchanged_data_skips_the_rebuild(index):
+    tmp_path, encoder = index
+    build_vector_store([_scheme("A")])
+    backend = vector_store.get_vector_backend()
+    version = vector_store.get_index_version()
+    encoder.encoded.clear()
+
+    assert build_vector_store([_scheme("A")]) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 1}
+    assert encoder.encoded == []
+    assert vector_store.get_vector_backend() is backend
+    assert vector_store.get_index_version() == version
+
+
+def test_empty_load_never_wipes_the_index(index):
+    build_vector_store([_scheme("A")])
+    assert build_vector_store([]) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 1}
+    assert vector_store.get_vector_backend().count() == 1
+
+
+def test_snapshot_vectors_are_reused(index, monkeypatch):
+    tmp_path, encoder = index
+    doc = _scheme_document(_scheme("A"), 0)
+    stored = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+    monkeypatch.setattr(vector_store, "last_snapshot", lambda: StoredVectors({doc[2]["content_hash"]: stored}))
+
+    summary = build_vector_store([_scheme("A"), _scheme("B")])
+
+    assert summary["added"] == 2
+    assert encoder.encoded == [_scheme_document(_scheme("B"), 1)[1]]
+    assert vector_store.get_vector_backend().query(stored, 1)[0]["id"] == "A"
+
+
+def test_model_change_re_embeds_everything(index, monkeypatch):
+    tmp_path, encoder = index
+    build_vector_store([_scheme("A"), _scheme("B")])
+    encoder.encoded.clear()
+
+    monkeypatch.setattr(vector_store, "embedding_signature", lambda: "onnx-int8:other-model:128")
+    summary = build_vector_store([_scheme("A"), _scheme("B")])
+
+    assert summary == {"added": 0, "updated": 2, "removed": 0, "unchanged": 0}
+    assert len(encoder.encoded) == 2
+
+
+def test_changes_go_to_a_persisted_copy(index):
+    tmp_path, encoder = index
+    build_vector_store([_scheme("A")])
+    before = vector_store.get_vector_backend()
+    version = vector_store.get_index_version()
+
+    build_vector_store([_scheme("A"), _scheme("B")])
+
+    after = vector_store.get_vector_backend()
+    assert after is not before
+    assert before.count() == 1  # readers pinned to the old index are undisturbed
+    assert after.count() == 2
+    assert vector_store.get_index_version() == version + 1
+    assert NumpyBackend(str(tmp_path / "numpy_index"), mmap=False).count() == 2
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_failed_batch_is_retried_next_time(index, monkeypatch):
+    tmp_path, encoder = index
+
+    class Failing:
+        def encode(self, texts, **kwargs):
+            raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(vector_store, "_model", Failing())
+    build_vector_store([_scheme("A")])
+    assert vector_store.get_vector_backend().count() == 0
+
+    monkeypatch.setattr(vector_store, "_model", encoder)
+    assert build_vector_store([_scheme("A")])["added"] == 1
+    assert len(encoder.encoded) == 1
+
+
+def test_reuse_only_never_encodes(index, monkeypatch):
+    tmp_path, encoder = index
+    doc = _scheme_document(_scheme("A"), 0)
+    stored = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+    monkeypatch.setattr(vector_store, "last_snapshot", lambda: StoredVectors({doc[2]["content_hash"]: stored}))
+
+    summary = build_vector_store([_scheme("A"), _scheme("B")], reuse_only=True)
+
+    assert summary["pending"] == 1
+    assert encoder.encoded == []
+    assert vector_store.get_vector_backend().get_hashes() == {"A": doc[2]["content_hash"]}
+
+    # The worker that finishes the index embeds only what was left
+    assert "pending" not in build_vector_store([_scheme("A"), _scheme("B")])
+    assert encoder.encoded == [_scheme_document(_scheme("B"), 1)[1]]
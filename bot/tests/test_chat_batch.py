@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import chat_engine
+from app.cache import load_event_cache
+
+SCHEMES = [
+    {"id": "PENSION_001", "name": "Kerala Social Security Pension", "category": "Social Security"},
+    {"id": "HOUSING_001", "name": "Life Mission Housing Scheme", "category": "Housing"},
+]
+
+
+def _docs(query):
+    scheme_id = "HOUSING_001" if "housing" in query.lower() else "PENSION_001"
+    return [{"id": scheme_id, "text": scheme_id, "metadata": {"scheme_id": scheme_id}}]
+
+
+class FakeLLM:
+    def __init__(self, fail_on=(), delay=0.0):
+        self.fail_on = fail_on
+        self.delay = delay
+        self.questions = []
+
+    async def __call__(self, context, question, raise_errors=False):
+        self.questions.append(question)
+        await asyncio.sleep(self.delay)
+        if any(word in question.lower() for word in self.fail_on):
+            if raise_errors:
+                raise RuntimeError("provider timeout")
+            return chat_engine.ERROR_RESPONSE
+        return f"answer: {question}"
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    load_event_cache(SCHEMES)
+    searched = []
+
+    def search_batch(queries, top_k):
+        searched.append(list(queries))
+        return [_docs(q) for q in queries]
+
+    async def search(query, top_k):
+        return _docs(query)
+
+    fake = FakeLLM()
+    monkeypatch.setattr(chat_engine, "semantic_search_batch", search_batch)
+    monkeypatch.setattr(chat_engine, "asemantic_search", search)
+    monkeypatch.setattr(chat_engine, "agenerate_answer", fake)
+    fake.searched = searched
+    yield fake
+    load_event_cache([])
+
+
+def test_results_keep_input_order_and_share_llm_calls(llm):
+    messages = ["what is the pension scheme", "hello", "What is the pension scheme?", "how to apply for housing scheme"]
+    results = asyncio.run(chat_engine.achat_batch(messages))
+
+    assert [r["error"] for r in results] == [None] * 4
+    assert results[0]["reply"] == results[2]["reply"] == "answer: what is the pension scheme"
+    assert results[1]["reply"] in chat_engine.GREETING_RESPONSES
+    assert results[3]["reply"] == "answer: how to apply for housing scheme"
+    # Greeting answered up front; the two pension questions share one LLM call
+    assert llm.searched == [["what is the pension scheme", "What is the pension scheme?", "how to apply for housing scheme"]]
+    assert len(llm.questions) == 2
+
+
+def test_llm_failure_is_a_per_item_error(llm):
+    llm.fail_on = ("housing",)
+    results = asyncio.run(chat_engine.achat_batch(["pension scheme details", "housing scheme details"]))
+
+    assert results[0] == {"reply": "answer: pension scheme details", "error": None}
+    assert results[1]["reply"] is None
+    assert results[1]["error"] == "LLM call failed: provider timeout"
+
+
+def test_retrieval_failure_fails_pending_items_only(llm, monkeypatch):
+    def broken(queries, top_k):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(chat_engine, "semantic_search_batch", broken)
+    results = asyncio.run(chat_engine.achat_batch(["thanks", "pension scheme details"]))
+
+    assert results[0]["error"] is None
+    assert results[1] == {"reply": None, "error": "Retrieval failed: index unavailable"}
+
+
+def test_batch_item_sharing_a_failed_chat_call_reports_an_error(llm):
+    llm.fail_on = ("pension",)
+    llm.delay = 0.05
+
+    async def run():
+        # /chat leads the LLM call; the batch joins it while it is in flight
+        chat = asyncio.ensure_future(chat_engine.achat("pension scheme details"))
+        await asyncio.sleep(0.01)
+        batch = await chat_engine.achat_batch(["pension scheme details"])
+        return await chat, batch
+
+    reply, batch = asyncio.run(run())
+    assert len(llm.questions) == 1
+    assert reply == chat_engine.ERROR_RESPONSE
+    assert batch == [{"reply": None, "error": "LLM call failed: provider timeout"}]
+
+
+def test_too_many_messages_is_413():
+    from app import main
+
+    client = TestClient(main.app)
+    response = client.post("/chat/batch", json={"messages": ["hi"] * (main.CHAT_BATCH_MAX_MESSAGES + 1)})
+    assert response.status_code == 413
@@ -0,0 +1,34 @@
+import pytest
+
+from app import chat_engine
+from app.cache import load_event_cache
+from app.intent_router import route_intent
+
+SCHEMES = [
+    {"id": "PENSION_001", "name": "Kerala Social Security Pension", "category": "Social Security"},
+    {"id": "UNWED_001", "name": "Snehasparsham (Unwed Mothers)", "category": "Women Welfare"},
+]
+
+
+@pytest.fixture(autouse=True)
+def schemes():
+    load_event_cache(SCHEMES)
+    yield
+    load_event_cache([])
+
+
+@pytest.mark.parametrize("query", ["PENSION_001", "snehasparsham"])
+def test_scheme_id_or_name_goes_to_retrieval(query):
+    assert chat_engine._route_query(query, None) is None
+
+
+def test_exact_match_bypasses_the_out_of_context_gate(monkeypatch):
+    # Even if the router does not know the scheme words, naming a scheme is relevant
+    monkeypatch.setattr(chat_engine, "route_intent", lambda query, vocabulary=frozenset(): route_intent(query))
+    assert chat_engine._route_query("PENSION_001", None) is None
+    assert chat_engine._route_query("my property tax is too high", None) in chat_engine.OUT_OF_CONTEXT_RESPONSES
+
+
+def test_pleasantries_and_empty():
+    assert chat_engine._route_query("", None) == "Please ask a question."
+    assert chat_engine._route_query("hello", None) in chat_engine.GREETING_RESPONSES
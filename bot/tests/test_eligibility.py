@@ -0,0 +1,81 @@
+import pytest
+
+from app.eligibility import EligibilityEngine, extract_profile, is_eligibility_query
+
+
+@pytest.mark.parametrize("query, age", [
+    ("I am a 45 year old woman", 45),
+    ("my father is 70 years old", 70),
+    ("a 65-year-old farmer", 65),
+    ("aged 62, looking for a pension", 62),
+    ("my age is 30", 30),
+    ("I'm 58", 58),
+    ("I am 60 years", 60),
+])
+def test_age_is_extracted(query, age):
+    assert extract_profile(query)["age"] == age
+
+
+@pytest.mark.parametrize("query", [
+    "I have 5 years of service, which schemes can I get?",
+    "pension after 10 years in the scheme",
+    "I am 5 years into my job",
+    "scheme launched 3 years ago",
+])
+def test_durations_are_not_ages(query):
+    assert "age" not in extract_profile(query)
+
+
+@pytest.mark.parametrize("query, gender", [
+    ("I am a widow, am I eligible?", "female"),
+    ("I'm a single mother earning 5000 a month", "female"),
+    ("I am a 45 year old woman", "female"),
+    ("as a father of two, which schemes can I get", "male"),
+    ("gender: female, age 40", "female"),
+    ("i am transgender", "transgender"),
+])
+def test_gender_from_first_person(query, gender):
+    assert extract_profile(query)["gender"] == gender
+
+
+@pytest.mark.parametrize("query", [
+    "schemes for mothers",
+    "widow pension eligibility",
+    "I am asking about support for women",
+    "housing for my mother",
+])
+def test_gender_not_taken_from_topic(query):
+    assert "gender" not in extract_profile(query)
+
+
+def test_income_is_annualised():
+    assert extract_profile("I earn 10,000 per month")["income"] == 120000
+    assert extract_profile("my income is 1.5 lakh")["income"] == 150000
+    assert extract_profile("salary 20k monthly")["income"] == 240000
+
+
+def test_ration_card():
+    assert extract_profile("we have a pink ration card")["ration_card"] == "pink"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("I am a 45 year old woman earning 1 lakh, which schemes can I get?", True),
+    ("I'm 70 years old, am I eligible for the pension?", True),
+    ("I am a widow earning 50000 a year, what schemes do I qualify for", True),
+    # Facts without an eligibility question go through retrieval
+    ("I am a 45 year old woman earning 1 lakh", False),
+    ("pension for a 60 year old with income below 1 lakh", False),
+    ("which schemes are there for housing", False),
+])
+def test_is_eligibility_query(query, expected):
+    assert is_eligibility_query(query, extract_profile(query)) is expected
+
+
+def test_engine_filters_by_profile():
+    engine = EligibilityEngine([
+        {"id": "OLD", "name": "Old age", "eligibility": {"min_age": 60}},
+        {"id": "WOMEN", "name": "Women", "eligibility": {"gender": "Female", "income_max": 100000}},
+    ])
+    assert [r["id"] for r in engine.evaluate(age=65, gender="male")] == ["OLD"]
+    assert [r["id"] for r in engine.evaluate(age=30, gender="female", income=90000)] == ["WOMEN"]
+    assert engine.evaluate(age=30, gender="female", income=200000) == []
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from app.embedding_batcher import MicroBatcher
+
+
+class StubEncoder:
+    """Async encode_fn recording each model call; the vector encodes the text"""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [f"vec:{text}" for text in texts]
+
+
+def _embed_all(batcher, texts):
+    async def run():
+        start = time.perf_counter()
+        results = await asyncio.gather(*(batcher.embed(text) for text in texts))
+        return results, time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def test_window_collects_concurrent_queries_into_one_call():
+    encoder = StubEncoder()
+    batcher = MicroBatcher(encoder, window_ms=20, max_batch=16)
+
+    results, _ = _embed_all(batcher, ["a", "b", "c"])
+
+    assert encoder.calls == [["a", "b", "c"]]
+    # Each caller gets its own vector back
+    assert results == ["vec:a", "vec:b", "vec:c"]
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["batch_size_le"]["4"] == 1
+
+
+def test_full_batch_flushes_without_waiting_for_the_window():
+    encoder = StubEncoder(delay=0.01)
+    batcher = MicroBatcher(encoder, window_ms=2000, max_batch=2)
+
+    results, elapsed = _embed_all(batcher, ["a", "b", "c", "d"])
+
+    # The second batch went out as soon as the first finished, not after the window
+    assert encoder.calls == [["a", "b"], ["c", "d"]]
+    assert results == ["vec:a", "vec:b", "vec:c", "vec:d"]
+    assert elapsed < 1.0
+
+
+def test_identical_texts_in_a_batch_are_encoded_once():
+    encoder = StubEncoder()
+    batcher = MicroBatcher(encoder, window_ms=20)
+
+    results, _ = _embed_all(batcher, ["pension", "housing", "pension"])
+
+    assert encoder.calls == [["pension", "housing"]]
+    assert results == ["vec:pension", "vec:housing", "vec:pension"]
+    assert batcher.deduplicated == 1 and batcher.items == 3
+
+
+def test_encode_failure_reaches_every_caller():
+    batcher = MicroBatcher(StubEncoder(error=RuntimeError("model crashed")), window_ms=5)
+
+    async def run():
+        return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    assert [str(e) for e in asyncio.run(run())] == ["model crashed"] * 2
+    assert batcher.failures == 1 and batcher.batches == 0
+
+
+def test_zero_window_is_disabled():
+    assert not MicroBatcher(StubEncoder(), window_ms=0).enabled
+
+
+@pytest.mark.parametrize("size, bucket", [(1, "1"), (3, "4"), (40, "64"), (100, ">64")])
+def test_batch_sizes_land_in_their_bucket(size, bucket):
+    batcher = MicroBatcher(StubEncoder(), window_ms=1)
+    batcher._record(size, 0)
+    assert batcher.stats()["batch_size_le"][bucket] == 1
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import embedding_pool, rag_retriever
+from app.embedding_batcher import MicroBatcher
+from app.embedding_pool import EmbeddingPool, EmbeddingPoolBusy
+
+
+class StubEncode:
+    """Stands in for the pool process: blocks until released, sleeps, or fails"""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.release = threading.Event()
+        self.release.set()
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(texts)
+        self.release.wait(5)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [[float(len(text))] for text in texts], 0.001
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    stub = StubEncode()
+    monkeypatch.setattr(embedding_pool, "_encode", stub)
+    # Threads instead of spawned processes: same Future interface, no model load
+    pool = EmbeddingPool(size=2, queue_size=2, timeout=1.0)
+    pool._executor = ThreadPoolExecutor(max_workers=2)
+    yield pool, stub
+    pool.shutdown()
+
+
+def test_encode_returns_results_and_drains_the_queue(pool):
+    pool, stub = pool
+    assert asyncio.run(pool.encode(["abc"])) == [[3.0]]
+    assert stub.calls == [["abc"]]
+    stats = pool.stats()
+    assert stats["completed"] == 1 and stats["queue_depth"] == 0 and stats["max_queue_depth"] == 1
+
+
+def test_full_queue_rejects_instead_of_waiting(pool):
+    pool, stub = pool
+    stub.release.clear()
+
+    async def run():
+        held = [asyncio.ensure_future(pool.encode([f"q{i}"])) for i in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(EmbeddingPoolBusy, match="queue full"):
+            await pool.encode(["one too many"])
+        stub.release.set()
+        return await asyncio.gather(*held)
+
+    assert len(asyncio.run(run())) == 2
+    assert pool.rejected == 1 and pool.completed == 2
+    assert len(stub.calls) == 2
+
+
+def test_slow_job_times_out_but_still_counts_until_done(pool):
+    pool, stub = pool
+    pool.timeout = 0.05
+    stub.delay = 0.3
+
+    with pytest.raises(EmbeddingPoolBusy, match="timed out"):
+        asyncio.run(pool.encode(["slow"]))
+    assert pool.timeouts == 1
+    # The abandoned job still occupies a process until it finishes
+    assert pool.pending == 1
+    time.sleep(0.4)
+    assert pool.pending == 0
+
+
+def test_broken_pool_shuts_down_and_search_falls_back_inline(pool, monkeypatch):
+    pool, stub = pool
+    stub.error = BrokenProcessPool("a process terminated abruptly")
+
+    class Backend:
+        name = "numpy"
+
+    monkeypatch.setattr(rag_retriever, "EMBEDDING_POOL", pool)
+    monkeypatch.setattr(rag_retriever, "QUERY_BATCHER", MicroBatcher(None, window_ms=0))
+    monkeypatch.setattr(rag_retriever, "_pinned_index", lambda: (Backend(), None, 1))
+    monkeypatch.setattr(rag_retriever, "_exact_hits", lambda *args: None)
+    monkeypatch.setattr(rag_retriever, "semantic_search", lambda query, top_k: ["inline hit"])
+
+    assert asyncio.run(rag_retriever.asemantic_search("pool breaks on this query", 2)) == ["inline hit"]
+    assert pool.failures == 1 and not pool.started
+    assert "BrokenProcessPool" in pool.last_error
+
+
+def test_busy_pool_answers_503(monkeypatch):
+    from app import main
+
+    async def busy(message):
+        raise EmbeddingPoolBusy("Embedding queue full (2 pending)")
+
+    monkeypatch.setattr(main, "achat", busy)
+    response = TestClient(main.app).post("/chat", json={"message": "pension"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
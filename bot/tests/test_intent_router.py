@@ -0,0 +1,46 @@
+import pytest
+
+from app.intent_router import route_intent
+from app.lexical_index import LexicalIndex
+
+SCHEMES = [
+    ("WOMEN_001", {"id": "WOMEN_001", "name": "Sthree Suraksha Scheme", "category": "Women"}),
+    ("HEALTH_004", {"id": "HEALTH_004", "name": "Snehasparsham", "category": "Health"}),
+]
+VOCABULARY = LexicalIndex().build(SCHEMES).vocabulary
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("hiiii", "greeting"),
+    ("good morning", "greeting"),
+    ("thank you so much", "thankyou"),
+    ("byeee", "bye"),
+    ("how to apply for a pension", "scheme"),
+    ("hi, what schemes are there for women?", "scheme"),
+    ("thanks, and how do I apply?", "scheme"),
+    ("my property tax is too high", "out_of_context"),
+    ("schemes in Kochi", "scheme"),
+    ("   ", "empty"),
+])
+def test_route_intent(query, intent):
+    assert route_intent(query, VOCABULARY).name == intent
+
+
+def test_hi_inside_a_word_is_not_a_greeting():
+    assert route_intent("Kochi weather").name == "out_of_context"
+
+
+def test_scheme_names_come_from_the_dataset():
+    assert VOCABULARY >= {"sthree", "suraksha", "snehasparsham", "women_001"}
+    assert "scheme" not in VOCABULARY  # generic name words stay out
+
+    for query in ("sthree suraksha", "snehasparsham please", "HEALTH_004"):
+        assert route_intent(query).name == "out_of_context"
+        assert route_intent(query, VOCABULARY).name == "scheme"
+
+
+def test_pleasantry_confidence_is_share_of_message():
+    assert route_intent("hi").confidence == 1.0
+    intent = route_intent("hi there my friend")
+    assert intent.name == "greeting"
+    assert intent.confidence == 0.25
@@ -0,0 +1,66 @@
+import pytest
+
+from app.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+SCHEMES = [
+    {"id": "STHREE_001", "name": "Sthree Suraksha Pension Scheme", "category": "Women Welfare",
+     "benefit": "Monthly pension for women"},
+    {"id": "PENSION_001", "name": "Kerala Social Security Pension", "category": "Social Security",
+     "benefit": "Monthly pension for senior citizens"},
+    {"id": "EMPLOY_001", "name": "Chief Minister's Connect to Work", "category": "Employment",
+     "benefit": "Job training and placement", "roadmap": [{"title": "Register", "action": "Apply online"}]},
+    {"id": "HOUSING_001", "name": "Life Mission Housing Scheme", "category": "Housing",
+     "benefit": "Houses for the homeless"},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return LexicalIndex().build((s["id"], s) for s in SCHEMES)
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("What is the Life Mission?") == ["life", "mission"]
+
+
+@pytest.mark.parametrize("query, scheme_id", [
+    ("PENSION_001", "PENSION_001"),
+    ("tell me about pension_001 please", "PENSION_001"),
+    ("What is Sthree Suraksha?", "STHREE_001"),
+    ("how do I apply to connect to work", "EMPLOY_001"),
+    ("life mission", "HOUSING_001"),
+])
+def test_exact_match(index, query, scheme_id):
+    assert index.exact_match(query) == scheme_id
+
+
+@pytest.mark.parametrize("query", [
+    "pension scheme",          # generic name words only
+    "social security or life mission",  # names two schemes
+    "housing for the homeless",
+    "",
+])
+def test_no_exact_match(index, query):
+    assert index.exact_match(query) is None
+
+
+def test_search_ranks_name_matches_first(index):
+    results = index.search("housing scheme", 4)
+    assert results[0][0] == "HOUSING_001"
+    assert all(score > 0 for _, score in results)
+    assert index.search("zzz unknown", 3) == []
+
+
+def test_search_covers_roadmap(index):
+    assert index.search("online", 1)[0][0] == "EMPLOY_001"
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "d"]], k=60)
+    assert [doc_id for doc_id, _ in fused] == ["b", "c", "a", "d"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[-1][1] == pytest.approx(1 / 63)
+
+
+def test_reciprocal_rank_fusion_empty():
+    assert reciprocal_rank_fusion([[], []]) == []
@@ -0,0 +1,34 @@
+import pytest
+
+from app.lifecycle import COMPONENTS, Lifecycle
+
+
+def _boom():
+    raise RuntimeError("boom")
+
+
+def _finish(lifecycle, failing):
+    for name in COMPONENTS:
+        lifecycle._run_step(name, _boom if name == failing else (lambda: None))
+
+
+def test_all_steps_ready():
+    lifecycle = Lifecycle()
+    _finish(lifecycle, failing=None)
+    assert lifecycle.ready and not lifecycle.failed and not lifecycle.degraded
+
+
+@pytest.mark.parametrize("step", ["warmup", "embedding_pool"])
+def test_optional_step_failure_degrades(step):
+    lifecycle = Lifecycle()
+    _finish(lifecycle, failing=step)
+    assert lifecycle.ready
+    assert lifecycle.degraded and not lifecycle.failed
+    assert lifecycle.stats()["components"][step]["error"] == "RuntimeError: boom"
+
+
+def test_required_step_failure_fails():
+    lifecycle = Lifecycle()
+    with pytest.raises(RuntimeError):
+        lifecycle._run_step("vector_index", _boom)
+    assert lifecycle.failed and not lifecycle.degraded and not lifecycle.ready
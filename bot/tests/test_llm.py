@@ -0,0 +1,72 @@
+import asyncio
+
+from app import llm
+
+
+def test_sync_client_is_pooled_until_closed():
+    client = llm.get_sync_client()
+    assert llm.get_sync_client() is client
+
+    asyncio.run(llm.close_llm_clients())
+    assert client.is_closed
+    assert llm.get_sync_client() is not client
+    asyncio.run(llm.close_llm_clients())
+
+
+def test_async_client_is_reused_within_a_loop():
+    async def twice():
+        first = llm.get_async_client()
+        second = llm.get_async_client()
+        await llm.close_llm_clients()
+        return first, second
+
+    first, second = asyncio.run(twice())
+    assert first is second
+
+
+def test_async_client_is_recreated_on_another_loop():
+    async def one():
+        return llm.get_async_client()
+
+    first = asyncio.run(one())
+    second = asyncio.run(one())
+    assert first is not second
+    asyncio.run(llm.close_llm_clients())
+
+
+def test_client_limits_follow_configuration():
+    options = llm._client_options()
+    assert options["limits"].max_connections == llm.LLM_MAX_CONNECTIONS
+    assert options["limits"].max_keepalive_connections == llm.LLM_MAX_KEEPALIVE
+    assert options["timeout"].connect == llm.LLM_CONNECT_TIMEOUT
+
+
+def _stream(guard, tokens):
+    emitted = "".join(guard.feed(token) for token in tokens)
+    return emitted if guard.violation else emitted + guard.flush()
+
+
+def test_stream_guard_passes_clean_text_through():
+    guard = llm.StreamGuard()
+    text = _stream(guard, ["The pension ", "is paid ", "monthly to ", "eligible women."])
+    assert guard.violation is None
+    assert text == "The pension is paid monthly to eligible women."
+
+
+def test_stream_guard_holds_back_until_safe():
+    guard = llm.StreamGuard()
+    assert guard.feed("short") == ""  # shorter than the longest filter phrase
+    assert guard.flush() == "short"
+
+
+def test_stream_guard_catches_term_split_across_tokens():
+    guard = llm.StreamGuard()
+    emitted = "".join(guard.feed(token) for token in ["Apply like in Tamil", " Na", "du offices"])
+    assert guard.violation == llm.FORBIDDEN_RESPONSE
+    assert "tamil" not in emitted.lower()
+
+
+def test_stream_guard_flags_generic_phrases():
+    guard = llm.StreamGuard()
+    _stream(guard, ["Schemes like this are ", "typical", "ly free"])
+    assert guard.violation == llm.GENERIC_RESPONSE
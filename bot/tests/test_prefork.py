@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+from app import prefork
+
+
+def _watcher(tmp_path, monkeypatch, reload_calls):
+    path = tmp_path / "generation"
+    path.write_text("1")
+    monkeypatch.setattr(prefork, "GENERATION_PATH", str(path))
+
+    def fake_load_events():
+        reload_calls.append(threading.current_thread())
+        return []
+
+    monkeypatch.setattr(prefork, "load_events", fake_load_events)
+    monkeypatch.setattr(prefork, "reload_vector_backend", lambda: None)
+    monkeypatch.setattr(prefork, "load_event_cache", lambda *args, **kwargs: None)
+    watcher = prefork.ReloadWatcher(interval=0)
+    return watcher, path
+
+
+def test_no_reload_without_new_generation(tmp_path, monkeypatch):
+    calls = []
+    watcher, _ = _watcher(tmp_path, monkeypatch, calls)
+    assert watcher.generation == 1
+    assert not watcher.check()
+    assert calls == []
+
+
+def test_acheck_reloads_off_the_event_loop(tmp_path, monkeypatch):
+    calls = []
+    watcher, path = _watcher(tmp_path, monkeypatch, calls)
+    path.write_text("2")
+
+    async def run():
+        return await watcher.acheck(), threading.current_thread()
+
+    reloaded, loop_thread = asyncio.run(run())
+    assert reloaded
+    assert watcher.generation == 2 and watcher.reloads == 1
+    assert calls and calls[0] is not loop_thread
+
+    # Same generation again: nothing to do
+    assert not asyncio.run(watcher.acheck())
+    assert len(calls) == 1
+
+
+def test_one_worker_finishes_a_preloaded_index(tmp_path, monkeypatch):
+    calls = []
+    watcher, path = _watcher(tmp_path, monkeypatch, calls)
+    monkeypatch.setattr(prefork, "INDEX_LOCK_PATH", str(tmp_path / ".index.lock"))
+    builds = []
+    monkeypatch.setattr(prefork, "build_vector_store", lambda events: builds.append(events) or {"added": 1})
+    monkeypatch.setattr(prefork, "refresh_snapshot", lambda *args: None)
+    monkeypatch.setattr(prefork, "get_vector_backend", lambda: None)
+
+    # Both workers forked from a master at generation 1
+    first, second = watcher, prefork.ReloadWatcher(interval=0)
+    monkeypatch.setattr(prefork, "RELOAD_WATCHER", first)
+    assert prefork.finish_preloaded_index(["scheme"]) == {"added": 1}
+    assert path.read_text() == "2" and first.generation == 2
+
+    # The second worker waited on the lock, then reloads instead of encoding
+    monkeypatch.setattr(prefork, "RELOAD_WATCHER", second)
+    assert prefork.finish_preloaded_index(["scheme"]) is None
+    assert len(builds) == 1
+    assert second.generation == 2 and len(calls) == 1
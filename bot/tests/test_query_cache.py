@@ -0,0 +1,45 @@
+from app.rag_retriever import QueryCache, normalize_query
+
+
+def test_normalize_query_ignores_case_whitespace_and_trailing_punctuation():
+    assert normalize_query("  Pension   for Seniors?! ") == "pension for seniors"
+
+
+def test_hit_returns_embedding_and_ids_per_k():
+    cache = QueryCache(max_size=4, ttl=60)
+    cache.put("pension", 1, [0.1, 0.2], 2, ["A", "B"])
+    entry = cache.get("pension", 1)
+    assert entry["embedding"] == [0.1, 0.2]
+    assert entry["ids"] == {2: ["A", "B"]}
+    assert cache.hits == 1
+
+
+def test_newer_index_version_clears_entries():
+    cache = QueryCache(max_size=4, ttl=60)
+    cache.put("pension", 1, [0.1], 2, ["A"])
+    assert cache.get("pension", 2) is None
+    assert cache.invalidations == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_older_version_bypasses_without_clearing():
+    cache = QueryCache(max_size=4, ttl=60)
+    cache.put("pension", 2, [0.1], 2, ["A"])
+    assert cache.get("pension", 1) is None   # request pinned to an older snapshot
+    cache.put("housing", 1, [0.2], 2, ["B"])  # ignored
+    assert cache.get("pension", 2) is not None
+    assert cache.get("housing", 2) is None
+
+
+def test_lru_eviction_and_ttl():
+    cache = QueryCache(max_size=2, ttl=60)
+    cache.put("a", 1, [0], 1, ["A"])
+    cache.put("b", 1, [0], 1, ["B"])
+    cache.get("a", 1)
+    cache.put("c", 1, [0], 1, ["C"])
+    assert cache.get("b", 1) is None
+    assert cache.evictions == 1
+
+    expired = QueryCache(max_size=2, ttl=-1)
+    expired.put("a", 1, [0], 1, ["A"])
+    assert expired.get("a", 1) is None
@@ -0,0 +1,54 @@
+import json
+import os
+
+from app.simple_chat import SchemeIndex, search_schemes
+
+PENSION = {"id": "PENSION_001", "name": "Social Security Pension", "category": "Pension", "benefit": "₹1600/month"}
+HOUSING = {"id": "HOUSING_001", "name": "Life Mission Housing", "category": "Housing", "benefit": "₹4 lakh"}
+
+
+def _write(path, content, mtime):
+    path.write_text(content if isinstance(content, str) else json.dumps({"kerala_schemes": content}))
+    # Explicit mtimes: two writes within the filesystem's timestamp resolution look unchanged
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_mtime_change_triggers_a_reload(tmp_path):
+    path = tmp_path / "schemes.json"
+    _write(path, [PENSION], 1_000_000_000)
+    index = SchemeIndex(str(path), interval=0)
+
+    assert "Social Security Pension" in search_schemes("pension", index)
+    # Unchanged file: the built index is reused
+    assert index.current()[0] is index.current()[0] and index.reloads == 1
+
+    _write(path, [PENSION, HOUSING], 2_000_000_000)
+    assert "Life Mission Housing" in search_schemes("housing scheme", index)
+    assert index.reloads == 2 and index.stats()["schemes"] == 2
+
+
+def test_failed_reload_keeps_the_previous_index(tmp_path):
+    path = tmp_path / "schemes.json"
+    _write(path, [PENSION, HOUSING], 1_000_000_000)
+    index = SchemeIndex(str(path), interval=0)
+    before = index.current()
+
+    # Half-written file: nothing loads, the old index keeps serving
+    _write(path, '{"kerala_schemes": [', 2_000_000_000)
+    assert index.current()[0] is before[0]
+    assert "Life Mission Housing" in search_schemes("housing scheme", index)
+
+    # Retried on the next check once the file is whole again
+    _write(path, [PENSION], 3_000_000_000)
+    index.current()
+    assert index.stats() == {"path": str(path), "schemes": 1, "reloads": 2}
+
+
+def test_interval_limits_stat_calls(tmp_path):
+    path = tmp_path / "schemes.json"
+    _write(path, [PENSION], 1_000_000_000)
+    index = SchemeIndex(str(path), interval=3600)
+    index.current()
+
+    _write(path, [PENSION, HOUSING], 2_000_000_000)
+    assert index.stats()["schemes"] == 1 and len(index.current()[1]) == 1
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from app import chat_engine
+from app.cache import load_event_cache
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert len(runs) == 1
+    assert flight.stats()["executions"] == 1 and flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_leader_exception_reaches_followers():
+    flight = SingleFlight("test")
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", boom) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert [str(e) for e in errors] == ["upstream failed"] * 3
+    assert flight.stats()["executions"] == 1
+
+
+def test_finished_calls_are_not_reused():
+    flight = SingleFlight("test")
+    runs = []
+
+    async def work():
+        runs.append(1)
+        return len(runs)
+
+    async def run():
+        return [await flight.do("key", work), await flight.do("key", work)]
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+@pytest.fixture
+def counting_chat(monkeypatch):
+    load_event_cache([{"id": "PENSION_001", "name": "Kerala Social Security Pension"}])
+    counts = {"retrieval": 0, "llm": 0}
+
+    async def search(query, top_k):
+        counts["retrieval"] += 1
+        await asyncio.sleep(0.02)
+        return [{"id": "PENSION_001", "text": "pension", "metadata": {"scheme_id": "PENSION_001"}}]
+
+    async def generate(context, question, raise_errors=False):
+        counts["llm"] += 1
+        await asyncio.sleep(0.02)
+        return "The pension is ₹1600/month."
+
+    monkeypatch.setattr(chat_engine, "asemantic_search", search)
+    monkeypatch.setattr(chat_engine, "agenerate_answer", generate)
+    yield counts
+    load_event_cache([])
+
+
+def test_identical_chat_queries_share_retrieval_and_llm(counting_chat):
+    async def run():
+        queries = ["What is the pension scheme?", "what is the pension scheme", "  What is the pension  scheme "]
+        return await asyncio.gather(*(chat_engine.achat(q) for q in queries * 2))
+
+    replies = asyncio.run(run())
+    assert replies == ["The pension is ₹1600/month."] * 6
+    assert counting_chat == {"retrieval": 1, "llm": 1}
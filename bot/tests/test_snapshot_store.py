@@ -0,0 +1,73 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app import snapshot_store
+from app.snapshot_store import read_snapshot, write_snapshot
+from app.vector_store import NumpyBackend
+
+EVENTS = [
+    {"id": "S1", "name": "Sthree Suraksha", "benefit": "₹1000/month"},
+    {"id": "S2", "name": "Life Mission", "benefit": "Housing"},
+]
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_store, "SYNCED_EVENTS_PATH", str(tmp_path / "events.json"))
+    monkeypatch.setattr(snapshot_store, "_last", None)
+    source = tmp_path / "schemes.json"
+    source.write_text(json.dumps({"kerala_schemes": EVENTS}))
+    return str(source), str(tmp_path / "snapshot"), tmp_path
+
+
+def _backend(tmp_path):
+    backend = NumpyBackend(str(tmp_path / "index"), mmap=False)
+    backend.upsert(["S1", "S2"], np.array([[1, 0], [0, 1]], dtype=np.float32), ["doc 1", "doc 2"],
+                   [{"content_hash": "h1"}, {"content_hash": "h2"}])
+    return backend
+
+
+def test_round_trip(paths):
+    source, directory, tmp_path = paths
+    header = write_snapshot(EVENTS, _backend(tmp_path), source, directory)
+    assert header["events"] == 2 and header["vectors"] == 2 and header["dimensions"] == 2
+
+    stored = read_snapshot(directory)
+    assert stored.content_hash == header["content_hash"]
+    assert list(stored.events) == EVENTS
+    assert stored.ids == ["S1", "S2"]
+    assert stored.metadatas[1] == {"content_hash": "h2"}
+    assert isinstance(stored.embeddings, np.memmap)
+    assert stored.covers() and stored.is_current(source)
+
+    backend = NumpyBackend.from_snapshot(stored, str(tmp_path / "index"))
+    assert backend.query([0, 1], 1)[0]["id"] == "S2"
+
+
+def test_unchanged_content_is_not_rewritten(paths):
+    source, directory, tmp_path = paths
+    first = write_snapshot(EVENTS, _backend(tmp_path), source, directory)
+    again = write_snapshot(EVENTS, _backend(tmp_path), source, directory)
+    assert again == first
+    assert sorted(n for n in os.listdir(directory) if n.startswith("records-")) == [first["records_file"]]
+
+
+def test_source_changes_make_it_stale(paths):
+    source, directory, tmp_path = paths
+    write_snapshot(EVENTS, _backend(tmp_path), source, directory)
+    stored = read_snapshot(directory)
+
+    # A new sync output counts as a source change
+    (tmp_path / "events.json").write_text("[]")
+    assert not stored.is_current(source)
+
+
+def test_corrupt_records_are_ignored(paths):
+    source, directory, tmp_path = paths
+    header = write_snapshot(EVENTS, _backend(tmp_path), source, directory)
+    with open(os.path.join(directory, header["records_file"]), "ab") as f:
+        f.write(b"garbage")
+    assert read_snapshot(directory) is None
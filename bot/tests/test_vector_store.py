@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from app.vector_store import NumpyBackend, VectorBackend
+
+
+def _vectors(*rows):
+    return np.array(rows, dtype=np.float32)
+
+
+def _backend(tmp_path, mmap=False):
+    return NumpyBackend(str(tmp_path / "index"), mmap=mmap)
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        VectorBackend()
+
+
+def test_upsert_query_returns_cosine_similarity(tmp_path):
+    backend = _backend(tmp_path)
+    backend.upsert(["a", "b"], _vectors([3, 0], [0, 2]), ["doc a", "doc b"], [{"n": 1}, {"n": 2}])
+
+    hits = backend.query([1, 1], 2)
+    assert [h["score"] for h in hits] == pytest.approx([2 ** -0.5, 2 ** -0.5])
+    assert backend.query([5, 0], 1)[0] == {"id": "a", "text": "doc a", "metadata": {"n": 1}, "score": pytest.approx(1.0)}
+
+
+def test_upsert_replaces_existing_id(tmp_path):
+    backend = _backend(tmp_path)
+    backend.upsert(["a", "b"], _vectors([1, 0], [0, 1]), ["a1", "b1"], [{}, {}])
+    backend.upsert(["a"], _vectors([0, 1]), ["a2"], [{"v": 2}])
+
+    assert backend.count() == 2
+    assert backend.get(["a"]) == [{"id": "a", "text": "a2", "metadata": {"v": 2}}]
+    assert backend.query([0, 1], 2)[0]["score"] == pytest.approx(1.0)
+
+
+def test_delete_keeps_remaining_rows_aligned(tmp_path):
+    backend = _backend(tmp_path)
+    backend.upsert(["a", "b", "c"], _vectors([1, 0], [0, 1], [-1, 0]), ["a", "b", "c"], [{}, {}, {}])
+    backend.delete(["a", "missing"])
+
+    assert backend.count() == 2
+    assert [h["id"] for h in backend.get(["c", "b", "a"])] == ["c", "b"]
+    assert backend.query([-1, 0], 1)[0]["id"] == "c"
+    assert backend.query([0, 1], 1)[0]["id"] == "b"
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_persist_round_trip(tmp_path, mmap):
+    backend = _backend(tmp_path)
+    backend.upsert(["a", "b"], _vectors([1, 0], [0, 1]), ["doc a", "doc b"],
+                   [{"content_hash": "h1"}, {"content_hash": "h2"}])
+    backend.persist()
+
+    loaded = _backend(tmp_path, mmap=mmap)
+    assert loaded.count() == 2
+    assert loaded.get_hashes() == {"a": "h1", "b": "h2"}
+    assert loaded.query([0, 1], 1)[0]["id"] == "b"
+
+    # Writes to a memory-mapped index go to a private copy
+    loaded.upsert(["c"], _vectors([1, 1]), ["doc c"], [{}])
+    loaded.delete(["a"])
+    assert [h["id"] for h in loaded.query([1, 1], 3)] == ["c", "b"]
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_empty_index_persists_and_accepts_upserts(tmp_path, mmap):
+    _backend(tmp_path).persist()
+
+    loaded = _backend(tmp_path, mmap=mmap)
+    assert loaded.count() == 0
+    assert loaded.query([1, 0], 3) == []
+
+    loaded.upsert(["a"], _vectors([0, 1]), ["doc a"], [{}])
+    assert loaded.query([0, 1], 1)[0]["id"] == "a"
+
+
+def test_clone_is_independent(tmp_path):
+    backend = _backend(tmp_path)
+    backend.upsert(["a"], _vectors([1, 0]), ["doc a"], [{}])
+    copy = backend.clone()
+    copy.upsert(["a"], _vectors([0, 1]), ["changed"], [{}])
+
+    assert backend.get(["a"])[0]["text"] == "doc a"
+    assert backend.query([1, 0], 1)[0]["score"] == pytest.approx(1.0)